@@ -4,33 +4,81 @@ Punto de entrada principal de la aplicación Flask para Caja Plus.
 - Configura la aplicación Flask.
 - Habilita CORS para permitir solicitudes entre dominios (Cross-Origin Resource Sharing).
 - Registra los distintos "blueprints" de rutas (módulos que agrupan endpoints por temática).
+- Todo esto lo hace la función create_app() (application factory), que se puede llamar
+  para obtener instancias nuevas (por ejemplo, en tests o en el servidor de producción).
 - Arranca el servidor en el puerto 5000 cuando se ejecuta este archivo directamente.
 
 Términos clave:
 - Flask: Micro-framework de Python para crear aplicaciones web y APIs.
 - CORS (Cross-Origin Resource Sharing): Permite que el frontend que corre en otro origen (dominio o puerto) pueda hacer peticiones a esta API (por ejemplo, si el frontend corre en localhost:3000 y el backend en localhost:5000).
+- Application factory: Función que crea y configura la app en lugar de hacerlo al importar el módulo.
 - Blueprint: Forma de organizar las rutas/endpoints de una aplicación Flask en módulos independientes. Permite mantener el código modular y ordenado, agrupando por funcionalidad (ventas, productos, usuarios, etc.).
 """
 
 from flask import Flask
 from flask_cors import CORS
-from routes.api_routes import ventas_bp, productos_bp, caja_bp, pagos_bp, facturas_bp
-from routes.usuarios_routes import usuarios_bp
+from services.json_service import configurar_json
+from services.compresion_service import configurar_compresion
+from services.persistencia_service import configurar_bloqueo
+from services.instrumentacion_service import configurar_instrumentacion
+from services.perfilado_service import configurar_perfilado
 
-# Inicializa la app Flask
-app = Flask(__name__)
 
-# Habilita CORS (permite llamadas desde el frontend en otros puertos/orígenes)
-CORS(app)
+def create_app():
+    """
+    Crea y configura una instancia de la aplicación (application factory).
 
-# Registro de blueprints (modularización de rutas por funcionalidad)
-app.register_blueprint(ventas_bp)       # Rutas de ventas y métricas
-app.register_blueprint(usuarios_bp)     # Rutas de usuarios
-app.register_blueprint(productos_bp)    # Rutas de productos
-app.register_blueprint(caja_bp)         # Rutas de caja e ingresos/egresos
-app.register_blueprint(pagos_bp)        # Rutas de pagos
-app.register_blueprint(facturas_bp)     # Rutas de facturación
+    Las rutas se registran con vistas diferidas: los controladores (y librerías pesadas como
+    reportlab) se importan recién cuando llega la primera petición que los necesita, así
+    crear la app es rápido para workers, tests y scripts.
+
+    Returns:
+        Flask: Aplicación lista para servir.
+    """
+    # Los blueprints se importan acá y no al cargar el módulo
+    from routes.api_routes import ventas_bp, productos_bp, caja_bp, pagos_bp, facturas_bp, instrumentacion_bp, perfiles_bp, archivo_bp, cambios_bp, sync_bp
+    from routes.usuarios_routes import usuarios_bp
+
+    # Inicializa la app Flask
+    app = Flask(__name__)
+
+    # Habilita CORS (permite llamadas desde el frontend en otros puertos/orígenes)
+    CORS(app)
+
+    # Medición de latencia por endpoint (solo cuenta si CAJA_INSTRUMENTACION=1). Va primero para
+    # que su after_request corra último y el tiempo incluya la compresión
+    configurar_instrumentacion(app)
+
+    # Serialización JSON rápida (orjson si está instalado) y compresión gzip/brotli de las respuestas
+    configurar_json(app)
+    configurar_compresion(app)
+
+    # Las peticiones que modifican datos se atienden de a una (entre hilos y entre workers)
+    configurar_bloqueo(app)
+
+    # Perfilado con cProfile de peticiones puntuales (solo si CAJA_PERFILADO=1)
+    configurar_perfilado(app)
+
+    # Registro de blueprints (modularización de rutas por funcionalidad)
+    app.register_blueprint(ventas_bp)       # Rutas de ventas y métricas
+    app.register_blueprint(usuarios_bp)     # Rutas de usuarios
+    app.register_blueprint(productos_bp)    # Rutas de productos
+    app.register_blueprint(caja_bp)         # Rutas de caja e ingresos/egresos
+    app.register_blueprint(pagos_bp)        # Rutas de pagos
+    app.register_blueprint(facturas_bp)     # Rutas de facturación
+    app.register_blueprint(instrumentacion_bp)  # GET /metrics (Prometheus)
+    app.register_blueprint(perfiles_bp)     # Perfilado a pedido
+    app.register_blueprint(archivo_bp)      # Archivo de meses cerrados
+    app.register_blueprint(cambios_bp)      # Registro de cambios (long-poll)
+    app.register_blueprint(sync_bp)         # Sincronización incremental
+
+    return app
+
+
+# Instancia por defecto (la usan `python app.py`, servidor.py, asgi.py y los tests)
+app = create_app()
 
 if __name__ == '__main__':
+    # Servidor de desarrollo. En producción usar servidor.py (gunicorn/waitress con varios workers)
     # Ejecuta el servidor en modo debug y abierto a cualquier IP local
     app.run(host='0.0.0.0', port=5000, debug=True)
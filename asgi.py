@@ -0,0 +1,225 @@
+"""
+Modo de servicio asíncrono (ASGI) de Caja Plus.
+
+Con un servidor WSGI cada conexión ocupa un hilo mientras dura, aunque esté esperando
+al disco o a un cliente lento. El dashboard consulta productos, ventas, caja y métricas
+cada pocos segundos desde muchas pantallas, así que los hilos se agotan rápido.
+
+En este modo la app corre sobre un event loop (asyncio) y las conexiones no ocupan hilos:
+- El trabajo bloqueante (leer los JSON, armar la respuesta en Flask) se ejecuta en un pool
+  de hilos acotado, y el event loop sigue atendiendo otras conexiones mientras tanto.
+- Las respuestas grandes y los archivos (descargar_pdf, exportaciones) se envían de a bloques:
+  cada bloque se lee en el pool y se manda sin retener un hilo mientras el cliente lo descarga.
+- Los endpoints de lectura cacheables (obtener_productos, obtener_ventas, obtener_caja,
+  obtener_pagos, obtener_metricas) responden 304 directamente desde el event loop si el
+  cliente ya tiene la versión vigente, sin usar el pool ni leer datos.
+
+Uso:
+    pip install uvicorn
+    uvicorn asgi:aplicacion --host 0.0.0.0 --port 5000
+    # o bien: CAJA_MODO=asgi python servidor.py
+
+Términos clave:
+- ASGI: Interfaz estándar para servidores y aplicaciones asíncronas de Python (sucesora de WSGI).
+- Event loop: Bucle que atiende muchas conexiones en un solo hilo, pasando a otra mientras una espera.
+- Pool de hilos: Grupo fijo de hilos que ejecuta las tareas bloqueantes.
+"""
+
+import asyncio
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
+
+from werkzeug.exceptions import HTTPException
+from werkzeug.http import parse_etags
+
+import config
+from app import app
+from services import cache_service
+
+TAMANIO_BLOQUE = 64 * 1024
+
+pool = ThreadPoolExecutor(max_workers=config.THREADS, thread_name_prefix="caja-asgi")
+_rutas = app.url_map.bind("localhost")
+
+
+async def en_hilo(funcion, *args):
+    """Ejecuta una función bloqueante en el pool de hilos sin frenar el event loop."""
+    return await asyncio.get_running_loop().run_in_executor(pool, funcion, *args)
+
+
+class _ArchivoEnBloques:
+    """
+    Reemplazo de wsgi.file_wrapper: entrega el archivo en bloques de 64 KB,
+    así cada lectura es una tarea corta en el pool.
+    """
+
+    def __init__(self, archivo, buffer_size=None):
+        self.archivo = archivo
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        datos = self.archivo.read(TAMANIO_BLOQUE)
+        if not datos:
+            raise StopIteration
+        return datos
+
+    def close(self):
+        self.archivo.close()
+
+
+def _environ(scope, cuerpo):
+    """Arma el environ WSGI equivalente a un scope HTTP de ASGI."""
+    servidor = scope.get("server") or ("localhost", 80)
+    cliente = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": servidor[0],
+        "SERVER_PORT": str(servidor[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": cliente[0],
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(cuerpo),
+        "wsgi.input_terminated": True,  # El cuerpo ya se leyó completo (también si vino chunked)
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+        "wsgi.file_wrapper": _ArchivoEnBloques,
+    }
+    for nombre, valor in scope.get("headers", []):
+        nombre, valor = nombre.decode("latin-1"), valor.decode("latin-1")
+        if nombre == "content-type":
+            environ["CONTENT_TYPE"] = valor
+        elif nombre == "content-length":
+            environ["CONTENT_LENGTH"] = valor
+        else:
+            clave = "HTTP_" + nombre.upper().replace("-", "_")
+            environ[clave] = f"{environ[clave]},{valor}" if clave in environ else valor
+    environ.setdefault("CONTENT_LENGTH", str(len(cuerpo)))
+    return environ
+
+
+def _ejecutar_flask(environ):
+    """
+    Ejecuta la app Flask (en un hilo del pool) y devuelve estado, headers, el primer bloque
+    del cuerpo y el iterador con el resto. Para las respuestas comunes todo el trabajo
+    queda en esta única tarea.
+    """
+    inicio = {}
+
+    def start_response(status, headers, exc_info=None):
+        inicio["status"] = int(status.split(" ", 1)[0])
+        inicio["headers"] = headers
+
+    cuerpo = app(environ, start_response)
+    iterador = iter(cuerpo)
+    primero = next(iterador, None)
+    return inicio["status"], inicio["headers"], primero, iterador, cuerpo
+
+
+def _etag_vigente(scope, headers):
+    """
+    Si la petición es un GET a un endpoint cacheable y el If-None-Match coincide con la
+    versión actual, devuelve el ETag (se puede responder 304). Si no, devuelve None.
+    Solo hace os.stat de los archivos, así que es seguro llamarla desde el event loop.
+    """
+    if scope["method"] != "GET" or b"if-none-match" not in headers:
+        return None
+    try:
+        endpoint, kwargs = _rutas.match(scope["path"], method="GET")
+    except HTTPException:
+        return None
+    almacenes = getattr(app.view_functions.get(endpoint), "almacenes_cache", None)
+    if almacenes is None:
+        return None
+
+    args = parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True)
+    etag = cache_service.etag_de(cache_service.clave_de(endpoint, args, kwargs, almacenes))
+    if parse_etags(headers[b"if-none-match"].decode("latin-1")).contains_weak(etag):
+        return etag
+    return None
+
+
+async def _leer_cuerpo(receive):
+    partes = []
+    while True:
+        mensaje = await receive()
+        if mensaje["type"] == "http.disconnect":
+            break
+        partes.append(mensaje.get("body", b""))
+        if not mensaje.get("more_body"):
+            break
+    return b"".join(partes)
+
+
+async def _atender_http(scope, receive, send):
+    headers = dict(scope.get("headers", []))
+
+    etag = _etag_vigente(scope, headers)
+    if etag is not None:
+        respuesta = [(b"etag", f'"{etag}"'.encode("latin-1")), (b"cache-control", b"no-cache")]
+        if b"origin" in headers:  # Igual que flask-cors: se devuelve el origen de la petición
+            respuesta += [(b"access-control-allow-origin", headers[b"origin"]), (b"vary", b"Origin")]
+        await send({"type": "http.response.start", "status": 304, "headers": respuesta})
+        await send({"type": "http.response.body", "body": b""})
+        return
+
+    environ = _environ(scope, await _leer_cuerpo(receive))
+    status, headers_respuesta, primero, iterador, cuerpo = await en_hilo(_ejecutar_flask, environ)
+
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers_respuesta],
+    })
+    try:
+        bloque = primero
+        while bloque is not None:
+            if bloque:
+                await send({"type": "http.response.body", "body": bloque, "more_body": True})
+            bloque = await en_hilo(next, iterador, None)
+    finally:
+        if hasattr(cuerpo, "close"):
+            await en_hilo(cuerpo.close)
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _atender_lifespan(receive, send):
+    from servidor import calentar
+
+    while True:
+        mensaje = await receive()
+        if mensaje["type"] == "lifespan.startup":
+            try:
+                await en_hilo(calentar, app)
+            except Exception as error:
+                await send({"type": "lifespan.startup.failed", "message": str(error)})
+                return
+            await send({"type": "lifespan.startup.complete"})
+        elif mensaje["type"] == "lifespan.shutdown":
+            pool.shutdown(wait=True)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def aplicacion(scope, receive, send):
+    """
+    Aplicación ASGI de Caja Plus.
+
+    Args:
+        scope (dict): Datos de la conexión (tipo, método, ruta, headers, ...).
+        receive (callable): Recibe mensajes del servidor (cuerpo de la petición).
+        send (callable): Envía mensajes al servidor (inicio y cuerpo de la respuesta).
+    """
+    if scope["type"] == "http":
+        await _atender_http(scope, receive, send)
+    elif scope["type"] == "lifespan":
+        await _atender_lifespan(receive, send)
@@ -0,0 +1,68 @@
+"""
+Benchmark del tiempo de arranque: cuánto tarda en importarse la app y qué módulos pesan más.
+
+Usa `python -X importtime`, que informa para cada módulo importado su tiempo propio y el
+acumulado (incluyendo lo que él importa). Se mide:
+- `import app` (crea la app con create_app(), con los controladores en diferido).
+- Lo que se posterga: importar todos los controladores y reportlab, que ahora se paga recién
+  en la primera petición que los usa.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_arranque.py [repeticiones]
+"""
+
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LINEA = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+CONTROLADORES = (
+    "import app; from routes.carga_diferida import resolver_todas; resolver_todas(app.app); "
+    "import reportlab.pdfgen.canvas, reportlab.lib.colors"
+)
+
+
+def importtime(codigo):
+    """
+    Ejecuta `codigo` en un proceso nuevo con -X importtime.
+
+    Returns:
+        list: (módulo, tiempo propio en µs, acumulado en µs, nivel) por cada import de primer nivel o más.
+    """
+    salida = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        cwd=RAIZ, capture_output=True, text=True, check=True,
+    ).stderr
+    modulos = []
+    for linea in salida.splitlines():
+        m = LINEA.match(linea)
+        if m:
+            modulos.append((m.group(4), int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2))
+    return modulos
+
+
+def total_ms(modulos):
+    """Suma el acumulado de los imports de primer nivel (lo que tardó todo)."""
+    return sum(acumulado for _, _, acumulado, nivel in modulos if nivel == 0) / 1000
+
+
+if __name__ == "__main__":
+    repeticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    arranque = [total_ms(importtime("import app")) for _ in range(repeticiones)]
+    completo = [total_ms(importtime(CONTROLADORES)) for _ in range(repeticiones)]
+
+    print(f"import app (create_app, controladores diferidos): {statistics.median(arranque):.0f} ms")
+    print(f"import app + todos los controladores + reportlab: {statistics.median(completo):.0f} ms")
+    print(f"Postergado hasta la primera petición que lo usa:  {statistics.median(completo) - statistics.median(arranque):.0f} ms")
+
+    modulos = importtime("import app")
+    print("\nMódulos con más tiempo propio en `import app`:")
+    for nombre, propio, _, _ in sorted(modulos, key=lambda m: m[1], reverse=True)[:10]:
+        print(f"  {propio / 1000:7.1f} ms  {nombre}")
+    cargados = {nombre for nombre, *_ in modulos}
+    print("\n¿reportlab cargado al arrancar?", "sí" if any(n.startswith("reportlab") for n in cargados) else "no")
@@ -0,0 +1,71 @@
+"""
+Benchmark del manejo de fechas: compara el procesamiento por registro de antes
+(strptime + etiqueta de semana recalculada en cada registro) con el de services.utilidades
+(fromisoformat, etiquetas memoizadas por día y epoch guardado en "fecha_ts").
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_fechas.py [cantidad_de_registros]
+"""
+
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.utilidades import MESES_ES, epoch, epoch_de, periodos_de_dia  # noqa: E402
+
+
+def registros_sinteticos(cantidad, dias=365):
+    """Genera registros con fechas al azar dentro de los últimos `dias` días."""
+    inicio = datetime(2025, 1, 1)
+    registros = []
+    for i in range(cantidad):
+        fecha = inicio + timedelta(seconds=random.randrange(dias * 86400))
+        texto = fecha.strftime("%Y-%m-%d %H:%M:%S")
+        registros.append({"id": str(i), "fecha": texto, "fecha_ts": epoch(texto)})
+    return registros
+
+
+def semana_label_anterior(fecha):
+    start_of_week = fecha - timedelta(days=fecha.weekday())
+    end_of_week = start_of_week + timedelta(days=6)
+    mes = MESES_ES[start_of_week.month]
+    return f"{start_of_week.day}-{end_of_week.day} {mes} {end_of_week.year}"
+
+
+def procesar_anterior(registros):
+    """Lo que hacían obtener_metricas y obtener_caja por cada registro."""
+    for r in registros:
+        fecha = datetime.strptime(r["fecha"][:10], "%Y-%m-%d")
+        fecha.strftime("%Y-%m-%d"), semana_label_anterior(fecha), fecha.strftime("%Y-%m"), fecha.strftime("%Y")
+    sorted(registros, key=lambda r: datetime.strptime(r["fecha"], "%Y-%m-%d %H:%M:%S"), reverse=True)
+
+
+def procesar_nuevo(registros):
+    """Lo mismo usando services.utilidades."""
+    for r in registros:
+        periodos_de_dia(r["fecha"][:10])
+    sorted(registros, key=epoch_de, reverse=True)
+
+
+def medir(funcion, registros):
+    inicio = time.perf_counter()
+    funcion(registros)
+    return time.perf_counter() - inicio
+
+
+if __name__ == "__main__":
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    registros = registros_sinteticos(cantidad)
+
+    anterior = medir(procesar_anterior, registros)
+    periodos_de_dia.cache_clear()
+    nuevo = medir(procesar_nuevo, registros)
+
+    print(f"Registros: {cantidad}")
+    print(f"Antes:   {anterior:.3f} s ({anterior / cantidad * 1e6:.2f} µs por registro)")
+    print(f"Ahora:   {nuevo:.3f} s ({nuevo / cantidad * 1e6:.2f} µs por registro)")
+    print(f"Mejora:  {anterior / nuevo:.1f}x")
@@ -0,0 +1,83 @@
+"""
+Benchmark de la capa de respuestas: tiempo de serialización JSON (json estándar vs orjson)
+y bytes enviados sin compresión, con gzip y con brotli.
+
+Trabaja sobre un directorio temporal con ventas y movimientos sintéticos, así no toca data/.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_respuestas.py [cantidad_de_ventas]
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+from app import app  # noqa: E402
+from services import cache_service  # noqa: E402
+from services.compresion_service import encodings_soportados  # noqa: E402
+from services.json_service import ProveedorJSONRapido  # noqa: E402
+
+REPETICIONES = 20
+
+
+def generar_datos(directorio, cantidad):
+    """Escribe ventas.json y caja.json sintéticos en `directorio`/data."""
+    os.makedirs(os.path.join(directorio, "data"), exist_ok=True)
+    ventas, movimientos = [], []
+    for i in range(cantidad):
+        fecha = f"2025-{random.randint(1, 12):02d}-{random.randint(1, 28):02d} 12:00:00"
+        items = [
+            {"id": p, "nombre": f"Producto {p}", "cantidad": random.randint(1, 5), "precio_unitario": 1000 * p}
+            for p in random.sample(range(1, 40), 3)
+        ]
+        total = sum(it["cantidad"] * it["precio_unitario"] for it in items)
+        ventas.append({"id": f"v{i}", "items": items, "total": total, "fecha": fecha})
+        movimientos.append({"id": f"v{i}", "tipo": "ingreso", "monto": total, "descripcion": f"Venta #{i}", "fecha": fecha})
+    with open(os.path.join(directorio, "data", "ventas.json"), "w", encoding="utf-8") as f:
+        json.dump(ventas, f)
+    with open(os.path.join(directorio, "data", "caja.json"), "w", encoding="utf-8") as f:
+        json.dump({"saldo": sum(m["monto"] for m in movimientos), "movimientos": movimientos}, f)
+    return ventas
+
+
+def medir_serializacion(proveedor, payload):
+    inicio = time.perf_counter()
+    for _ in range(REPETICIONES):
+        proveedor.response(payload)
+    return (time.perf_counter() - inicio) / REPETICIONES
+
+
+if __name__ == "__main__":
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    with tempfile.TemporaryDirectory() as directorio:
+        os.chdir(directorio)
+        ventas = generar_datos(directorio, cantidad)
+        payload = {"ventas": ventas, "total": len(ventas)}
+
+        with app.app_context():
+            estandar = medir_serializacion(DefaultJSONProvider(app), payload)
+            print(f"Serialización de {cantidad} ventas (promedio de {REPETICIONES}):")
+            print(f"  json estándar: {estandar * 1000:.1f} ms")
+            if ProveedorJSONRapido is not None:
+                rapido = medir_serializacion(ProveedorJSONRapido(app), payload)
+                print(f"  orjson:        {rapido * 1000:.1f} ms ({estandar / rapido:.1f}x)")
+            else:
+                print("  orjson no está instalado")
+
+        client = app.test_client()
+        print("\nBytes enviados:")
+        for url in (f"/api/ventas?per_page={cantidad}", "/api/ventas/metricas"):
+            cache_service.limpiar()
+            tamanios = {"sin comprimir": len(client.get(url).data)}
+            for encoding in encodings_soportados():
+                tamanios[encoding] = len(client.get(url, headers={"Accept-Encoding": encoding}).data)
+            base = tamanios["sin comprimir"]
+            detalle = ", ".join(f"{k}: {v / 1024:.0f} KB ({v / base:.0%})" for k, v in tamanios.items())
+            print(f"  {url.split('?')[0]} -> {detalle}")
@@ -0,0 +1,347 @@
+"""
+Prueba de carga concurrente: muchos clientes (hilos en varios procesos) registran ventas,
+ingresos, pagos y facturas a la vez contra un servidor local, y al terminar se verifica que
+los datos sigan siendo consistentes.
+
+Invariantes verificados sobre los archivos de data/:
+- El saldo es igual a la suma de ingresos menos egresos de los movimientos.
+- El saldo cambió exactamente lo que suman las operaciones aceptadas (201).
+- No se perdió ninguna escritura: hay tantas ventas, movimientos y facturas nuevas como
+  operaciones aceptadas (una escritura pisada por otra desaparece del archivo).
+- El stock de cada producto es el inicial menos las unidades vendidas, y nunca se vendió más
+  de lo que había (sobreventa).
+- No hay IDs de factura repetidos.
+
+Si no se indica --url, se generan datos (ver generador_datos.py) con poco stock por producto
+(para forzar la competencia por las últimas unidades) y se levanta un servidor propio:
+el de desarrollo de Flask con hilos, o servidor.py (--servidor produccion).
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/carga_concurrente.py --procesos 4 --hilos 8 --operaciones 50
+    python benchmarks/carga_concurrente.py --url http://127.0.0.1:5000 --datos /ruta/al/backend
+
+Sale con código 1 si hubo alguna violación.
+
+Términos clave:
+- Lost update (escritura perdida): Dos peticiones leen el mismo archivo, cada una agrega lo
+  suyo y la segunda en guardar pisa lo que guardó la primera.
+- Sobreventa (oversell): Dos ventas ven el mismo stock disponible y ambas lo descuentan.
+- Throughput: Operaciones por segundo que atendió el servidor entre todos los clientes.
+"""
+
+import argparse
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generador_datos import generar  # noqa: E402
+
+# Proporción de cada operación en la mezcla
+MEZCLA = (("venta", 0.4), ("ingreso", 0.2), ("pago", 0.2), ("factura", 0.2))
+
+
+def _pedir(url, ruta, cuerpo):
+    """POST JSON; devuelve (status, respuesta JSON o None)."""
+    peticion = urllib.request.Request(
+        url + ruta, data=json.dumps(cuerpo).encode(), headers={"Content-Type": "application/json"}, method="POST",
+    )
+    try:
+        with urllib.request.urlopen(peticion, timeout=120) as respuesta:
+            return respuesta.status, json.loads(respuesta.read() or b"null")
+    except urllib.error.HTTPError as error:
+        return error.code, None
+
+
+def cliente(url, operaciones, productos, semilla):
+    """
+    Ejecuta `operaciones` peticiones al azar según MEZCLA y registra lo aceptado.
+
+    Args:
+        url (str): URL base del servidor.
+        operaciones (int): Cantidad de peticiones.
+        productos (list): IDs de productos a vender.
+        semilla (int): Semilla del cliente.
+
+    Returns:
+        dict: Latencias y status por operación, unidades vendidas por producto,
+            variación de saldo esperada e IDs de facturas recibidos.
+    """
+    rng = random.Random(semilla)
+    tipos, pesos = zip(*MEZCLA)
+    resultado = {
+        "latencias": defaultdict(list), "status": Counter(), "aceptadas": Counter(),
+        "vendidos": Counter(), "variacion_saldo": 0.0, "facturas": [],
+    }
+    mis_ventas = []
+    for _ in range(operaciones):
+        tipo = rng.choices(tipos, pesos)[0]
+        if tipo == "factura" and not mis_ventas:
+            tipo = "venta"
+
+        if tipo == "venta":
+            # Pocos productos muy pedidos: varias ventas compiten por las mismas unidades
+            items = [{"id": pid, "cantidad": rng.randint(1, 3)} for pid in set(rng.sample(productos[:5], 2))]
+            ruta, cuerpo = "/api/ventas/compras", {"items": items, "metodoPago": "efectivo"}
+        elif tipo == "ingreso":
+            ruta, cuerpo = "/api/caja/ingreso", {"total": rng.randint(1, 1000), "descripcion": "Carga"}
+        elif tipo == "pago":
+            ruta, cuerpo = "/api/pagos", {
+                "destinatario": "Proveedor carga", "concepto": "Proveedores", "descripcion": "Carga",
+                "monto": rng.randint(1, 1000), "metodo": "transferencia",
+            }
+        else:
+            ruta, cuerpo = "/api/facturas", {"venta_id": mis_ventas.pop(), "cliente": "Cliente carga"}
+
+        inicio = time.perf_counter()
+        status, datos = _pedir(url, ruta, cuerpo)
+        resultado["latencias"][tipo].append(time.perf_counter() - inicio)
+        resultado["status"][f"{tipo} {status}"] += 1
+        if status != 201:
+            continue
+
+        resultado["aceptadas"][tipo] += 1
+        if tipo == "venta":
+            venta = datos["venta"]
+            mis_ventas.append(venta["id"])
+            resultado["variacion_saldo"] += venta["total"]
+            for item in venta["items"]:
+                resultado["vendidos"][str(item["id"])] += item["cantidad"]
+        elif tipo == "ingreso":
+            resultado["variacion_saldo"] += cuerpo["total"]
+        elif tipo == "pago":
+            resultado["variacion_saldo"] -= cuerpo["monto"]
+        else:
+            resultado["facturas"].append(datos["factura"]["id"])
+    return resultado
+
+
+def proceso_cliente(url, hilos, operaciones, productos, semilla):
+    """Corre `hilos` clientes en paralelo dentro de un proceso y junta sus resultados."""
+    with ThreadPoolExecutor(hilos) as pool:
+        parciales = list(pool.map(
+            lambda i: cliente(url, operaciones, productos, semilla * 1000 + i), range(hilos),
+        ))
+    return _juntar(parciales)
+
+
+def _juntar(parciales):
+    total = {
+        "latencias": defaultdict(list), "status": Counter(), "aceptadas": Counter(),
+        "vendidos": Counter(), "variacion_saldo": 0.0, "facturas": [],
+    }
+    for parcial in parciales:
+        for tipo, latencias in parcial["latencias"].items():
+            total["latencias"][tipo].extend(latencias)
+        total["status"].update(parcial["status"])
+        total["aceptadas"].update(parcial["aceptadas"])
+        total["vendidos"].update(parcial["vendidos"])
+        total["variacion_saldo"] += parcial["variacion_saldo"]
+        total["facturas"].extend(parcial["facturas"])
+    return total
+
+
+def leer_datos(carpeta):
+    """Lee productos, ventas, caja y facturas de `carpeta`/data."""
+    datos = {}
+    for nombre, vacio in (("productos", []), ("ventas", []), ("caja", {"saldo": 0, "movimientos": []}), ("facturas", [])):
+        ruta = os.path.join(carpeta, "data", f"{nombre}.json")
+        if os.path.exists(ruta):
+            with open(ruta, encoding="utf-8") as f:
+                datos[nombre] = json.load(f)
+        else:
+            datos[nombre] = vacio
+    return datos
+
+
+def verificar(inicial, final, resultado):
+    """
+    Compara los datos antes y después de la carga contra las operaciones aceptadas.
+
+    Returns:
+        list: Descripción de cada violación encontrada (vacía si todo es consistente).
+    """
+    violaciones = []
+    aceptadas = resultado["aceptadas"]
+    caja = final["caja"]
+
+    suma = sum(m["monto"] if m["tipo"] == "ingreso" else -m["monto"] for m in caja["movimientos"])
+    if abs(suma - caja["saldo"]) > 0.01:
+        violaciones.append(f"saldo {caja['saldo']} != ingresos - egresos de los movimientos {suma}")
+
+    esperado = inicial["caja"]["saldo"] + resultado["variacion_saldo"]
+    if abs(esperado - caja["saldo"]) > 0.01:
+        violaciones.append(f"saldo {caja['saldo']} != saldo inicial + operaciones aceptadas {esperado}")
+
+    conteos = (
+        ("ventas", len(final["ventas"]) - len(inicial["ventas"]), aceptadas["venta"]),
+        ("movimientos", len(caja["movimientos"]) - len(inicial["caja"]["movimientos"]),
+         aceptadas["venta"] + aceptadas["ingreso"] + aceptadas["pago"]),
+        ("facturas", len(final["facturas"]) - len(inicial["facturas"]), aceptadas["factura"]),
+    )
+    for nombre, nuevos, esperados in conteos:
+        if nuevos != esperados:
+            violaciones.append(f"{nombre}: {nuevos} nuevos en el archivo pero {esperados} aceptados (escrituras perdidas)")
+
+    stock_inicial = {str(p["id"]): p.get("stock", 0) for p in inicial["productos"]}
+    for producto in final["productos"]:
+        pid = str(producto["id"])
+        vendidos = resultado["vendidos"].get(pid, 0)
+        if vendidos > stock_inicial.get(pid, 0):
+            violaciones.append(f"producto {pid}: se vendieron {vendidos} unidades con stock {stock_inicial.get(pid, 0)} (sobreventa)")
+        if producto.get("stock", 0) != stock_inicial.get(pid, 0) - vendidos:
+            violaciones.append(
+                f"producto {pid}: stock {producto.get('stock')} != {stock_inicial.get(pid, 0)} - {vendidos} vendidos"
+            )
+
+    repetidas = [fid for fid, n in Counter(f["id"] for f in final["facturas"]).items() if n > 1]
+    if repetidas:
+        violaciones.append(f"IDs de factura repetidos: {', '.join(sorted(repetidas)[:10])}")
+    repetidas = [fid for fid, n in Counter(resultado["facturas"]).items() if n > 1]
+    if repetidas:
+        violaciones.append(f"el servidor devolvió el mismo ID de factura a varios clientes: {', '.join(sorted(repetidas)[:10])}")
+    return violaciones
+
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def levantar_servidor(carpeta, tipo):
+    """
+    Arranca un servidor sobre `carpeta`/data y espera a que responda.
+
+    Args:
+        carpeta (str): Carpeta de trabajo del servidor (contiene data/).
+        tipo (str): "flask" (servidor de desarrollo con hilos) o "produccion" (servidor.py).
+
+    Returns:
+        tuple: (proceso, url).
+    """
+    puerto = _puerto_libre()
+    entorno = dict(os.environ, PYTHONPATH=RAIZ, CAJA_HOST="127.0.0.1", CAJA_PUERTO=str(puerto))
+    if tipo == "produccion":
+        comando = [sys.executable, os.path.join(RAIZ, "servidor.py")]
+    else:
+        comando = [sys.executable, "-c", f"from app import app; app.run(host='127.0.0.1', port={puerto}, threaded=True)"]
+    proceso = subprocess.Popen(comando, cwd=carpeta, env=entorno, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{puerto}"
+    limite = time.time() + 60
+    while time.time() < limite:
+        if proceso.poll() is not None:
+            raise SystemExit(f"El servidor terminó al arrancar (código {proceso.returncode})")
+        try:
+            urllib.request.urlopen(url + "/api/productos", timeout=2).close()
+            return proceso, url
+        except OSError:
+            time.sleep(0.2)
+    proceso.terminate()
+    raise SystemExit("El servidor no respondió en 60 segundos")
+
+
+def correr(url, carpeta, procesos, hilos, operaciones):
+    """
+    Ejecuta la carga y la verificación.
+
+    Returns:
+        dict: Throughput, latencias, status, aceptadas y violaciones.
+    """
+    inicial = leer_datos(carpeta)
+    productos = [p["id"] for p in inicial["productos"]]
+
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(procesos) as pool:
+        parciales = list(pool.map(
+            proceso_cliente, [url] * procesos, [hilos] * procesos, [operaciones] * procesos,
+            [productos] * procesos, range(1, procesos + 1),
+        ))
+    duracion = time.perf_counter() - inicio
+    resultado = _juntar(parciales)
+
+    violaciones = verificar(inicial, leer_datos(carpeta), resultado)
+    total = sum(resultado["status"].values())
+    return {
+        "clientes": procesos * hilos,
+        "peticiones": total,
+        "duracion_s": round(duracion, 2),
+        "throughput_ops_s": round(total / duracion, 1),
+        "latencias_ms": {
+            tipo: {
+                "p50": round(statistics.median(lat) * 1000, 1),
+                "p95": round(sorted(lat)[int(len(lat) * 0.95)] * 1000, 1),
+            }
+            for tipo, lat in resultado["latencias"].items()
+        },
+        "status": dict(sorted(resultado["status"].items())),
+        "aceptadas": dict(resultado["aceptadas"]),
+        "violaciones": violaciones,
+    }
+
+
+def preparar_datos(carpeta, ventas, stock):
+    """Genera datos sintéticos y deja `stock` unidades en cada producto."""
+    generar(carpeta, ventas)
+    ruta = os.path.join(carpeta, "data", "productos.json")
+    with open(ruta, encoding="utf-8") as f:
+        productos = json.load(f)
+    for producto in productos:
+        producto["stock"] = stock
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(productos, f, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prueba de carga concurrente con verificación de invariantes.")
+    parser.add_argument("--procesos", type=int, default=4, help="Procesos cliente")
+    parser.add_argument("--hilos", type=int, default=8, help="Hilos por proceso")
+    parser.add_argument("--operaciones", type=int, default=25, help="Peticiones por hilo")
+    parser.add_argument("--url", help="Servidor ya levantado (requiere --datos)")
+    parser.add_argument("--datos", help="Carpeta del servidor que contiene data/ (para verificar)")
+    parser.add_argument("--servidor", choices=("flask", "produccion"), default="flask")
+    parser.add_argument("--ventas", type=int, default=1000, help="Ventas de los datos generados")
+    parser.add_argument("--stock", type=int, default=100, help="Stock inicial de cada producto")
+    parser.add_argument("--salida", help="Guardar el resultado en este archivo JSON")
+    args = parser.parse_args()
+
+    if args.url:
+        if not args.datos:
+            parser.error("--url requiere --datos para poder verificar los archivos")
+        resultado = correr(args.url.rstrip("/"), args.datos, args.procesos, args.hilos, args.operaciones)
+    else:
+        with tempfile.TemporaryDirectory() as carpeta:
+            preparar_datos(carpeta, args.ventas, args.stock)
+            proceso, url = levantar_servidor(carpeta, args.servidor)
+            try:
+                resultado = correr(url, carpeta, args.procesos, args.hilos, args.operaciones)
+            finally:
+                proceso.terminate()
+                proceso.wait()
+
+    print(f"{resultado['clientes']} clientes, {resultado['peticiones']} peticiones en {resultado['duracion_s']} s "
+          f"-> {resultado['throughput_ops_s']} ops/s")
+    for tipo, lat in resultado["latencias_ms"].items():
+        print(f"  {tipo:<8} p50 {lat['p50']:>8.1f} ms   p95 {lat['p95']:>8.1f} ms   aceptadas {resultado['aceptadas'].get(tipo, 0)}")
+    print("Status:", ", ".join(f"{k}: {v}" for k, v in resultado["status"].items()))
+    print(f"Violaciones: {len(resultado['violaciones'])}")
+    for violacion in resultado["violaciones"]:
+        print(f"  - {violacion}")
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+    sys.exit(1 if resultado["violaciones"] else 0)
@@ -0,0 +1,178 @@
+"""
+Generador de datos sintéticos para benchmarks: llena una carpeta data/ con productos, ventas,
+movimientos de caja, pagos y facturas con la misma forma que los que crea la API.
+
+Las fechas avanzan en orden (como se registran en la realidad) a lo largo del último año, y
+cada venta tiene su ingreso en caja con el mismo ID. Con la misma semilla se generan siempre
+los mismos datos, así los resultados de distintos commits se pueden comparar.
+
+Los índices (data/indices.json) no se escriben: la app los reconstruye en la primera lectura.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/generador_datos.py <cantidad_de_ventas> <carpeta_destino> [--semilla N]
+
+Ejemplo: `python benchmarks/generador_datos.py 100000 /tmp/caja_100k` crea /tmp/caja_100k/data/.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.utilidades import FORMATO_FECHA, epoch  # noqa: E402
+
+CATEGORIAS = ("Indumentaria", "Calzado", "Accesorios", "Hogar", "Librería")
+TALLES = ("XS", "S", "M", "L", "XL")
+METODOS_VENTA = ("efectivo", "debito", "credito", "transferencia")
+CONCEPTOS_PAGO = ("Proveedores", "Alquiler", "Servicios", "Sueldos", "Impuestos")
+METODOS_PAGO = ("efectivo", "transferencia", "cheque")
+
+
+def tamanios_para(cantidad):
+    """
+    Cantidad de registros de cada tipo para una cantidad de ventas.
+
+    Args:
+        cantidad (int): Ventas a generar.
+
+    Returns:
+        dict: Cantidad de productos, ventas, pagos y facturas.
+    """
+    return {
+        "productos": max(20, min(5000, cantidad // 20)),
+        "ventas": cantidad,
+        "pagos": max(1, cantidad // 10),
+        "facturas": cantidad // 4,
+    }
+
+
+def _fechas(cantidad, rng, dias=365):
+    """Devuelve `cantidad` fechas ordenadas repartidas en los últimos `dias` días."""
+    fin = datetime(2025, 6, 30, 20, 0, 0)
+    inicio = fin - timedelta(days=dias)
+    segundos = sorted(rng.randrange(dias * 86400) for _ in range(cantidad))
+    return [(inicio + timedelta(seconds=s)) for s in segundos]
+
+
+def _uuid(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def generar(directorio, cantidad, semilla=42):
+    """
+    Escribe productos.json, ventas.json, caja.json y facturas.json en `directorio`/data.
+
+    Args:
+        directorio (str): Carpeta donde se crea data/.
+        cantidad (int): Cantidad de ventas (el resto se calcula con tamanios_para).
+        semilla (int): Semilla del generador aleatorio.
+
+    Returns:
+        dict: Cantidad de registros generados de cada tipo.
+    """
+    rng = random.Random(semilla)
+    tamanios = tamanios_para(cantidad)
+    carpeta = os.path.join(directorio, "data")
+    os.makedirs(carpeta, exist_ok=True)
+
+    productos = [
+        {
+            "id": i,
+            "nombre": f"Producto {i}",
+            "descripcion": f"Descripción del producto {i}",
+            "precio": rng.randrange(1000, 100000, 500),
+            # Stock holgado: los benchmarks de escritura siguen vendiendo sin quedarse sin stock
+            "stock": 1_000_000,
+            "categoria": rng.choice(CATEGORIAS),
+            "talle": rng.choice(TALLES),
+            "stock_minimo": rng.randint(1, 10),
+        }
+        for i in range(1, tamanios["productos"] + 1)
+    ]
+
+    # Ventas y pagos comparten la línea de tiempo: se generan juntos y se ordenan por fecha
+    eventos = ["venta"] * tamanios["ventas"] + ["pago"] * tamanios["pagos"]
+    rng.shuffle(eventos)
+    ventas, movimientos = [], []
+    saldo = 0
+    for tipo, fecha in zip(eventos, _fechas(len(eventos), rng)):
+        fecha_str = fecha.strftime(FORMATO_FECHA)
+        fecha_ts = epoch(fecha_str)
+        if tipo == "venta":
+            # Pocos productos concentran la mayoría de las ventas (como en un comercio real)
+            elegidos = {min(int(rng.paretovariate(1.2)), len(productos)) - 1 for _ in range(rng.randint(1, 4))}
+            items = [
+                {
+                    "id": productos[p]["id"],
+                    "nombre": productos[p]["nombre"],
+                    "cantidad": rng.randint(1, 3),
+                    "precio_unitario": productos[p]["precio"],
+                }
+                for p in sorted(elegidos)
+            ]
+            total = sum(it["cantidad"] * it["precio_unitario"] for it in items)
+            metodo = rng.choice(METODOS_VENTA)
+            venta_id = _uuid(rng)
+            ventas.append({
+                "id": venta_id, "items": items, "total": total,
+                "fecha": fecha_str, "fecha_ts": fecha_ts, "metodoPago": metodo,
+            })
+            movimientos.append({
+                "id": venta_id, "tipo": "ingreso", "monto": total, "descripcion": f"Venta #{len(ventas)}",
+                "fecha": fecha_str, "fecha_ts": fecha_ts, "metodo": metodo,
+            })
+            saldo += total
+        else:
+            monto = rng.randrange(5000, 500000, 100)
+            concepto = rng.choice(CONCEPTOS_PAGO)
+            movimientos.append({
+                "id": _uuid(rng), "tipo": "egreso", "origen": "pago", "monto": monto,
+                "descripcion": f"Pago de {concepto.lower()}", "fecha": fecha_str, "fecha_ts": fecha_ts,
+                "detalles": {
+                    "destinatario": f"Proveedor {rng.randint(1, 200)}",
+                    "concepto": concepto,
+                    "metodo": rng.choice(METODOS_PAGO),
+                },
+            })
+            saldo -= monto
+
+    # Se facturan ventas al azar; los IDs siguen el formato FAC-AAAA-MM-NNN por mes
+    posicion_movimiento = {m["id"]: i for i, m in enumerate(movimientos)}
+    facturas, por_mes = [], {}
+    for venta in sorted(rng.sample(ventas, tamanios["facturas"]), key=lambda v: v["fecha_ts"]):
+        mes = venta["fecha"][:7]
+        por_mes[mes] = por_mes.get(mes, 0) + 1
+        factura_id = f"FAC-{mes}-{por_mes[mes]:03d}"
+        facturas.append({
+            "id": factura_id, "fecha": venta["fecha"], "cliente": f"Cliente {rng.randint(1, 5000)}",
+            "venta_id": venta["id"], "items": venta["items"], "total": venta["total"],
+        })
+        movimientos[posicion_movimiento[venta["id"]]]["factura_id"] = factura_id
+
+    archivos = {
+        "productos.json": productos,
+        "ventas.json": ventas,
+        "caja.json": {"saldo": saldo, "movimientos": movimientos},
+        "facturas.json": facturas,
+    }
+    for nombre, datos in archivos.items():
+        with open(os.path.join(carpeta, nombre), "w", encoding="utf-8") as f:
+            json.dump(datos, f, ensure_ascii=False)
+    return tamanios
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera datos sintéticos de Caja Plus.")
+    parser.add_argument("cantidad", type=int, help="Cantidad de ventas (ej: 1000, 100000, 1000000)")
+    parser.add_argument("destino", help="Carpeta donde crear data/ (no usar la del proyecto)")
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+
+    if os.path.exists(os.path.join(args.destino, "data", "caja.json")):
+        parser.error(f"{args.destino}/data ya tiene datos; elegí otra carpeta")
+    print(generar(args.destino, args.cantidad, args.semilla))
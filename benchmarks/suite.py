@@ -0,0 +1,263 @@
+"""
+Suite de benchmarks de la API: mide latencia y throughput de cada endpoint con el test client
+de Flask sobre datos sintéticos (ver generador_datos.py) de distintos tamaños.
+
+Para cada tamaño se genera una carpeta temporal, se hace una pasada de calentamiento (que
+además reconstruye los índices) y se mide cada escenario. Las lecturas se miden con la caché de
+respuestas vacía (el trabajo real del controlador); "ventas (LRU)" y "caja (304)" miden el
+camino cacheado. Las escrituras se miden después, sobre los datos ya cargados.
+
+El resultado se guarda en JSON (con el commit, la versión de Python y la máquina) para
+comparar entre commits:
+
+    python benchmarks/suite.py 1000 10000 100000          # mide y guarda en benchmarks/resultados/
+    python benchmarks/suite.py --comparar base.json nuevo.json
+
+Términos clave:
+- Latencia: Tiempo de una petición. Se informa la media, la mediana (p50) y el percentil 95 (p95).
+- Throughput: Peticiones por segundo que atiende un solo hilo (1 / latencia media).
+- Regresión: Escenario cuya mediana empeoró más que el umbral entre dos resultados.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import app  # noqa: E402
+from generador_datos import generar  # noqa: E402
+from services import cache_service  # noqa: E402
+
+RESULTADOS_DIR = os.path.join(RAIZ, "benchmarks", "resultados")
+UMBRAL_REGRESION = 0.10  # 10% más lento en la mediana
+
+nulo = open(os.devnull, "w")
+
+
+def escenarios(datos):
+    """
+    Arma la lista de escenarios a medir.
+
+    Args:
+        datos (dict): Productos y ventas sin facturar de los datos generados.
+
+    Returns:
+        list: (nombre, peticion(i) -> (método, url, cuerpo), limpiar_cache).
+    """
+    productos = datos["productos"]
+    sin_facturar = datos["sin_facturar"]
+
+    def get(url):
+        return lambda i: ("GET", url, None)
+
+    return [
+        ("GET productos", get("/api/productos?per_page=50"), True),
+        ("GET productos (búsqueda)", get("/api/productos?search=producto 1&per_page=50"), True),
+        ("GET ventas", get("/api/ventas?per_page=50"), True),
+        ("GET ventas (LRU)", get("/api/ventas?per_page=50"), False),
+        ("GET ventas/metricas", get("/api/ventas/metricas"), True),
+        ("GET caja", get("/api/caja/?per_page=50"), True),
+        ("GET caja (304)", lambda i: ("GET", "/api/caja/?per_page=50", None), None),
+        ("GET caja/saldo", get("/api/caja/saldo?fecha=2025-03-31"), True),
+        ("GET caja/conciliacion", get("/api/caja/conciliacion"), True),
+        ("GET caja/cierre", get("/api/caja/cierre?fecha=2025-06-30"), True),
+        ("GET pagos", get("/api/pagos?per_page=50"), True),
+        ("POST ventas/compras", lambda i: ("POST", "/api/ventas/compras", {
+            "items": [{"id": productos[i % len(productos)]["id"], "cantidad": 1}], "metodoPago": "efectivo",
+        }), True),
+        ("POST caja/ingreso", lambda i: ("POST", "/api/caja/ingreso", {"total": 1000, "descripcion": f"Bench {i}"}), True),
+        ("POST caja/egreso", lambda i: ("POST", "/api/caja/egreso", {"total": 500, "descripcion": f"Bench {i}"}), True),
+        ("POST pagos", lambda i: ("POST", "/api/pagos", {
+            "destinatario": "Proveedor bench", "concepto": "Proveedores", "descripcion": f"Bench {i}",
+            "monto": 2500, "metodo": "transferencia",
+        }), True),
+        ("POST facturas", lambda i: ("POST", "/api/facturas", {
+            "venta_id": sin_facturar[i % len(sin_facturar)], "cliente": "Cliente bench",
+        }), True),
+    ]
+
+
+def medir(client, peticion, limpiar_cache, repeticiones, tiempo_max):
+    """
+    Ejecuta un escenario hasta `repeticiones` veces (o hasta pasar `tiempo_max` segundos,
+    con un mínimo de 3) y devuelve sus estadísticas.
+
+    Args:
+        client (FlaskClient): Test client de la app.
+        peticion (callable): Recibe el número de repetición y devuelve (método, url, cuerpo).
+        limpiar_cache (bool | None): True vacía la caché de respuestas antes de cada petición.
+            None envía el ETag de la respuesta anterior (mide el 304).
+        repeticiones (int): Máximo de repeticiones.
+        tiempo_max (float): Segundos máximos por escenario.
+
+    Returns:
+        dict: n, media, p50, p95 y mínimo en ms, y peticiones por segundo.
+    """
+    tiempos = []
+    headers = {}
+    if limpiar_cache is None:
+        metodo, url, _ = peticion(0)
+        headers["If-None-Match"] = client.open(url, method=metodo).headers["ETag"]
+
+    inicio_total = time.perf_counter()
+    for i in range(repeticiones):
+        metodo, url, cuerpo = peticion(i)
+        if limpiar_cache:
+            cache_service.limpiar()
+        # Algunos controladores imprimen el cuerpo recibido: se descarta para no ensuciar la salida
+        with contextlib.redirect_stdout(nulo):
+            inicio = time.perf_counter()
+            respuesta = client.open(url, method=metodo, json=cuerpo, headers=headers)
+            tiempos.append(time.perf_counter() - inicio)
+        if respuesta.status_code >= 400:
+            raise RuntimeError(f"{metodo} {url} respondió {respuesta.status_code}: {respuesta.get_data(as_text=True)[:200]}")
+        if len(tiempos) >= 3 and time.perf_counter() - inicio_total > tiempo_max:
+            break
+
+    tiempos.sort()
+    return {
+        "n": len(tiempos),
+        "media_ms": round(statistics.fmean(tiempos) * 1000, 3),
+        "p50_ms": round(statistics.median(tiempos) * 1000, 3),
+        "p95_ms": round(tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))] * 1000, 3),
+        "min_ms": round(tiempos[0] * 1000, 3),
+        "ops_s": round(len(tiempos) / sum(tiempos), 1),
+    }
+
+
+def correr_tamanio(cantidad, repeticiones, tiempo_max, semilla):
+    """
+    Genera datos de `cantidad` ventas en una carpeta temporal y mide todos los escenarios.
+
+    Returns:
+        dict: Registros generados, segundos de calentamiento y estadísticas por escenario.
+    """
+    anterior = os.getcwd()
+    with tempfile.TemporaryDirectory() as directorio:
+        tamanios = generar(directorio, cantidad, semilla)
+        os.chdir(directorio)
+        try:
+            cache_service.limpiar()
+            with open("data/productos.json", encoding="utf-8") as f:
+                productos = json.load(f)
+            with open("data/ventas.json", encoding="utf-8") as f:
+                ventas = json.load(f)
+            with open("data/facturas.json", encoding="utf-8") as f:
+                facturadas = {factura["venta_id"] for factura in json.load(f)}
+            datos = {
+                "productos": productos,
+                "sin_facturar": [v["id"] for v in ventas if v["id"] not in facturadas][:repeticiones],
+            }
+            del ventas
+
+            client = app.test_client()
+            lista = escenarios(datos)
+            inicio = time.perf_counter()
+            for _, peticion, limpiar_cache in lista:
+                metodo, url, _ = peticion(0)
+                if metodo == "GET":
+                    client.get(url)
+            calentamiento = time.perf_counter() - inicio
+
+            resultados = {}
+            for nombre, peticion, limpiar_cache in lista:
+                resultados[nombre] = medir(client, peticion, limpiar_cache, repeticiones, tiempo_max)
+                print(f"  {nombre:<28} p50 {resultados[nombre]['p50_ms']:>10.2f} ms   "
+                      f"p95 {resultados[nombre]['p95_ms']:>10.2f} ms   {resultados[nombre]['ops_s']:>9.1f} ops/s")
+        finally:
+            os.chdir(anterior)
+            cache_service.limpiar()
+    return {"registros": tamanios, "calentamiento_s": round(calentamiento, 3), "escenarios": resultados}
+
+
+def commit_actual():
+    """Devuelve el hash corto del commit actual (o "desconocido" fuera de git)."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocido"
+
+
+def comparar(base, nuevo, umbral=UMBRAL_REGRESION):
+    """
+    Compara dos resultados escenario por escenario (mediana) e imprime la variación.
+
+    Args:
+        base (dict): Resultado de referencia.
+        nuevo (dict): Resultado a evaluar.
+        umbral (float): Empeoramiento relativo a partir del cual se marca regresión.
+
+    Returns:
+        int: Cantidad de regresiones.
+    """
+    regresiones = 0
+    print(f"Base: {base['commit']} ({base['fecha']})  ->  Nuevo: {nuevo['commit']} ({nuevo['fecha']})")
+    for cantidad, medicion in nuevo["tamanios"].items():
+        referencia = base["tamanios"].get(cantidad)
+        if referencia is None:
+            continue
+        print(f"\n{cantidad} ventas:")
+        for nombre, stats in medicion["escenarios"].items():
+            anterior = referencia["escenarios"].get(nombre)
+            if anterior is None:
+                print(f"  {nombre:<28} (nuevo) p50 {stats['p50_ms']:.2f} ms")
+                continue
+            variacion = stats["p50_ms"] / anterior["p50_ms"] - 1
+            marca = "  REGRESIÓN" if variacion > umbral else ""
+            regresiones += bool(marca)
+            print(f"  {nombre:<28} {anterior['p50_ms']:>10.2f} -> {stats['p50_ms']:>10.2f} ms  ({variacion:+.0%}){marca}")
+    return regresiones
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks de los endpoints de Caja Plus.")
+    parser.add_argument("cantidades", nargs="*", type=int, default=[1000, 10000], help="Cantidades de ventas a generar")
+    parser.add_argument("--repeticiones", type=int, default=30, help="Máximo de peticiones por escenario")
+    parser.add_argument("--tiempo-max", type=float, default=5.0, help="Segundos máximos por escenario")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--salida", help="Archivo JSON de resultados (por defecto en benchmarks/resultados/)")
+    parser.add_argument("--comparar", nargs=2, metavar=("BASE", "NUEVO"), help="Comparar dos resultados guardados")
+    parser.add_argument("--umbral", type=float, default=UMBRAL_REGRESION)
+    args = parser.parse_args()
+
+    if args.comparar:
+        with open(args.comparar[0], encoding="utf-8") as f:
+            base = json.load(f)
+        with open(args.comparar[1], encoding="utf-8") as f:
+            nuevo = json.load(f)
+        regresiones = comparar(base, nuevo, args.umbral)
+        print(f"\n{regresiones} regresiones (umbral {args.umbral:.0%})")
+        sys.exit(1 if regresiones else 0)
+
+    resultado = {
+        "commit": commit_actual(),
+        "fecha": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "maquina": f"{platform.system()} {platform.machine()} ({os.cpu_count()} CPUs)",
+        "parametros": {"repeticiones": args.repeticiones, "tiempo_max": args.tiempo_max, "semilla": args.semilla},
+        "tamanios": {},
+    }
+    for cantidad in args.cantidades:
+        print(f"\n{cantidad} ventas:")
+        resultado["tamanios"][str(cantidad)] = correr_tamanio(cantidad, args.repeticiones, args.tiempo_max, args.semilla)
+
+    salida = args.salida or os.path.join(
+        RESULTADOS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{resultado['commit']}.json",
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados guardados en {salida}")
@@ -0,0 +1,34 @@
+"""
+Configuración del servidor de Caja Plus.
+
+Los valores se leen de variables de entorno, así se pueden cambiar al desplegar sin tocar
+el código. Si una variable no está definida se usa el valor por defecto.
+
+Términos clave:
+- Variable de entorno: Valor que se define en el sistema operativo o en la terminal antes de
+  arrancar el programa (ej: `CAJA_WORKERS=4 python servidor.py`).
+- Worker: Proceso independiente que atiende peticiones. Más workers aprovechan más núcleos.
+- Thread (hilo): Cada worker puede atender varias peticiones a la vez con varios hilos.
+"""
+
+import os
+
+HOST = os.environ.get("CAJA_HOST", "0.0.0.0")
+PUERTO = int(os.environ.get("CAJA_PUERTO", "5000"))
+
+# Por defecto un worker por núcleo (máximo 4: los datos son archivos JSON y las escrituras se serializan)
+WORKERS = int(os.environ.get("CAJA_WORKERS", str(min(4, os.cpu_count() or 1))))
+THREADS = int(os.environ.get("CAJA_THREADS", "8"))
+# "wsgi": gunicorn/waitress con workers e hilos. "asgi": un proceso con event loop (asgi.py + uvicorn)
+MODO = os.environ.get("CAJA_MODO", "wsgi").lower()
+TIMEOUT = int(os.environ.get("CAJA_TIMEOUT", "60"))  # segundos antes de reiniciar un worker colgado
+# "1" activa la medición de latencias e I/O expuesta en GET /metrics (ver services/instrumentacion_service.py)
+INSTRUMENTACION = os.environ.get("CAJA_INSTRUMENTACION", "0") == "1"
+# "1" habilita el perfilado a pedido de peticiones (ver services/perfilado_service.py)
+PERFILADO = os.environ.get("CAJA_PERFILADO", "0") == "1"
+PERFILADO_TOKEN = os.environ.get("CAJA_PERFILADO_TOKEN", "")  # Si se define, se exige en X-Perfilado-Token
+# "1" guarda ventas y caja en una partición por mes (ver services/particiones_service.py)
+PARTICIONES = os.environ.get("CAJA_PARTICIONES", "0") == "1"
+PARTICIONES_COMPRIMIR = os.environ.get("CAJA_PARTICIONES_COMPRIMIR", "0") == "1"  # gzip en meses cerrados
+# Meses que quedan "calientes" al archivar (el actual y el anterior); los más viejos van al archivo
+ARCHIVO_MESES_CALIENTES = int(os.environ.get("CAJA_ARCHIVO_MESES_CALIENTES", "2"))
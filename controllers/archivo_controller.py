@@ -0,0 +1,47 @@
+"""
+Controlador del archivo de períodos cerrados (ver services/archivo_service.py).
+
+- Consultar qué meses de ventas y caja están calientes y cuáles archivados.
+- Archivar los meses cerrados (lo mismo que `python -m services.archivo_service` desde un cron).
+
+Términos clave:
+- Archivar: Mover un mes cerrado a almacenamiento comprimido, con su resumen precalculado.
+  Sus datos se siguen viendo en los mismos endpoints.
+"""
+
+from flask import jsonify, request
+from services import archivo_service, particiones_service
+
+
+def obtener_archivo():
+    """
+    Endpoint para consultar el estado del archivo: cada mes de ventas y caja, con su cantidad
+    de registros y si está archivado.
+
+    Returns:
+        tuple: (json, status_code)
+    """
+    if not particiones_service.habilitado():
+        return jsonify({"error": "El archivo requiere particiones (definir CAJA_PARTICIONES=1)"}), 404
+    return jsonify({"hasta_sugerido": archivo_service.mes_limite(), **archivo_service.estado()}), 200
+
+
+def archivar_periodos():
+    """
+    Endpoint para archivar los meses cerrados de ventas y caja.
+    Recibe el último mes a archivar en ?hasta=YYYY-MM (o {"hasta": ...} en el body); por
+    defecto deja sin archivar los últimos CAJA_ARCHIVO_MESES_CALIENTES meses.
+
+    Returns:
+        tuple: (json, status_code)
+    """
+    if not particiones_service.habilitado():
+        return jsonify({"error": "El archivo requiere particiones (definir CAJA_PARTICIONES=1)"}), 404
+
+    data = request.get_json(silent=True) or {}
+    hasta = request.args.get("hasta") or data.get("hasta")
+    if hasta is not None and not archivo_service.mes_valido(hasta):
+        return jsonify({"error": "Mes inválido. Usar el formato YYYY-MM"}), 400
+
+    resultado = archivo_service.archivar(hasta)
+    return jsonify({"message": "Archivo actualizado", **resultado}), 200
@@ -16,18 +16,32 @@ Funciones principales:
 - obtener_caja: Devuelve el estado actual de la caja por API.
 - registrar_ingreso: Agrega un ingreso (entrada de dinero) a la caja.
 - registrar_egreso: Agrega un egreso (salida de dinero) a la caja.
+- agregar_movimiento / quitar_movimiento / cambiar_monto_movimiento: Únicas funciones que
+  modifican movimientos y saldo; mantienen al día los checkpoints de saldo.
+- conciliar_caja / obtener_saldo_a_fecha: Verificación del saldo y saldo histórico por día.
 """
 
 from flask import jsonify, request
 import json
 import os
 import uuid
+from collections import Counter
 from datetime import datetime
+from services.utilidades import ahora_str, epoch, epoch_de
+from services.indices_service import cargar_indices, guardar_indices, localizar, quitar_posicion, desindexar_pago
+from services import saldos_service, cierres_service, revisiones_service
+from services.idempotencia_service import idempotente
+from services.eventos_service import publicar
+from services.cache_service import cacheable, incrementar_version
+from services.persistencia_service import escribir_json
+from services.instrumentacion_service import medir_io
+from services import particiones_service
 
 CAJA_FILE = "data/caja.json"
 
 # ---------- Utilidades de persistencia ----------
 
+@medir_io("caja", CAJA_FILE)
 def cargar_caja():
     """
     Lee y retorna el estado actual de la caja desde el archivo JSON.
@@ -35,6 +49,9 @@ def cargar_caja():
     Returns:
         dict: Estado actual de la caja (saldo y movimientos).
     """
+    if particiones_service.habilitado():
+        return particiones_service.caja.cargar()
+
     if not os.path.exists(CAJA_FILE):
         with open(CAJA_FILE, "w") as f:
             json.dump({"saldo": 0, "movimientos": []}, f)
@@ -43,6 +60,7 @@ def cargar_caja():
     with open(CAJA_FILE, "r", encoding="utf-8") as f:
         return json.load(f)
 
+@medir_io("caja", CAJA_FILE)
 def guardar_caja(caja):
     """
     Guarda el estado actual de la caja en el archivo JSON.
@@ -50,11 +68,123 @@ def guardar_caja(caja):
     Args:
         caja (dict): Estado de la caja a guardar.
     """
-    with open(CAJA_FILE, "w", encoding="utf-8") as f:
-        json.dump(caja, f, indent=2, ensure_ascii=False)
+    if particiones_service.habilitado():
+        particiones_service.caja.guardar(caja)
+    else:
+        escribir_json(CAJA_FILE, caja, indent=2, ensure_ascii=False)
+    incrementar_version("caja")
+
+def leer_caja():
+    """
+    Devuelve la caja para consultas de solo lectura. Con particiones, los movimientos son
+    una vista que lee cada mes recién cuando se accede a él; si no, es igual a cargar_caja().
+
+    Returns:
+        dict: Estado de la caja (no se debe modificar ni guardar).
+    """
+    if particiones_service.habilitado():
+        return particiones_service.caja.leer()
+    return cargar_caja()
+
+def indexar_movimiento(movimiento_id, posicion):
+    """
+    Registra la posición de un movimiento nuevo en el índice de movimientos.
+
+    Args:
+        movimiento_id (str): ID del movimiento.
+        posicion (int): Posición del movimiento dentro de caja["movimientos"].
+    """
+    indices = cargar_indices()
+    indices["movimientos"][movimiento_id] = posicion
+    guardar_indices(indices)
+
+# ---------- Operaciones sobre movimientos ----------
+
+def movimientos_por_tipo(caja):
+    """
+    Devuelve la cantidad de movimientos de cada tipo, que la caja guarda y mantiene al agregar
+    o quitar movimientos. Si falta (cajas creadas antes), se cuenta una única vez.
+
+    Args:
+        caja (dict): Estado de la caja (se modifica en el lugar).
+
+    Returns:
+        dict: {tipo: cantidad}, ej. {"ingreso": 12, "egreso": 3}.
+    """
+    if "movimientos_por_tipo" not in caja:
+        caja["movimientos_por_tipo"] = dict(Counter(m.get("tipo") for m in caja.get("movimientos", [])))
+    return caja["movimientos_por_tipo"]
+
+def agregar_movimiento(caja, movimiento):
+    """
+    Agrega un movimiento al final de la caja y actualiza el saldo, los checkpoints
+    y el cierre del día por método de pago.
+    Si es el primer movimiento del día, antes se cierra el día anterior (checkpoint).
+
+    Args:
+        caja (dict): Estado de la caja (se modifica en el lugar).
+        movimiento (dict): Movimiento a agregar (ingreso o egreso).
+
+    Returns:
+        int: Posición del movimiento dentro de caja["movimientos"].
+    """
+    saldos_service.cerrar_dias_anteriores(caja)
+    revisiones_service.marcar("caja", movimiento)
+    variacion = saldos_service.importe(movimiento)
+    caja["saldo"] += variacion
+    conteos = movimientos_por_tipo(caja)
+    caja["movimientos"].append(movimiento)
+    conteos[movimiento.get("tipo")] = conteos.get(movimiento.get("tipo"), 0) + 1
+    saldos_service.aplicar_variacion(caja, movimiento.get("fecha", ""), variacion)
+    cierres_service.registrar(movimiento, movimiento.get("monto", 0), 1)
+    return len(caja["movimientos"]) - 1
+
+def quitar_movimiento(caja, posicion):
+    """
+    Quita el movimiento ubicado en una posición y revierte su efecto en el saldo,
+    los checkpoints y el cierre del día.
+
+    Args:
+        caja (dict): Estado de la caja (se modifica en el lugar).
+        posicion (int): Posición del movimiento a quitar.
+
+    Returns:
+        dict: Movimiento quitado.
+    """
+    conteos = movimientos_por_tipo(caja)
+    movimiento = caja["movimientos"].pop(posicion)
+    conteos[movimiento.get("tipo")] = conteos.get(movimiento.get("tipo"), 0) - 1
+    revisiones_service.borrar("caja", movimiento)
+    variacion = -saldos_service.importe(movimiento)
+    caja["saldo"] += variacion
+    saldos_service.aplicar_variacion(caja, movimiento.get("fecha", ""), variacion, posicion)
+    saldos_service.desplazar_checkpoints(caja, posicion)
+    cierres_service.registrar(movimiento, -movimiento.get("monto", 0), -1)
+    return movimiento
+
+def cambiar_monto_movimiento(caja, posicion, monto):
+    """
+    Cambia el monto de un movimiento existente y ajusta el saldo, los checkpoints
+    y el cierre del día por la diferencia.
+
+    Args:
+        caja (dict): Estado de la caja (se modifica en el lugar).
+        posicion (int): Posición del movimiento.
+        monto (float): Nuevo monto.
+    """
+    movimiento = caja["movimientos"][posicion]
+    anterior = saldos_service.importe(movimiento)
+    monto_anterior = movimiento.get("monto", 0)
+    movimiento["monto"] = monto
+    revisiones_service.marcar("caja", movimiento)
+    variacion = saldos_service.importe(movimiento) - anterior
+    caja["saldo"] += variacion
+    saldos_service.aplicar_variacion(caja, movimiento.get("fecha", ""), variacion, posicion)
+    cierres_service.registrar(movimiento, monto - monto_anterior, 0)
 
 # ---------- Endpoints (API) ----------
 
+@cacheable("caja")
 def obtener_caja():
     """
     Devuelve el estado actual de la caja (saldo y movimientos) vía API.
@@ -62,23 +192,6 @@ def obtener_caja():
     Returns:
         tuple: (json, status_code)
     """
-    caja = cargar_caja()
-    movimientos = caja.get("movimientos", [])
-    
-    # ORDENAR POR FECHA DESCENDENTE
-    try:
-        movimientos.sort(
-            key=lambda m: datetime.strptime(m['fecha'], "%Y-%m-%d %H:%M:%S"),
-            reverse=True
-        )
-    except Exception:
-        pass
-    
-    # FILTRO POR TIPO
-    tipo = request.args.get("tipo")
-    if tipo in ("ingreso", "egreso"):
-        movimientos = [m for m in movimientos if m.get("tipo") == tipo]
-    
     # PAGINACION
     try:
         page = int(request.args.get("page", 1))
@@ -86,11 +199,33 @@ def obtener_caja():
     except Exception:
         page = 1
         per_page = 10
-
-    total = len(movimientos)
     start = (page - 1) * per_page
     end = start + per_page
-    movimientos_paginados = movimientos[start:end]
+
+    tipo = request.args.get("tipo")
+    if tipo not in ("ingreso", "egreso"):
+        tipo = None
+
+    caja = leer_caja()
+    movimientos = caja.get("movimientos", [])
+
+    if isinstance(movimientos, particiones_service.VistaParticionada):
+        # Con particiones se abren solo los meses que pueden tener los movimientos más recientes
+        recientes, total = movimientos.mas_recientes(max(end, 0), tipo)
+        movimientos_paginados = recientes[start:end]
+    else:
+        # ORDENAR POR FECHA DESCENDENTE (por epoch entero, sin parsear si ya está guardado)
+        try:
+            movimientos.sort(key=epoch_de, reverse=True)
+        except Exception:
+            pass
+
+        # FILTRO POR TIPO
+        if tipo:
+            movimientos = [m for m in movimientos if m.get("tipo") == tipo]
+
+        total = len(movimientos)
+        movimientos_paginados = movimientos[start:end]
 
     # Devuelve solo la página de movimientos pero también el saldo total
     return jsonify({
@@ -102,6 +237,7 @@ def obtener_caja():
         "total_pages": (total + per_page - 1) // per_page
     }), 200
 
+@idempotente
 def registrar_ingreso():
     """
     Registra un ingreso de dinero en la caja.
@@ -113,7 +249,6 @@ def registrar_ingreso():
         tuple: (json, status_code)
     """
     data = request.get_json()
-    print(data)
     if not data or "total" not in data or "descripcion" not in data:
         return jsonify({"error": "Datos inválidos"}), 400
 
@@ -126,18 +261,23 @@ def registrar_ingreso():
 
     caja = cargar_caja()
 
-    caja["saldo"] += monto
-    caja["movimientos"].append({
+    fecha = ahora_str()
+    ingreso = {
         "id": str(uuid.uuid4()),  # ID único para el movimiento
         "tipo": "ingreso",
         "monto": monto,
         "descripcion": f"Venta #{data['descripcion']}",
-        "fecha":  datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    })
+        "fecha": fecha,
+        "fecha_ts": epoch(fecha)
+    }
+    posicion = agregar_movimiento(caja, ingreso)
     guardar_caja(caja)
+    indexar_movimiento(ingreso["id"], posicion)
+    publicar("movimiento_creado", ingreso)
 
     return jsonify({"message": "Ingreso registrado correctamente"}), 201
 
+@idempotente
 def registrar_egreso():
     """
     Registra un egreso de dinero en la caja.
@@ -164,12 +304,14 @@ def registrar_egreso():
 
     caja = cargar_caja()
 
+    fecha = ahora_str()
     egreso = {
         "id": str(uuid.uuid4()),
         "tipo": "egreso",
         "monto": monto,
         "descripcion": data["descripcion"],
-        "fecha": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        "fecha": fecha,
+        "fecha_ts": epoch(fecha)
     }
 
     # Detalles extra: destinatario, concepto, método (si están presentes)
@@ -177,9 +319,10 @@ def registrar_egreso():
     if detalles:
         egreso["detalles"] = detalles
 
-    caja["saldo"] -= monto  # Permite saldo negativo (egreso mayor al saldo actual)
-    caja["movimientos"].append(egreso)
+    posicion = agregar_movimiento(caja, egreso)  # Permite saldo negativo (egreso mayor al saldo actual)
     guardar_caja(caja)
+    indexar_movimiento(egreso["id"], posicion)
+    publicar("movimiento_creado", egreso)
 
     return jsonify({"message": "Egreso registrado correctamente"}), 201
 
@@ -191,18 +334,63 @@ def eliminar_movimiento(id):
     """
     caja = cargar_caja()
     movimientos = caja.get("movimientos", [])
-    movimiento = next((m for m in movimientos if m["id"] == id), None)
+    indices = cargar_indices()
 
-    if not movimiento:
+    posicion = localizar(movimientos, indices["movimientos"], id)
+    if posicion is None:
         return jsonify({"error": "Movimiento no encontrado"}), 404
 
-    # Ajustar el saldo antes de eliminar
-    if movimiento["tipo"] == "ingreso":
-        caja["saldo"] -= movimiento["monto"]
-    elif movimiento["tipo"] == "egreso":
-        caja["saldo"] += movimiento["monto"]
-
-    # Filtrar fuera el movimiento
-    caja["movimientos"] = [m for m in movimientos if m["id"] != id]
+    # Quitar el movimiento (ajusta el saldo según el tipo y los checkpoints)
+    movimiento = quitar_movimiento(caja, posicion)
     guardar_caja(caja)
+
+    # Actualizar índices (posiciones y vínculo con la venta, si lo tenía)
+    quitar_posicion(indices["movimientos"], id, posicion)
+    # El ingreso de una venta tiene el mismo ID que la venta
+    if indices["movimiento_de_venta"].get(id) == id:
+        del indices["movimiento_de_venta"][id]
+    if movimiento.get("origen") == "pago":
+        desindexar_pago(indices, movimiento)
+    guardar_indices(indices)
+    publicar("movimiento_eliminado", {"id": id, "tipo": movimiento.get("tipo")})
     return jsonify({"message": "Movimiento eliminado correctamente"}), 200
+
+
+def conciliar_caja():
+    """
+    Verifica el saldo de la caja sumando solo los movimientos posteriores al último checkpoint.
+    Con ?completa=1 suma todos los movimientos (auditoría completa).
+
+    Returns:
+        tuple: (json con saldo guardado, saldo calculado y diferencia, status_code)
+    """
+    completa = request.args.get("completa", "").lower() in ("1", "true", "si")
+    return jsonify(saldos_service.conciliar(cargar_caja(), completa=completa)), 200
+
+def crear_checkpoint_caja():
+    """
+    Crea a pedido un checkpoint (cierre) del saldo con los movimientos registrados hasta ahora.
+
+    Returns:
+        tuple: (json con el checkpoint creado, status_code)
+    """
+    caja = cargar_caja()
+    checkpoint = saldos_service.crear_checkpoint(caja, datetime.now().strftime("%Y-%m-%d"))
+    guardar_caja(caja)
+    return jsonify({"message": "Checkpoint creado correctamente", "checkpoint": checkpoint}), 201
+
+def obtener_saldo_a_fecha():
+    """
+    Devuelve el saldo de la caja al cierre del día indicado en ?fecha=YYYY-MM-DD.
+
+    Returns:
+        tuple: (json con la fecha y el saldo, status_code)
+    """
+    fecha = request.args.get("fecha", "")
+    try:
+        datetime.strptime(fecha, "%Y-%m-%d")
+    except ValueError:
+        return jsonify({"error": "Fecha inválida. Usar el formato YYYY-MM-DD"}), 400
+
+    saldo = saldos_service.saldo_a_fecha(cargar_caja(), fecha)
+    return jsonify({"fecha": fecha, "saldo": round(saldo, 2)}), 200
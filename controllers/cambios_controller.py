@@ -0,0 +1,47 @@
+"""
+Controlador del registro de cambios (ver services/eventos_service.py).
+
+Un consumidor incremental (métricas, alertas de stock, facturación, sincronización externa)
+guarda el último "seq" que procesó y llama a GET /api/cambios?desde=<seq>. Recibe los eventos
+nuevos y el "hasta" a usar en la próxima llamada.
+
+Términos clave:
+- Long-poll: Si no hay eventos nuevos, la respuesta se demora hasta ?espera=<segundos>
+  (máximo 30) esperando que llegue alguno. Con espera=0 responde enseguida.
+"""
+
+import math
+
+from flask import jsonify, request
+from services import eventos_service
+
+
+def obtener_cambios():
+    """
+    Endpoint para leer los eventos posteriores a un número de secuencia.
+
+    Parámetros (query string):
+    - desde: Último seq procesado (por defecto 0, desde el principio).
+    - espera: Segundos a esperar si no hay eventos (por defecto 25; 0 para no esperar).
+    - limite: Máximo de eventos por respuesta (1 a 1000, por defecto 100).
+    - tipos: Tipos separados por coma (ej: "venta_creada,stock_cambiado"). Por defecto, todos.
+
+    Returns:
+        tuple: (json, status_code)
+    """
+    try:
+        desde = int(request.args.get("desde", 0))
+        espera = float(request.args.get("espera", 25))
+        limite = int(request.args.get("limite", 100))
+    except ValueError:
+        return jsonify({"error": "desde, espera y limite deben ser números"}), 400
+    # float() acepta "nan" e "inf": NaN pasa cualquier comparación y dejaría el long-poll sin vencimiento
+    if desde < 0 or not math.isfinite(espera) or espera < 0 or not 1 <= limite <= 1000:
+        return jsonify({"error": "Parámetros fuera de rango (desde >= 0, espera >= 0, limite entre 1 y 1000)"}), 400
+
+    tipos = {t.strip() for t in request.args.get("tipos", "").split(",") if t.strip()} or None
+    if tipos and not tipos <= set(eventos_service.TIPOS):
+        return jsonify({"error": "Tipo de evento desconocido", "tipos": list(eventos_service.TIPOS)}), 400
+
+    eventos, hasta = eventos_service.esperar(desde, espera, limite, tipos)
+    return jsonify({"cambios": eventos, "desde": desde, "hasta": hasta}), 200
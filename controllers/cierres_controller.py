@@ -0,0 +1,65 @@
+"""
+Controlador de cierres de caja diarios (reporte de fin de día por método de pago).
+
+Términos clave:
+- Cierre de caja: Totales de ingresos y egresos de un día, separados por método de pago
+  (efectivo, tarjeta, transferencia, etc.).
+- Reporte precalculado: Los totales se acumulan al registrar cada venta o pago
+  (ver services/cierres_service.py), por eso consultar el reporte no recorre los datos.
+
+Funciones principales:
+- obtener_cierre: Devuelve el reporte de cierre de un día.
+- cerrar_caja: Cierra (archiva) el día indicado, por defecto el actual.
+"""
+
+from flask import jsonify, request
+from datetime import datetime
+from services import cierres_service
+
+
+def _dia_del_request():
+    """
+    Lee el día de ?fecha=YYYY-MM-DD (o del JSON del body); por defecto, hoy.
+
+    Returns:
+        str | None: Día en formato YYYY-MM-DD, o None si el formato es inválido.
+    """
+    data = request.get_json(silent=True) or {}
+    dia = request.args.get("fecha") or data.get("fecha") or datetime.now().strftime("%Y-%m-%d")
+    try:
+        datetime.strptime(dia, "%Y-%m-%d")
+    except (TypeError, ValueError):
+        return None
+    return dia
+
+
+def obtener_cierre():
+    """
+    Endpoint para consultar el cierre de caja de un día (por defecto, hoy).
+
+    Returns:
+        Response: JSON con totales por método de pago y totales generales.
+    """
+    dia = _dia_del_request()
+    if not dia:
+        return jsonify({"error": "Fecha inválida. Usar el formato YYYY-MM-DD"}), 400
+    return jsonify(cierres_service.reporte_del_dia(dia)), 200
+
+
+def cerrar_caja():
+    """
+    Endpoint para cerrar la caja de un día (por defecto, hoy).
+    El resumen queda archivado y ya no se modifica; los movimientos que lleguen
+    después con esa fecha se archivan como ajuste.
+
+    Returns:
+        Response: JSON con el reporte del día cerrado.
+    """
+    dia = _dia_del_request()
+    if not dia:
+        return jsonify({"error": "Fecha inválida. Usar el formato YYYY-MM-DD"}), 400
+
+    if not cierres_service.cerrar_dia(dia):
+        return jsonify({"error": "No hay movimientos abiertos para ese día"}), 404
+
+    return jsonify({"message": "Caja cerrada correctamente", "cierre": cierres_service.reporte_del_dia(dia)}), 201
@@ -8,21 +8,28 @@ Términos clave:
 - Controller: Se encarga de la lógica asociada a la generación y almacenamiento de facturas.
 """
 
-from flask import jsonify, request
-import json, os
+from flask import jsonify, request, Response, stream_with_context
+import json, os, tempfile, zipfile
 from datetime import datetime
-from reportlab.lib import colors
-from reportlab.lib.units import mm
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+# reportlab se importa dentro de las funciones que dibujan PDFs: es pesado de cargar
+# y la mayoría de las peticiones (y procesos) nunca lo usan
 from flask import send_from_directory
 from controllers.caja_controller import cargar_caja, guardar_caja
+from services.indices_service import cargar_indices, guardar_indices, localizar, registrar_factura_en_indices
+from services.idempotencia_service import idempotente
+from services.eventos_service import publicar
+from services.cache_service import incrementar_version
+from services.persistencia_service import escribir_json
+from services.instrumentacion_service import medir_io, medir_pdf
+from services import particiones_service, revisiones_service
 
 FACTURAS_FILE = "data/facturas.json"
 VENTAS_FILE = "data/ventas.json"
 PDF_DIR = "data/facturas_pdf"
+TAMANIO_BLOQUE = 64 * 1024  # Bytes que se envían por cada fragmento de la descarga
 
 
+@medir_io("facturas", FACTURAS_FILE)
 def cargar_facturas():
     """
     Carga todas las facturas desde el archivo JSON.
@@ -39,6 +46,7 @@ def cargar_facturas():
         return json.load(f)
 
 
+@medir_io("facturas", FACTURAS_FILE)
 def guardar_facturas(facturas):
     """
     Guarda la lista de facturas en el archivo JSON.
@@ -46,10 +54,11 @@ def guardar_facturas(facturas):
     Args:
         facturas (list): Lista de facturas a guardar.
     """
-    with open(FACTURAS_FILE, "w", encoding="utf-8") as f:
-        json.dump(facturas, f, indent=2, ensure_ascii=False)
+    escribir_json(FACTURAS_FILE, facturas, indent=2, ensure_ascii=False)
+    incrementar_version("facturas")
 
 
+@medir_io("ventas", VENTAS_FILE)
 def cargar_ventas():
     """
     Carga todas las ventas desde el archivo JSON.
@@ -58,6 +67,8 @@ def cargar_ventas():
     Returns:
         list: Lista de ventas almacenadas.
     """
+    if particiones_service.habilitado():
+        return particiones_service.ventas.cargar()
     if not os.path.exists(VENTAS_FILE):
         return []
     with open(VENTAS_FILE, "r", encoding="utf-8") as f:
@@ -82,20 +93,18 @@ def generar_id_factura(facturas):
     return f"FAC-{año_mes}-{str(numero).zfill(3)}"
 
 
-def generar_pdf_factura(factura):
+def dibujar_factura(c, factura):
     """
-    Genera un archivo PDF con los datos de la factura recibida utilizando la librería reportlab.
+    Dibuja una factura sobre un canvas de reportlab ya abierto.
+    Se usa tanto para el PDF individual como para el PDF consolidado del mes.
 
     Args:
+        c (Canvas): Canvas donde se dibuja la factura.
         factura (dict): Datos de la factura (cliente, fecha, items, total, etc.).
-
-    Returns:
-        str: Ruta del archivo PDF generado.
     """
-    os.makedirs(PDF_DIR, exist_ok=True)
-    pdf_path = os.path.join(PDF_DIR, f"{factura['id']}.pdf")
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
 
-    c = canvas.Canvas(pdf_path, pagesize=letter)
     width, height = letter
 
     # --------- Estilo general ----------
@@ -141,6 +150,7 @@ def generar_pdf_factura(factura):
     for item in factura.get("items", []):
         if y < 80:
             c.showPage()
+            c.setFont("Helvetica", 11)
             y = height - margen
 
         nombre = item.get("nombre", "Producto")
@@ -163,10 +173,31 @@ def generar_pdf_factura(factura):
     c.setFillColor(colors.grey)
     c.drawCentredString(width / 2, y, "Gracias por confiar en Caja Plus. www.cajaplus.com")
 
-    c.save()
+
+def generar_pdf_factura(factura):
+    """
+    Genera un archivo PDF con los datos de la factura recibida utilizando la librería reportlab.
+
+    Args:
+        factura (dict): Datos de la factura (cliente, fecha, items, total, etc.).
+
+    Returns:
+        str: Ruta del archivo PDF generado.
+    """
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    os.makedirs(PDF_DIR, exist_ok=True)
+    pdf_path = os.path.join(PDF_DIR, f"{factura['id']}.pdf")
+
+    with medir_pdf("factura"):
+        c = canvas.Canvas(pdf_path, pagesize=letter)
+        dibujar_factura(c, factura)
+        c.save()
     return pdf_path
 
 
+@idempotente
 def generar_factura():
     """
     Endpoint para generar una nueva factura a partir de una venta existente.
@@ -177,7 +208,6 @@ def generar_factura():
         Response: JSON con los datos de la factura y ruta del PDF.
     """
     data = request.get_json()
-    print(data)
     venta_id = data.get("venta_id")
     cliente = data.get("cliente")
 
@@ -185,10 +215,12 @@ def generar_factura():
         return jsonify({"error": "Faltan datos requeridos (venta_id o cliente)"}), 400
 
     ventas = cargar_ventas()
-    venta = next((v for v in ventas if v.get("id") == venta_id), None)
+    indices = cargar_indices()
 
-    if not venta:
+    posicion_venta = localizar(ventas, indices["ventas"], venta_id)
+    if posicion_venta is None:
         return jsonify({"error": "Venta no encontrada"}), 404
+    venta = ventas[posicion_venta]
 
     facturas = cargar_facturas()
     nuevo_id = generar_id_factura(facturas)
@@ -207,13 +239,18 @@ def generar_factura():
     guardar_facturas(facturas)
     pdf_path = generar_pdf_factura(nueva_factura)
 
-    # Asociar la factura al movimiento correspondiente en la caja
+    # Asociar la factura al movimiento correspondiente en la caja (venta_id -> movimiento)
     caja = cargar_caja()
-    for movimiento in caja["movimientos"]:
-        if movimiento.get("id") == venta_id:
-            movimiento["factura_id"] = nuevo_id
-            break
-    guardar_caja(caja)
+    movimiento_id = indices["movimiento_de_venta"].get(venta_id)
+    posicion_movimiento = localizar(caja["movimientos"], indices["movimientos"], movimiento_id)
+    if posicion_movimiento is not None:
+        caja["movimientos"][posicion_movimiento]["factura_id"] = nuevo_id
+        revisiones_service.marcar("caja", caja["movimientos"][posicion_movimiento])
+        guardar_caja(caja)
+
+    registrar_factura_en_indices(indices, nuevo_id, len(facturas) - 1, venta_id)
+    guardar_indices(indices)
+    publicar("factura_emitida", nueva_factura)
 
     return (
         jsonify(
@@ -227,6 +264,32 @@ def generar_factura():
     )
 
 
+def obtener_facturas_de_venta(venta_id):
+    """
+    Endpoint para consultar las facturas emitidas para una venta.
+    Usa el índice venta_id -> facturas, sin recorrer todo facturas.json.
+
+    Args:
+        venta_id (str): ID de la venta.
+
+    Returns:
+        Response: JSON con la lista de facturas de la venta.
+    """
+    indices = cargar_indices()
+    ids = indices["facturas_de_venta"].get(venta_id, [])
+    if not ids:
+        return jsonify({"venta_id": venta_id, "facturas": []}), 200
+
+    facturas = cargar_facturas()
+    resultado = []
+    for factura_id in ids:
+        posicion = localizar(facturas, indices["facturas"], factura_id)
+        if posicion is not None:
+            resultado.append(facturas[posicion])
+
+    return jsonify({"venta_id": venta_id, "facturas": resultado}), 200
+
+
 def descargar_pdf(nombre_archivo):
     """
     Endpoint para descargar un archivo PDF de factura desde el directorio correspondiente.
@@ -238,3 +301,130 @@ def descargar_pdf(nombre_archivo):
         Response: Envío del archivo PDF como respuesta HTTP.
     """
     return send_from_directory(PDF_DIR, nombre_archivo, as_attachment=False)
+
+
+class _SalidaStreaming:
+    """
+    Archivo de solo escritura que acumula lo que escribe zipfile para poder
+    enviarlo de a fragmentos. Como no implementa tell() ni seek(), zipfile lo
+    trata como un stream no posicionable y escribe el ZIP de forma secuencial.
+    """
+
+    def __init__(self):
+        self._partes = []
+
+    def write(self, datos):
+        self._partes.append(bytes(datos))
+        return len(datos)
+
+    def flush(self):
+        pass
+
+    def vaciar(self):
+        """Devuelve lo acumulado hasta el momento y libera el buffer."""
+        datos = b"".join(self._partes)
+        self._partes = []
+        return datos
+
+
+def facturas_del_mes(mes):
+    """
+    Devuelve las facturas emitidas en un mes dado, ordenadas por fecha.
+
+    Args:
+        mes (str): Mes en formato YYYY-MM.
+
+    Returns:
+        list: Facturas cuya fecha pertenece al mes.
+    """
+    facturas = [f for f in cargar_facturas() if f.get("fecha", "").startswith(mes)]
+    facturas.sort(key=lambda f: f.get("fecha", ""))
+    return facturas
+
+
+def _generar_zip(facturas):
+    """
+    Genera un ZIP con el PDF de cada factura, de a fragmentos.
+    Cada PDF se lee del disco por bloques (y se genera si todavía no existe),
+    así la memoria usada no depende de la cantidad de facturas del mes.
+    """
+    salida = _SalidaStreaming()
+    with zipfile.ZipFile(salida, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for factura in facturas:
+            pdf_path = os.path.join(PDF_DIR, f"{factura['id']}.pdf")
+            if not os.path.exists(pdf_path):
+                pdf_path = generar_pdf_factura(factura)
+
+            with open(pdf_path, "rb") as origen, zf.open(f"{factura['id']}.pdf", "w") as destino:
+                for bloque in iter(lambda: origen.read(TAMANIO_BLOQUE), b""):
+                    destino.write(bloque)
+                    yield salida.vaciar()
+            yield salida.vaciar()
+    # Al cerrar el ZIP se escribe el directorio central
+    yield salida.vaciar()
+
+
+def _generar_pdf_consolidado(facturas):
+    """
+    Genera un único PDF con todas las facturas (una a continuación de otra)
+    y lo envía de a fragmentos.
+    El PDF se arma sobre un archivo temporal en disco y no en memoria.
+    """
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    with tempfile.TemporaryFile() as tmp:
+        with medir_pdf("consolidado"):
+            c = canvas.Canvas(tmp, pagesize=letter)
+            for factura in facturas:
+                dibujar_factura(c, factura)
+                c.showPage()
+            c.save()
+
+        tmp.seek(0)
+        for bloque in iter(lambda: tmp.read(TAMANIO_BLOQUE), b""):
+            yield bloque
+
+
+def exportar_facturas():
+    """
+    Endpoint para descargar todas las facturas de un mes en un solo archivo.
+
+    Parámetros (query string):
+    - mes: Mes a exportar en formato YYYY-MM (por defecto, el mes actual).
+    - formato: "zip" (un PDF por factura) o "pdf" (un único PDF consolidado). Por defecto "zip".
+
+    La respuesta se genera de forma incremental (streaming), así la descarga
+    empieza enseguida y la memoria usada se mantiene acotada.
+
+    Returns:
+        Response: Archivo ZIP o PDF, o JSON de error.
+    """
+    mes = request.args.get("mes", datetime.now().strftime("%Y-%m"))
+    formato = request.args.get("formato", "zip").lower()
+
+    try:
+        datetime.strptime(mes, "%Y-%m")
+    except ValueError:
+        return jsonify({"error": "Mes inválido. Usar el formato YYYY-MM"}), 400
+
+    if formato not in ("zip", "pdf"):
+        return jsonify({"error": "Formato inválido. Usar 'zip' o 'pdf'"}), 400
+
+    facturas = facturas_del_mes(mes)
+    if not facturas:
+        return jsonify({"error": "No hay facturas para el mes indicado"}), 404
+
+    if formato == "zip":
+        generador = _generar_zip(facturas)
+        mimetype = "application/zip"
+    else:
+        generador = _generar_pdf_consolidado(facturas)
+        mimetype = "application/pdf"
+
+    nombre = f"facturas-{mes}.{formato}"
+    return Response(
+        stream_with_context(generador),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={nombre}"},
+    )
@@ -0,0 +1,23 @@
+"""
+Controlador del endpoint de métricas técnicas (latencias, I/O de los JSON y PDFs)
+en formato de texto de Prometheus.
+
+Términos clave:
+- Scrape: Lectura periódica que hace Prometheus de GET /metrics.
+- text/plain; version=0.0.4: Tipo de contenido del formato de texto de Prometheus.
+"""
+
+from flask import Response, jsonify
+from services import instrumentacion_service
+
+
+def obtener_metricas_prometheus():
+    """
+    Devuelve las métricas de instrumentación de este proceso.
+
+    Returns:
+        Response: Texto de Prometheus, o 404 si la instrumentación está desactivada.
+    """
+    if not instrumentacion_service.activa:
+        return jsonify({"error": "Instrumentación desactivada (definir CAJA_INSTRUMENTACION=1)"}), 404
+    return Response(instrumentacion_service.exponer(), mimetype="text/plain; version=0.0.4")
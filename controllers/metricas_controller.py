@@ -8,60 +8,61 @@ Términos clave:
 - defaultdict: Tipo especial de diccionario de Python que inicializa automáticamente un valor por defecto.
 """
 
-from flask import jsonify
+from flask import jsonify, request
 from collections import defaultdict
-from datetime import datetime, timedelta
-from controllers.ventas_controller import cargar_ventas
-from controllers.caja_controller import cargar_caja
-
-# Diccionario de nombres de meses en español (para etiquetas de semana/mes)
-MESES_ES = {
-    1: "enero", 2: "febrero", 3: "marzo", 4: "abril", 5: "mayo", 6: "junio",
-    7: "julio", 8: "agosto", 9: "septiembre", 10: "octubre", 11: "noviembre", 12: "diciembre"
-}
-
-def semana_label(fecha):
-    """
-    Devuelve una etiqueta en español que representa la semana de una fecha dada.
-
-    Args:
-        fecha (datetime): Fecha de referencia.
-
-    Returns:
-        str: Etiqueta de semana, ej. '10-16 marzo 2025'
-    """
-    start_of_week = fecha - timedelta(days=fecha.weekday())  # lunes de esa semana
-    end_of_week = start_of_week + timedelta(days=6)          # domingo de esa semana
-    mes = MESES_ES[start_of_week.month]
-    label = f"{start_of_week.day}-{end_of_week.day} {mes} {end_of_week.year}"
-    return label
-
+from controllers.ventas_controller import leer_ventas
+from controllers.caja_controller import leer_caja
+from services import archivo_service, ranking_service, pronostico_service
+from controllers.productos_controller import cargar_productos
+# MESES_ES y semana_label se siguen exponiendo desde acá por compatibilidad
+from services.utilidades import MESES_ES, semana_label, periodos_de_dia
+from services.cache_service import cacheable
+
+@cacheable("ventas", "caja")
 def obtener_metricas():
     """
     Calcula y retorna todas las métricas del negocio:
     - Totales de ventas, pagos, ingresos, egresos, items y saldo.
     - Agrupaciones por día, semana, mes y año.
     - Producto más vendido.
+    Los meses archivados aportan su resumen precalculado, sin leer sus registros.
     Se utiliza para alimentar los dashboards y reportes de la aplicación.
 
     Returns:
         Response: JSON con todas las métricas calculadas.
     """
-    # Cargar ventas y estado de caja (donde están los movimientos y el saldo)
-    ventas = cargar_ventas()
-    caja = cargar_caja()
+    # Ventas y estado de caja (donde están los movimientos y el saldo). Con particiones son
+    # vistas perezosas: los meses archivados se resumen sin leerlos (ver archivo_service)
+    ventas = leer_ventas()
+    caja = leer_caja()
     movimientos = caja.get("movimientos", [])
-
-    # Extraer los egresos (pagos) desde los movimientos de caja
-    pagos = [mov for mov in movimientos if mov.get("tipo") == "egreso"]
-    total_pagos = len(pagos)
     saldo_actual = caja.get("saldo", 0)
 
-    # Variables acumuladoras
-    total_ventas = len(ventas)
+    # Resúmenes por día: {dia: [ventas, ingresos]} y {dia: [pagos, egresos]}
+    dias_ventas = {}
+    dias_egresos = {}
+    producto_contador = defaultdict(int)  # Para encontrar el producto más vendido
     total_items = 0
-    total_ingresos = sum(v.get('total', 0) for v in ventas)
-    total_egresos = sum(p.get('monto', 0) for p in pagos)
+    for resumen in archivo_service.resumenes(ventas, archivo_service.resumir_ventas):
+        for dia, (cantidad, total) in resumen["dias"].items():
+            acumulado = dias_ventas.setdefault(dia, [0, 0])
+            acumulado[0] += cantidad
+            acumulado[1] += total
+        for nombre, cantidad in resumen["productos"].items():
+            producto_contador[nombre] += cantidad
+        total_items += resumen["items"]
+    # Los egresos de caja son los pagos
+    for resumen in archivo_service.resumenes(movimientos, archivo_service.resumir_movimientos):
+        for dia, (cantidad, monto) in resumen["egresos"].items():
+            acumulado = dias_egresos.setdefault(dia, [0, 0])
+            acumulado[0] += cantidad
+            acumulado[1] += monto
+
+    # Variables acumuladoras
+    total_ventas = sum(cantidad for cantidad, _ in dias_ventas.values())
+    total_pagos = sum(cantidad for cantidad, _ in dias_egresos.values())
+    total_ingresos = sum(total for _, total in dias_ventas.values())
+    total_egresos = sum(monto for _, monto in dias_egresos.values())
 
     # Diccionarios para acumular valores por períodos de tiempo
     ventas_por_dia = defaultdict(int)
@@ -79,42 +80,23 @@ def obtener_metricas():
     egresos_por_mes = defaultdict(float)
     egresos_anuales = defaultdict(float)
 
-    producto_contador = defaultdict(int)  # Para encontrar el producto más vendido
+    # Agrupar las ventas de cada día por semana, mes y año
+    for dia, (cantidad, total) in dias_ventas.items():
+        # Claves de día/semana/mes/año a partir del texto de la fecha (memorizadas por día)
+        fecha_str, semana, mes, anio = periodos_de_dia(dia)
 
-    # Procesar ventas para calcular métricas por período
-    for venta in ventas:
-        # Convertir la fecha del string al objeto datetime
-        fecha = datetime.strptime(venta.get("fecha", "")[:10], "%Y-%m-%d")
-        total = venta.get("total", 0)
-        fecha_str = fecha.strftime("%Y-%m-%d")
-        semana = semana_label(fecha)
-        mes = fecha.strftime("%Y-%m")
-        anio = str(fecha.year)
-
-        ventas_por_dia[fecha_str] += 1
+        ventas_por_dia[fecha_str] += cantidad
         ingresos_por_dia[fecha_str] += total
-        ventas_por_semana[semana] += 1
+        ventas_por_semana[semana] += cantidad
         ingresos_por_semana[semana] += total
-        ventas_por_mes[mes] += 1
+        ventas_por_mes[mes] += cantidad
         ingresos_por_mes[mes] += total
-        ventas_anuales[anio] += 1
+        ventas_anuales[anio] += cantidad
         ingresos_anuales[anio] += total
 
-        # Contar productos vendidos
-        for item in venta.get("items", []):
-            cantidad = item.get("cantidad", 0)
-            nombre = item.get("nombre", "Desconocido")
-            total_items += cantidad
-            producto_contador[nombre] += cantidad
-
-    # Procesar pagos para calcular egresos por período
-    for pago in pagos:
-        fecha = datetime.strptime(pago.get("fecha", "")[:10], "%Y-%m-%d")
-        monto = pago.get("monto", 0)
-        fecha_str = fecha.strftime("%Y-%m-%d")
-        semana = semana_label(fecha)
-        mes = fecha.strftime("%Y-%m")
-        anio = str(fecha.year)
+    # Agrupar los egresos de cada día por semana, mes y año
+    for dia, (_, monto) in dias_egresos.items():
+        fecha_str, semana, mes, anio = periodos_de_dia(dia)
 
         egresos_por_dia[fecha_str] += monto
         egresos_por_semana[semana] += monto
@@ -156,3 +138,65 @@ def obtener_metricas():
 
     # Retornar las métricas en formato JSON (para el frontend o la API)
     return jsonify(metricas), 200
+
+
+def obtener_ranking():
+    """
+    Devuelve los productos más vendidos de una ventana móvil, con su clasificación ABC.
+    El ranking se mantiene al registrar cada venta (ver services/ranking_service.py), así que
+    la consulta no recorre las ventas.
+
+    Parámetros (query string):
+    - ventana: "dia", "semana" (7 días), "mes" (30 días, por defecto) o "todo".
+    - por: "ingresos" (por defecto) o "unidades".
+    - n: Cantidad de productos (1 a 100, por defecto 10).
+
+    Returns:
+        Response: JSON con el total del período y los productos con participación y clase A/B/C.
+    """
+    ventana = request.args.get("ventana", "mes")
+    medida = request.args.get("por", "ingresos")
+    if ventana not in (*ranking_service.VENTANAS, "todo"):
+        return jsonify({"error": "Ventana inválida. Usar dia, semana, mes o todo"}), 400
+    if medida not in ranking_service.MEDIDAS:
+        return jsonify({"error": "Medida inválida. Usar ingresos o unidades"}), 400
+    try:
+        cantidad = int(request.args.get("n", 10))
+    except ValueError:
+        return jsonify({"error": "n debe ser un número entero"}), 400
+    if not 1 <= cantidad <= ranking_service.CAPACIDAD:
+        return jsonify({"error": f"n debe estar entre 1 y {ranking_service.CAPACIDAD}"}), 400
+
+    return jsonify(ranking_service.ranking(ventana, medida, cantidad)), 200
+
+
+def obtener_pronostico():
+    """
+    Devuelve la demanda diaria estimada de cada producto y la fecha en que se agotaría con
+    el stock actual, más el pronóstico de ventas de los próximos 7 días.
+    La demanda se calcula una vez por día (ver services/pronostico_service.py).
+
+    Parámetros (query string):
+    - quiebre_en: Solo productos que se agotan en esa cantidad de días o menos. Opcional.
+
+    Returns:
+        Response: JSON con el pronóstico de ventas y los productos ordenados por fecha de quiebre.
+    """
+    quiebre_en = request.args.get("quiebre_en")
+    try:
+        quiebre_en = None if quiebre_en is None else int(quiebre_en)
+    except ValueError:
+        return jsonify({"error": "quiebre_en debe ser un número entero de días"}), 400
+
+    pronostico = pronostico_service.cargar_pronostico()
+    productos = pronostico_service.quiebres(pronostico, cargar_productos())
+    if quiebre_en is not None:
+        productos = [p for p in productos if p["dias_restantes"] is not None and p["dias_restantes"] <= quiebre_en]
+
+    return jsonify({
+        "dia": pronostico["dia"],
+        "generado": pronostico["generado"],
+        "historia": pronostico["historia"],
+        "ventas": pronostico["ventas"],
+        "productos": productos,
+    }), 200
@@ -1,61 +1,225 @@
 """
 Controlador para gestionar los pagos y su registro como egresos en la caja.
 - Permite consultar pagos y registrar nuevos pagos/egresos.
-- Maneja la persistencia de pagos en un archivo JSON.
-- Sincroniza cada pago con la caja (egreso).
+- Cada pago se guarda una sola vez: es el egreso de caja marcado con "origen": "pago",
+  con sus datos (destinatario, concepto, método) en "detalles". Así el pago cuesta una
+  sola escritura y la lista de pagos no puede desincronizarse de la caja.
+- La lista de pagos es una vista sobre esos egresos, que se ubican con el índice "pagos"
+  (ver services/indices_service.py) sin recorrer todos los movimientos.
+- La consulta se pagina y se filtra por fecha, destinatario, concepto y método usando
+  índices secundarios, e incluye los totales de lo filtrado.
 
 Términos clave:
 - Egreso: Salida de dinero de la caja (por pago de servicios, proveedores, etc).
+- Vista: Forma de presentar datos guardados en otro lugar (acá, los egresos de caja como pagos).
+- Índice secundario: Índice por un campo que no es el ID (por ejemplo, destinatario -> pagos).
 - Pathlib: Módulo moderno de Python para manejo de rutas y archivos.
 - JSON: Formato de intercambio de datos sencillo, ideal para persistencia ligera.
 """
 
 import json
+import uuid
 from flask import request, jsonify
 from pathlib import Path
 from datetime import datetime
-from controllers.caja_controller import cargar_caja, guardar_caja
+from services.utilidades import FORMATO_FECHA, ahora_str, epoch, parsear_fecha_flexible
+from services.idempotencia_service import idempotente
+from services.cache_service import cacheable
+from services.eventos_service import publicar
+from services.persistencia_service import bloqueo
+from controllers.caja_controller import cargar_caja, guardar_caja, leer_caja, agregar_movimiento
+from services.indices_service import (
+    cargar_indices, guardar_indices, localizar, indexar_pago, buscar_pagos, CAMPOS_PAGO_INDEXADOS
+)
 
-# Ruta al archivo donde se guardan los pagos
+# Archivo donde se guardaban los pagos antes de unificarlos con la caja (solo para migrar)
 PAGOS_PATH = Path("./data/pagos.json")
 
-def cargar_pagos():
+def pago_desde_movimiento(movimiento):
     """
-    Carga la lista de pagos desde el archivo JSON.
-    Si el archivo no existe, lo crea vacío.
-    
+    Arma la vista de un pago a partir de su egreso en la caja.
+
+    Args:
+        movimiento (dict): Egreso de caja con "origen": "pago".
+
     Returns:
-        list: Lista de pagos (cada pago es un dict).
+        dict: Pago con el formato de la API (id, fecha, destinatario, concepto, descripcion, monto, metodo).
+    """
+    detalles = movimiento.get("detalles", {})
+    return {
+        "id": movimiento["id"],
+        "fecha": movimiento.get("fecha", ""),
+        "destinatario": detalles.get("destinatario", ""),
+        "concepto": detalles.get("concepto", ""),
+        "descripcion": movimiento.get("descripcion", ""),
+        "monto": movimiento.get("monto", 0),
+        "metodo": detalles.get("metodo", ""),
+    }
+
+def egreso_desde_pago(pago):
+    """
+    Arma el egreso de caja que representa a un pago.
+
+    Args:
+        pago (dict): Pago con el formato de la API.
+
+    Returns:
+        dict: Movimiento de tipo egreso con "origen": "pago".
+    """
+    return {
+        "id": pago["id"],
+        "tipo": "egreso",
+        "origen": "pago",
+        "monto": pago["monto"],
+        "descripcion": pago["descripcion"],
+        "fecha": pago["fecha"],
+        "fecha_ts": epoch(pago["fecha"]),
+        "detalles": {
+            "destinatario": pago["destinatario"],
+            "concepto": pago["concepto"],
+            "metodo": pago["metodo"],
+        },
+    }
+
+def migrar_pagos_legados():
+    """
+    Unifica el archivo de pagos del formato anterior (data/pagos.json) con la caja.
+
+    Cada pago se busca en la caja por su ID: si ya tiene su egreso, se lo marca como pago;
+    si falta, se agrega el egreso. Al terminar, el archivo viejo se renombra a
+    pagos.json.migrado para que la migración no se repita.
+
+    Como se llama también desde los GET (que no toman el bloqueo de datos), la migración se
+    hace con el bloqueo tomado: si no, una venta guardada en el medio quedaría pisada por la
+    copia de la caja que leyó la migración.
     """
     if not PAGOS_PATH.exists():
-        PAGOS_PATH.parent.mkdir(parents=True, exist_ok=True)
-        with open(PAGOS_PATH, "w", encoding="utf-8") as f:
-            json.dump([], f)
-        return []
+        return
 
-    with open(PAGOS_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+    with bloqueo:
+        if not PAGOS_PATH.exists():  # Otro worker la hizo mientras se esperaba
+            return
 
-def guardar_pagos(pagos):
+        with open(PAGOS_PATH, "r", encoding="utf-8") as f:
+            pagos_legados = json.load(f)
+
+        caja = cargar_caja()
+        indices = cargar_indices()
+        for pago in pagos_legados:
+            egreso = egreso_desde_pago(pago)
+            posicion = localizar(caja["movimientos"], indices["movimientos"], pago["id"])
+            if posicion is not None and caja["movimientos"][posicion].get("tipo") == "egreso":
+                movimiento = caja["movimientos"][posicion]
+                movimiento["origen"] = "pago"
+                movimiento.setdefault("detalles", egreso["detalles"])
+            else:
+                posicion = agregar_movimiento(caja, egreso)
+                indices["movimientos"][pago["id"]] = posicion
+            if pago["id"] not in indices["pagos"]:
+                indices["pagos"].append(pago["id"])
+                indexar_pago(indices, caja["movimientos"][posicion])
+
+        guardar_caja(caja)
+        guardar_indices(indices)
+        PAGOS_PATH.rename(PAGOS_PATH.with_name(PAGOS_PATH.name + ".migrado"))
+
+def cargar_pagos():
     """
-    Guarda la lista de pagos en el archivo JSON.
+    Devuelve la lista de pagos (vista sobre los egresos de caja marcados como pago).
 
-    Args:
-        pagos (list): Lista de pagos a guardar.
+    Returns:
+        list: Lista de pagos (cada pago es un dict).
     """
-    with open(PAGOS_PATH, "w", encoding="utf-8") as f:
-        json.dump(pagos, f, indent=2, ensure_ascii=False)
+    migrar_pagos_legados()
+    movimientos = cargar_caja().get("movimientos", [])
+    indices = cargar_indices()
+
+    pagos = []
+    for pago_id in indices["pagos"]:
+        posicion = localizar(movimientos, indices["movimientos"], pago_id)
+        if posicion is not None:
+            pagos.append(pago_desde_movimiento(movimientos[posicion]))
+    return pagos
 
+# Los pagos se leen de la caja y de los índices (y del archivo legado mientras no se migre)
+@cacheable("caja", "indices", "pagos_legado")
 def obtener_pagos():
     """
-    Endpoint para consultar todos los pagos registrados.
+    Endpoint para consultar los pagos registrados, paginados y filtrados.
+
+    Parámetros (query string, todos opcionales):
+    - desde, hasta: Rango de fechas (YYYY-MM-DD), inclusive.
+    - destinatario, concepto, metodo: Filtros exactos (sin distinguir mayúsculas).
+    - page, per_page: Paginación (por defecto 1 y 10).
+
+    Los pagos se buscan en los índices secundarios y solo se leen de la caja
+    los que cumplen los filtros. Se devuelven del más reciente al más antiguo.
 
     Returns:
-        Response: JSON con la lista de pagos y código HTTP 200.
+        Response: JSON con la página de pagos, datos de paginación y totales de lo filtrado.
     """
-    pagos = cargar_pagos()
-    return jsonify(pagos), 200
+    desde = request.args.get("desde")
+    hasta = request.args.get("hasta")
+    for fecha in (desde, hasta):
+        if fecha:
+            try:
+                datetime.strptime(fecha, "%Y-%m-%d")
+            except ValueError:
+                return jsonify({"error": "Fecha inválida. Usar el formato YYYY-MM-DD"}), 400
+
+    filtros = {
+        campo: request.args[campo]
+        for campo in CAMPOS_PAGO_INDEXADOS
+        if request.args.get(campo, "").strip()
+    }
+
+    # --- Paginación ---
+    try:
+        page = int(request.args.get("page", 1))
+        per_page = int(request.args.get("per_page", 10))
+    except Exception:
+        page = 1
+        per_page = 10
+
+    migrar_pagos_legados()
+    indices = cargar_indices()
+    ids = buscar_pagos(indices, filtros, desde, hasta)
+    ids.reverse()  # Más recientes primero
+
+    # Con particiones solo se abren los meses donde están los pagos encontrados
+    movimientos = leer_caja().get("movimientos", [])
+    pagos = []
+    for pago_id in ids:
+        posicion = localizar(movimientos, indices["movimientos"], pago_id)
+        if posicion is not None:
+            pagos.append(pago_desde_movimiento(movimientos[posicion]))
+
+    # --- Totales de lo filtrado ---
+    por_metodo = {}
+    por_concepto = {}
+    for pago in pagos:
+        por_metodo[pago["metodo"]] = por_metodo.get(pago["metodo"], 0) + pago["monto"]
+        por_concepto[pago["concepto"]] = por_concepto.get(pago["concepto"], 0) + pago["monto"]
+
+    total = len(pagos)
+    start = (page - 1) * per_page
+    end = start + per_page
+
+    return jsonify({
+        "pagos": pagos[start:end],
+        "page": page,
+        "per_page": per_page,
+        "total": total,
+        "total_pages": (total + per_page - 1) // per_page,
+        "totales": {
+            "cantidad": total,
+            "monto": sum(p["monto"] for p in pagos),
+            "por_metodo": por_metodo,
+            "por_concepto": por_concepto,
+        },
+    }), 200
 
+@idempotente
 def registrar_pago():
     """
     Endpoint para registrar un nuevo pago (egreso).
@@ -64,8 +228,8 @@ def registrar_pago():
     1. Valida los campos requeridos del request.
     2. Valida el monto (que sea numérico y > 0).
     3. Parsea y normaliza la fecha (acepta varios formatos).
-    4. Agrega el pago al archivo de pagos.
-    5. Registra un egreso en la caja.
+    4. Registra el pago como egreso en la caja (una sola escritura).
+    5. Lo agrega al índice de pagos.
     6. Retorna mensaje de éxito.
 
     Returns:
@@ -95,37 +259,28 @@ def registrar_pago():
     # 3) Parsear fecha si viene, o usar ahora. NO PERMITIR FECHAS FUTURAS
     fecha_input = data.get("fecha")
     if fecha_input:
-        fecha_str = fecha_input.strip()
-        dt = None
         # Intentar varios formatos (ISO, DD/MM/YYYY, MM/DD/YYYY)
         try:
-            dt = datetime.fromisoformat(fecha_str)
+            dt = parsear_fecha_flexible(fecha_input)
         except ValueError:
-            try:
-                dt_date = datetime.strptime(fecha_str, "%d/%m/%Y")
-                now = datetime.now()
-                dt = dt_date.replace(hour=now.hour, minute=now.minute, second=now.second)
-            except ValueError:
-                try:
-                    dt_date = datetime.strptime(fecha_str, "%m/%d/%Y")
-                    now = datetime.now()
-                    dt = dt_date.replace(hour=now.hour, minute=now.minute, second=now.second)
-                except ValueError:
-                    return jsonify({
-                        "error": "Formato de fecha inválido. Acepto YYYY-MM-DD, DD/MM/YYYY o MM/DD/YYYY"
-                    }), 400
-                    
+            return jsonify({
+                "error": "Formato de fecha inválido. Acepto YYYY-MM-DD, DD/MM/YYYY o MM/DD/YYYY"
+            }), 400
+
         # Validar que la fecha no sea futura
         if dt.date() > datetime.now().date():
             return jsonify({"error": "No se permiten fechas futuras"}), 400
-        fecha_pago = dt.strftime("%Y-%m-%d %H:%M:%S")
+        fecha_pago = dt.strftime(FORMATO_FECHA)
     else:
-        fecha_pago = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        fecha_pago = ahora_str()
 
-    # 4) Guardar en pagos.json
-    pagos = cargar_pagos()
+    # 4) Guardar el pago como egreso en caja.json (única escritura)
+    migrar_pagos_legados()
+    caja = cargar_caja()
+    indices = cargar_indices()
     nuevo_pago = {
-        "id": str(len(pagos) + 1),
+        # UUID como en los demás movimientos: un ID numérico se repetiría al borrar el último pago
+        "id": str(uuid.uuid4()),
         "fecha": fecha_pago,
         "destinatario": data["destinatario"].strip(),
         "concepto": data["concepto"].strip(),
@@ -133,26 +288,15 @@ def registrar_pago():
         "monto": monto,
         "metodo": data["metodo"].strip(),
     }
-    pagos.append(nuevo_pago)
-    guardar_pagos(pagos)
-
-
-    # 5) Registrar egreso en caja.json (sincronización)
-    caja = cargar_caja()
-    egreso = {
-        "id": nuevo_pago["id"],
-        "tipo": "egreso",
-        "monto": monto,
-        "descripcion": data["descripcion"].strip(),
-        "fecha": fecha_pago,
-        "detalles": {
-            "destinatario": data["destinatario"].strip(),
-            "concepto": data["concepto"].strip(),
-            "metodo": data["metodo"].strip(),
-        },
-    }
-    caja["saldo"] -= monto
-    caja["movimientos"].append(egreso)
+    posicion = agregar_movimiento(caja, egreso_desde_pago(nuevo_pago))
     guardar_caja(caja)
 
+    # 5) Indexar el pago (su ID es el mismo que el del egreso)
+    indices["movimientos"][nuevo_pago["id"]] = posicion
+    indices["pagos"].append(nuevo_pago["id"])
+    indexar_pago(indices, caja["movimientos"][posicion])
+    guardar_indices(indices)
+
+    publicar("movimiento_creado", caja["movimientos"][posicion])
+    publicar("pago_registrado", nuevo_pago)
     return jsonify({"message": "Pago y egreso registrados correctamente"}), 201
@@ -0,0 +1,99 @@
+"""
+Controlador de administración del perfilado a pedido (ver services/perfilado_service.py).
+
+- Marcar un endpoint para perfilar sus próximas peticiones.
+- Listar los perfiles guardados.
+- Descargar un perfil como archivo .prof o como reporte de texto.
+
+Términos clave:
+- Endpoint de Flask: Nombre interno de una ruta, "blueprint.funcion" (ej: "ventas.registrar_venta").
+- Archivo .prof: Volcado de cProfile; se abre con `python -m pstats archivo.prof` o con snakeviz.
+"""
+
+from flask import Response, current_app, jsonify, request
+from services import perfilado_service
+
+
+def _verificar_acceso():
+    """Devuelve la respuesta de error si el perfilado está deshabilitado o falta el token, o None."""
+    if not perfilado_service.habilitado():
+        return jsonify({"error": "Perfilado deshabilitado (definir CAJA_PERFILADO=1)"}), 404
+    if not perfilado_service.token_valido():
+        return jsonify({"error": "Token de perfilado inválido"}), 403
+    return None
+
+
+def activar_perfilado():
+    """
+    Marca un endpoint para perfilar sus próximas peticiones.
+    Recibe por POST {"endpoint": "ventas.registrar_venta", "cantidad": 3}.
+
+    Returns:
+        tuple: (json, status_code)
+    """
+    error = _verificar_acceso()
+    if error:
+        return error
+
+    data = request.get_json(silent=True) or {}
+    endpoint = data.get("endpoint")
+    if endpoint not in current_app.view_functions:
+        return jsonify({"error": "Endpoint inexistente", "endpoints": sorted(current_app.view_functions)}), 400
+    try:
+        cantidad = int(data.get("cantidad", 1))
+    except (TypeError, ValueError):
+        return jsonify({"error": "La cantidad debe ser un número entero"}), 400
+    if not 1 <= cantidad <= perfilado_service.MAX_PERFILES:
+        return jsonify({"error": f"La cantidad debe estar entre 1 y {perfilado_service.MAX_PERFILES}"}), 400
+
+    perfilado_service.activar(endpoint, cantidad)
+    return jsonify({"message": "Perfilado activado", "pendientes": dict(perfilado_service.pendientes)}), 200
+
+
+def listar_perfiles():
+    """
+    Lista los perfiles guardados (del más nuevo al más viejo).
+
+    Returns:
+        tuple: (json, status_code)
+    """
+    error = _verificar_acceso()
+    if error:
+        return error
+    return jsonify({"perfiles": perfilado_service.listar(), "pendientes": dict(perfilado_service.pendientes)}), 200
+
+
+def descargar_perfil(perfil_id):
+    """
+    Descarga un perfil. Por defecto como archivo .prof; con ?formato=texto devuelve el
+    reporte de pstats (orden con ?orden=cumulative|tottime|calls, cantidad con ?limite=40).
+
+    Args:
+        perfil_id (str): ID del perfil (header X-Perfil-Id de la respuesta perfilada).
+
+    Returns:
+        Response: Archivo .prof, texto o error.
+    """
+    error = _verificar_acceso()
+    if error:
+        return error
+
+    perfil = perfilado_service.buscar(perfil_id)
+    if perfil is None:
+        return jsonify({"error": "Perfil no encontrado (puede haber salido del buffer)"}), 404
+
+    if request.args.get("formato") == "texto":
+        orden = request.args.get("orden", "cumulative")
+        if orden not in ("cumulative", "tottime", "calls", "ncalls", "time"):
+            return jsonify({"error": "Orden inválido"}), 400
+        try:
+            limite = int(request.args.get("limite", 40))
+        except ValueError:
+            return jsonify({"error": "El límite debe ser un número entero"}), 400
+        return Response(perfilado_service.como_texto(perfil, orden, limite), mimetype="text/plain")
+
+    return Response(
+        perfil["stats"],
+        mimetype="application/octet-stream",
+        headers={"Content-Disposition": f"attachment; filename=perfil-{perfil_id}.prof"},
+    )
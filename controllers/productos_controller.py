@@ -10,10 +10,16 @@ Términos clave:
 import json
 import os
 from flask import jsonify, request
+from services.cache_service import cacheable, incrementar_version
+from services.persistencia_service import escribir_json
+from services.instrumentacion_service import medir_io
+from services.eventos_service import publicar
+from services import revisiones_service, historial_service
 
 # Ruta del archivo de productos
 PRODUCTOS_FILE = 'data/productos.json'
 
+@medir_io("productos", PRODUCTOS_FILE)
 def cargar_productos():
     """
     Carga la lista de productos desde el archivo JSON.
@@ -30,6 +36,7 @@ def cargar_productos():
     with open(PRODUCTOS_FILE, 'r', encoding='utf-8') as f:
         return json.load(f)
 
+@cacheable("productos")
 def obtener_productos():
     """
     Endpoint para obtener todos los productos registrados.
@@ -69,6 +76,7 @@ def obtener_productos():
         "total_pages": (total + per_page - 1) // per_page
     }), 200
 
+@medir_io("productos", PRODUCTOS_FILE)
 def guardar_productos(productos):
     """
     Guarda la lista completa de productos en el archivo JSON.
@@ -76,8 +84,8 @@ def guardar_productos(productos):
     Args:
         productos (list): Lista de productos a persistir.
     """
-    with open(PRODUCTOS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(productos, f, indent=2)
+    escribir_json(PRODUCTOS_FILE, productos, indent=2)
+    incrementar_version("productos")
 
 def registrar_producto():
     """
@@ -115,8 +123,13 @@ def registrar_producto():
         "stock_minimo": data.get('stock_minimo', 5)
     }
 
+    revisiones_service.marcar("productos", nuevo_producto)
     productos.append(nuevo_producto)
     guardar_productos(productos)
+    if stock:
+        publicar("stock_cambiado", {"motivo": "alta", "productos": [
+            {"id": nuevo_producto["id"], "nombre": nuevo_producto["nombre"], "stock": stock, "variacion": stock}
+        ]})
 
     return jsonify({
         "message": "Producto registrado correctamente",
@@ -138,8 +151,11 @@ def eliminar_producto(id):
 
     if len(productos_filtrados) == len(productos):
         return jsonify({"error": "Producto no encontrado"}), 404
+    eliminado = next(producto for producto in productos if producto["id"] == id)
     
+    revisiones_service.borrar("productos", {"id": id})
     guardar_productos(productos_filtrados)
+    publicar("producto_eliminado", {"id": id, "nombre": eliminado.get("nombre", ""), "stock": eliminado.get("stock", 0)})
     return jsonify({"message": "Producto eliminado correctamente"}), 200
 
 def editar_producto(id):
@@ -171,12 +187,78 @@ def editar_producto(id):
 
 
     # Actualizamos solo los campos enviados (ya validados)
+    stock_anterior = producto_encontrado["stock"]
     producto_encontrado["nombre"] = data.get("nombre", producto_encontrado["nombre"])
     producto_encontrado["descripcion"] = data.get("descripcion", producto_encontrado["descripcion"])
     producto_encontrado["precio"] = data.get("precio", producto_encontrado["precio"])
     producto_encontrado["stock"] = data.get("stock", producto_encontrado["stock"])
     producto_encontrado["categoria"] = data.get("categoria", producto_encontrado["categoria"])
     producto_encontrado["stock_minimo"] = data.get("stock_minimo", producto_encontrado["stock_minimo"])
+    revisiones_service.marcar("productos", producto_encontrado)
     guardar_productos(productos)
+    historial_service.renombrar(id, producto_encontrado["nombre"])
+    if producto_encontrado["stock"] != stock_anterior:
+        publicar("stock_cambiado", {"motivo": "edicion", "productos": [{
+            "id": id, "nombre": producto_encontrado["nombre"], "stock": producto_encontrado["stock"],
+            "variacion": producto_encontrado["stock"] - stock_anterior,
+        }]})
     
     return jsonify({"message": "Producto actualizado correctamente"}), 200
+
+def obtener_ventas_de_producto(id):
+    """
+    Endpoint para obtener el historial de ventas de un producto, de la más reciente a la
+    más antigua, con sus totales. Lee solo el archivo de historial de este producto (ver
+    services/historial_service.py): no recorre las ventas ni carga los índices.
+
+    Args:
+        id (int): ID del producto.
+
+    Returns:
+        Response: JSON con la página de ventas (venta_id, fecha, cantidad, precio_unitario,
+            subtotal), los totales del producto y los datos de paginación.
+    """
+    historial = historial_service.cargar_historial(id)
+    if historial is None:
+        # Sin ventas: se busca el producto solo para distinguir "sin ventas" de "no existe"
+        producto = next((p for p in cargar_productos() if p["id"] == id), None)
+        if producto is None:
+            return jsonify({"error": "Producto no encontrado"}), 404
+        historial = {"nombre": producto["nombre"], "ventas": []}
+    # Un producto eliminado conserva su historial: las ventas siguen existiendo
+    lista = historial["ventas"]
+
+    # --- Paginación ---
+    try:
+        page = int(request.args.get("page", 1))
+        per_page = int(request.args.get("per_page", 10))
+    except Exception:
+        page = 1
+        per_page = 10
+    page, per_page = max(page, 1), max(per_page, 1)
+
+    # La lista está ordenada por fecha ascendente: la página se toma desde el final
+    total = len(lista)
+    fin = max(total - (page - 1) * per_page, 0)
+    inicio = max(fin - per_page, 0)
+    ventas = [
+        {"venta_id": venta_id, "fecha": fecha, "cantidad": cantidad,
+         "precio_unitario": precio, "subtotal": cantidad * precio}
+        for fecha, venta_id, cantidad, precio in reversed(lista[inicio:fin])
+    ]
+
+    return jsonify({
+        "producto": {"id": id, "nombre": historial["nombre"]},
+        "totales": {
+            "ventas": total,
+            "unidades": sum(cantidad for _, _, cantidad, _ in lista),
+            "ingresos": sum(cantidad * precio for _, _, cantidad, precio in lista),
+            "primera_venta": lista[0][0] if lista else None,
+            "ultima_venta": lista[-1][0] if lista else None,
+        },
+        "ventas": ventas,
+        "page": page,
+        "per_page": per_page,
+        "total": total,
+        "total_pages": (total + per_page - 1) // per_page
+    }), 200
@@ -0,0 +1,124 @@
+"""
+Controlador de sincronización incremental para clientes offline (ver services/revisiones_service.py).
+
+El punto de venta guarda el "hasta" de cada respuesta y lo manda como ?desde= en la próxima:
+- Sin ?desde (primera vez): devuelve todos los registros de las colecciones pedidas.
+- desde=<rev>: devuelve solo los registros que cambiaron después de esa revisión (en su
+  estado actual) y los IDs de los que se borraron.
+
+Términos clave:
+- Sincronización incremental: El cliente se pone al día recibiendo solo las diferencias.
+- Lápida (tombstone): ID de un registro borrado; el cliente lo quita de su copia local.
+"""
+
+from flask import jsonify, request
+from controllers.productos_controller import cargar_productos
+from controllers.ventas_controller import leer_ventas
+from controllers.caja_controller import leer_caja
+from controllers.pagos_controller import pago_desde_movimiento
+from services import revisiones_service
+from services.persistencia_service import bloqueo
+from services.indices_service import cargar_indices, localizar
+
+MAX_LIMITE = 5000
+
+
+def _pago(movimiento):
+    return {**pago_desde_movimiento(movimiento), "rev": movimiento.get("rev", 0)}
+
+
+def _todo(colecciones):
+    """Estado completo de las colecciones pedidas (primera sincronización)."""
+    datos = {}
+    if "productos" in colecciones:
+        datos["productos"] = cargar_productos()
+    if "ventas" in colecciones:
+        datos["ventas"] = list(leer_ventas())
+    if "caja" in colecciones or "pagos" in colecciones:
+        movimientos = list(leer_caja().get("movimientos", []))
+        if "caja" in colecciones:
+            datos["caja"] = movimientos
+        if "pagos" in colecciones:
+            datos["pagos"] = [_pago(m) for m in movimientos if m.get("origen") == "pago"]
+    return {coleccion: {"cambios": registros, "borrados": []} for coleccion, registros in datos.items()}
+
+
+def _delta(cambios):
+    """Estado actual de los registros que cambiaron y lápidas de los borrados."""
+    buscadores = {}
+    if cambios.get("productos"):
+        productos = {p["id"]: p for p in cargar_productos()}
+        buscadores["productos"] = productos.get
+    indices = cargar_indices() if any(cambios.get(c) for c in ("ventas", "caja", "pagos")) else None
+    if cambios.get("ventas"):
+        ventas = leer_ventas()
+        buscadores["ventas"] = lambda i: _en_posicion(ventas, indices["ventas"], i)
+    if cambios.get("caja") or cambios.get("pagos"):
+        movimientos = leer_caja().get("movimientos", [])
+
+        def movimiento(registro_id):
+            return _en_posicion(movimientos, indices["movimientos"], registro_id)
+
+        def pago(registro_id):
+            encontrado = movimiento(registro_id)
+            return _pago(encontrado) if encontrado else None
+
+        buscadores["caja"] = movimiento
+        buscadores["pagos"] = pago
+
+    resultado = {}
+    for coleccion, registros in cambios.items():
+        actuales, borrados = [], []
+        for registro_id, borrado in registros.items():
+            registro = None if borrado else buscadores[coleccion](registro_id)
+            if registro is None:
+                borrados.append(registro_id)  # Si ya no existe es porque se borró después
+            else:
+                actuales.append(registro)
+        resultado[coleccion] = {"cambios": actuales, "borrados": borrados}
+    return resultado
+
+
+def _en_posicion(registros, posiciones, registro_id):
+    posicion = localizar(registros, posiciones, registro_id)
+    return None if posicion is None else registros[posicion]
+
+
+def sincronizar():
+    """
+    Endpoint de sincronización incremental.
+
+    Parámetros (query string):
+    - desde: Último "hasta" recibido por el cliente (ausente para la carga inicial).
+    - colecciones: Separadas por coma (productos, ventas, caja, pagos). Por defecto, todas.
+    - limite: Máximo de cambios a revisar por llamada (por defecto 1000). Si quedan más,
+      la respuesta trae "completo": false y hay que volver a pedir desde "hasta".
+
+    Returns:
+        tuple: (json, status_code)
+    """
+    try:
+        desde = request.args.get("desde")
+        desde = None if desde is None else int(desde)
+        limite = int(request.args.get("limite", 1000))
+    except ValueError:
+        return jsonify({"error": "desde y limite deben ser números enteros"}), 400
+    if (desde is not None and desde < 0) or not 1 <= limite <= MAX_LIMITE:
+        return jsonify({"error": f"Parámetros fuera de rango (desde >= 0, limite entre 1 y {MAX_LIMITE})"}), 400
+
+    pedidas = request.args.get("colecciones")
+    colecciones = {c.strip() for c in pedidas.split(",") if c.strip()} if pedidas else set(revisiones_service.COLECCIONES)
+    if not colecciones or not colecciones <= set(revisiones_service.COLECCIONES):
+        return jsonify({"error": "Colección desconocida", "colecciones": list(revisiones_service.COLECCIONES)}), 400
+
+    # Las revisiones se anotan antes de guardar los datos (ver revisiones_service): con el
+    # bloqueo tomado no se lee nunca una revisión cuyo registro todavía no se guardó
+    with bloqueo:
+        if desde is None:
+            hasta, completo = revisiones_service.ultima(), True
+            datos = _todo(colecciones)
+        else:
+            cambios, hasta, completo = revisiones_service.cambios_desde(desde, colecciones, limite)
+            datos = _delta(cambios)
+
+    return jsonify({"desde": desde, "hasta": hasta, "completo": completo, **datos}), 200
@@ -14,10 +14,14 @@ Notas de seguridad:
 from flask import request, jsonify
 import json
 import os
+from services.cache_service import incrementar_version
+from services.persistencia_service import escribir_json
+from services.instrumentacion_service import medir_io
 
 # Ruta al archivo donde se almacenan los usuarios en formato JSON
 USUARIOS_FILE = 'data/usuarios.json'
 
+@medir_io("usuarios", USUARIOS_FILE)
 def cargar_usuarios():
     """
     Carga la lista de usuarios desde el archivo JSON.
@@ -35,6 +39,7 @@ def cargar_usuarios():
         data = json.load(f)
         return data.get("usuarios", [])
 
+@medir_io("usuarios", USUARIOS_FILE)
 def guardar_usuarios(usuarios):
     """
     Guarda la lista de usuarios en el archivo JSON.
@@ -42,8 +47,8 @@ def guardar_usuarios(usuarios):
     Args:
         usuarios (list): Lista de usuarios.
     """
-    with open(USUARIOS_FILE, 'w') as f:
-        json.dump({"usuarios": usuarios}, f, indent=2)
+    escribir_json(USUARIOS_FILE, {"usuarios": usuarios}, indent=2)
+    incrementar_version("usuarios")
 
 def registrar_usuario():
     """
@@ -16,13 +16,23 @@ Conceptos clave:
 
 from flask import request, jsonify
 import json, os, uuid
-from datetime import datetime
-from controllers.caja_controller import cargar_caja, guardar_caja
+from services.utilidades import ahora_str, epoch
+from services.idempotencia_service import idempotente
+from services.cache_service import cacheable, incrementar_version
+from services.persistencia_service import escribir_json
+from services.instrumentacion_service import medir_io
+from services import particiones_service, revisiones_service, ranking_service, historial_service
+from services.eventos_service import publicar
+from controllers.caja_controller import (
+    cargar_caja, guardar_caja, agregar_movimiento, quitar_movimiento, cambiar_monto_movimiento, movimientos_por_tipo,
+)
 from controllers.productos_controller import cargar_productos, guardar_productos
+from services.indices_service import cargar_indices, guardar_indices, localizar, quitar_posicion, registrar_venta_en_indices
 
 VENTAS_FILE = "data/ventas.json"
 CAJA_FILE = "data/caja.json"
 
+@medir_io("ventas", VENTAS_FILE)
 def cargar_ventas():
     """
     Carga todas las ventas desde el archivo JSON correspondiente.
@@ -30,6 +40,9 @@ def cargar_ventas():
     Returns:
         list: Lista de ventas registradas.
     """
+    if particiones_service.habilitado():
+        return particiones_service.ventas.cargar()
+
     if not os.path.exists(VENTAS_FILE):
         with open(VENTAS_FILE, "w", encoding="utf-8") as f:
             json.dump([], f)
@@ -37,6 +50,7 @@ def cargar_ventas():
     with open(VENTAS_FILE, "r", encoding="utf-8") as f:
         return json.load(f)
 
+@medir_io("ventas", VENTAS_FILE)
 def guardar_ventas(ventas):
     """
     Guarda la lista de ventas en el archivo JSON correspondiente.
@@ -44,9 +58,140 @@ def guardar_ventas(ventas):
     Args:
         ventas (list): Lista de ventas a guardar.
     """
-    with open(VENTAS_FILE, "w", encoding="utf-8") as f:
-        json.dump(ventas, f, indent=2, ensure_ascii=False)
+    if particiones_service.habilitado():
+        particiones_service.ventas.guardar(ventas)
+    else:
+        escribir_json(VENTAS_FILE, ventas, indent=2, ensure_ascii=False)
+    incrementar_version("ventas")
+
+def leer_ventas():
+    """
+    Devuelve las ventas para consultas de solo lectura. Con particiones es una vista que lee
+    cada mes recién cuando se accede a él; si no, es igual a cargar_ventas().
+
+    Returns:
+        list | VistaParticionada: Ventas (no se deben modificar ni guardar).
+    """
+    if particiones_service.habilitado():
+        return particiones_service.ventas.leer()
+    return cargar_ventas()
+
+def productos_por_id(productos):
+    """
+    Arma un diccionario {id (como texto): producto} para buscar productos en O(1).
+
+    Args:
+        productos (list): Lista de productos.
+
+    Returns:
+        dict: Productos indexados por ID.
+    """
+    return {str(p["id"]): p for p in productos}
 
+def cantidades_por_producto(items):
+    """
+    Suma las cantidades de una lista de items agrupando por producto.
+
+    Args:
+        items (list): Items de una venta.
+
+    Returns:
+        dict: {id de producto (texto): cantidad total}.
+    """
+    cantidades = {}
+    for item in items:
+        clave = str(item["id"])
+        cantidades[clave] = cantidades.get(clave, 0) + item["cantidad"]
+    return cantidades
+
+def detallar_items(items, productos_idx, reservado=None, precios=None):
+    """
+    Valida los items de una venta y arma su detalle (nombre, cantidad y precio unitario).
+
+    Args:
+        items (list): Items recibidos, cada uno con "id" y "cantidad".
+        productos_idx (dict): Productos indexados por ID (ver productos_por_id).
+        reservado (dict): Unidades por producto que ya pertenecen a la venta
+            (al editarla) y cuentan como stock disponible. Opcional.
+        precios (dict): Precio unitario a respetar por producto (al editar una venta
+            se mantiene el precio al que se vendió). Opcional.
+
+    Returns:
+        tuple: (items_detallados, None) si los items son válidos,
+            o (None, respuesta de error) si no lo son.
+    """
+    reservado = reservado or {}
+    precios = precios or {}
+    items_detallados = []
+    pedidos = {}
+
+    for item in items:
+        # Validar existencia y tipo de id/cantidad
+        if not isinstance(item, dict) or "id" not in item or "cantidad" not in item:
+            return None, (jsonify({"error": "Falta el id o la cantidad de un producto"}), 400)
+        try:
+            cantidad = int(item["cantidad"])
+        except Exception:
+            return None, (jsonify({"error": "La cantidad debe ser un número entero"}), 400)
+        if cantidad <= 0:
+            return None, (jsonify({"error": "La cantidad de cada producto debe ser mayor a 0"}), 400)
+
+        # Buscar producto y validar stock (sumando todas las líneas del mismo producto)
+        clave = str(item["id"])
+        prod = productos_idx.get(clave)
+        if not prod:
+            return None, (jsonify({"error": f"Producto con id {item['id']} no encontrado"}), 404)
+        pedidos[clave] = pedidos.get(clave, 0) + cantidad
+        disponible = prod.get("stock", 0) + reservado.get(clave, 0)
+        if disponible < pedidos[clave]:
+            return None, (jsonify({"error": f"Stock insuficiente para el producto '{prod.get('nombre', 'Producto')}'. Stock disponible: {disponible}"}), 400)
+        precio = precios.get(clave, prod.get("precio", 0))
+        if precio <= 0:
+            return None, (jsonify({"error": f"Precio inválido para el producto '{prod.get('nombre', 'Producto')}'."}), 400)
+
+        items_detallados.append({
+            "id": item["id"],
+            "nombre": prod.get("nombre", "Producto"),
+            "cantidad": cantidad,
+            "precio_unitario": precio
+        })
+
+    return items_detallados, None
+
+def ajustar_stock(productos_idx, variaciones):
+    """
+    Aplica variaciones de stock a los productos (negativas al vender, positivas al devolver).
+    Los productos que ya no existen se ignoran.
+
+    Args:
+        productos_idx (dict): Productos indexados por ID (ver productos_por_id).
+        variaciones (dict): {id de producto (texto): unidades a sumar o restar}.
+
+    Returns:
+        list: Cambios aplicados [{"id", "nombre", "stock", "variacion"}] (para el evento stock_cambiado).
+    """
+    cambios = []
+    for clave, variacion in variaciones.items():
+        prod = productos_idx.get(clave)
+        if prod and variacion:
+            anterior = prod.get("stock", 0)
+            prod["stock"] = max(0, anterior + variacion)
+            cambios.append({"id": prod["id"], "nombre": prod.get("nombre", ""), "stock": prod["stock"], "variacion": prod["stock"] - anterior})
+    revisiones_service.marcar("productos", *(productos_idx[str(c["id"])] for c in cambios))
+    return cambios
+
+def publicar_stock(motivo, cambios):
+    """
+    Publica el evento stock_cambiado si hubo cambios de stock.
+
+    Args:
+        motivo (str): Operación que cambió el stock (ej: "venta", "venta_eliminada").
+        cambios (list): Cambios devueltos por ajustar_stock.
+    """
+    if cambios:
+        publicar("stock_cambiado", {"motivo": motivo, "productos": cambios})
+
+@idempotente
 def registrar_venta():
     """
     Endpoint para registrar una nueva venta.
@@ -77,82 +222,70 @@ def registrar_venta():
     if not metodo_pago or not isinstance(metodo_pago, str) or not metodo_pago.strip():
         return jsonify({"error": "Debe seleccionar un método de pago"}), 400
     
-    # Cargamos los productos
+    # Cargamos los productos y validamos/armamos el detalle
     productos = cargar_productos()
-    items_detallados = []
-
-    # Validamos y armamos el detalle
-    for item in data["items"]:
-        # Validar existencia y tipo de id/cantidad
-        if "id" not in item or "cantidad" not in item:
-            return jsonify({"error": "Falta el id o la cantidad de un producto"}), 400
-        try:
-            cantidad = int(item["cantidad"])
-        except Exception:
-            return jsonify({"error": "La cantidad debe ser un número entero"}), 400
-        if cantidad <= 0:
-            return jsonify({"error": "La cantidad de cada producto debe ser mayor a 0"}), 400
+    items_detallados, error = detallar_items(data["items"], productos_por_id(productos))
+    if error:
+        return error
 
-        # Buscar producto y validar stock
-        prod = next((p for p in productos if str(p["id"]) == str(item["id"])), None)
-        if not prod:
-            return jsonify({"error": f"Producto con id {item['id']} no encontrado"}), 404
-        if prod.get("stock", 0) < cantidad:
-            return jsonify({"error": f"Stock insuficiente para el producto '{prod.get('nombre', 'Producto')}'. Stock disponible: {prod.get('stock', 0)}"}), 400
-        if prod.get("precio", 0) <= 0:
-            return jsonify({"error": f"Precio inválido para el producto '{prod.get('nombre', 'Producto')}'."}), 400
-
-        items_detallados.append({
-            "id": item["id"],
-            "nombre": prod.get("nombre", "Producto"),
-            "cantidad": cantidad,
-            "precio_unitario": prod["precio"]
-        })
-        
     # Calculamos el total y armamos la venta
     total = sum(i["cantidad"] * i["precio_unitario"] for i in items_detallados)
     venta_id = str(uuid.uuid4())
-    fecha_actual = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    fecha_actual = ahora_str()
+    fecha_ts = epoch(fecha_actual)
 
     nueva_venta = {
         "id": venta_id,
         "items": items_detallados,
         "total": total,
         "fecha": fecha_actual,
+        "fecha_ts": fecha_ts,
         "metodoPago": metodo_pago
     }
 
     # Guardamos la venta
     ventas = cargar_ventas()
+    revisiones_service.marcar("ventas", nueva_venta)
     ventas.append(nueva_venta)
     guardar_ventas(ventas)
 
     # Registramos el ingreso en caja.json
     caja = cargar_caja()
-    descripcion = f"Venta #{len([m for m in caja['movimientos'] if m['tipo'] == 'ingreso']) + 1}"
+    descripcion = f"Venta #{movimientos_por_tipo(caja).get('ingreso', 0) + 1}"
     nuevo_ingreso = {
         "id": venta_id,
         "tipo": "ingreso",
         "monto": total,
         "descripcion": descripcion,
-        "fecha": fecha_actual
+        "fecha": fecha_actual,
+        "fecha_ts": fecha_ts,
+        "metodo": metodo_pago
     }
 
-    caja["saldo"] += total #Sumamos el monto al saldo de la caja
-    caja["movimientos"].append(nuevo_ingreso) #Agregamos el nuevo movimiento
+    posicion_mov = agregar_movimiento(caja, nuevo_ingreso) #Agregamos el movimiento y sumamos el monto al saldo
     guardar_caja(caja)
+
+    # Indexamos la venta y su movimiento (venta_id -> movimiento)
+    indices = cargar_indices()
+    registrar_venta_en_indices(indices, venta_id, len(ventas) - 1, venta_id, posicion_mov)
+    guardar_indices(indices)
     
     # Actualizamos el stock en productos.json
-    for item in items_detallados:
-        prod = next((p for p in productos if str(p["id"]) == str(item["id"])), None)
-        if prod:
-            prod["stock"] = max(0, prod.get("stock", 0) - item["cantidad"])
+    cambios_stock = ajustar_stock(productos_por_id(productos), {str(i["id"]): -i["cantidad"] for i in items_detallados})
     
     guardar_productos(productos)
+    ranking_service.registrar(nueva_venta)
+    historial_service.registrar(nueva_venta)
+
+    # Ya guardado todo, avisamos a los consumidores del registro de cambios
+    publicar("venta_creada", nueva_venta)
+    publicar("movimiento_creado", nuevo_ingreso)
+    publicar_stock("venta", cambios_stock)
 
     # Devolvemos la respuesta al frontend
     return jsonify({"message": "Venta registrada", "venta": nueva_venta}), 201
 
+@cacheable("ventas")
 def obtener_ventas():
     """
     Endpoint para obtener todas las ventas registradas.
@@ -160,7 +293,7 @@ def obtener_ventas():
     Returns:
         Response: Lista de ventas y status 200.
     """
-    ventas = cargar_ventas()
+    ventas = leer_ventas()  # Con particiones, solo se abren los meses de la página pedida
     # --- Paginación ---
     try:
         page = int(request.args.get("page", 1))
@@ -189,29 +322,75 @@ def actualizar_venta(id):
     Args:
         id (str): ID de la venta a actualizar.
 
-    Proceso:
-    - Valida que existan los campos necesarios.
-    - Busca la venta por ID y actualiza sus items y total.
-    - Guarda los cambios en ventas.json.
+    Proceso (en cascada, con una sola escritura por archivo):
+    - Valida los nuevos items contra el stock (contando las unidades que ya tenía la venta).
+    - Recalcula el total; los productos que ya estaban mantienen su precio de venta.
+    - Ajusta el stock de cada producto según la diferencia de cantidades.
+    - Ajusta el monto del movimiento de caja vinculado y el saldo.
+    - Guarda la venta actualizada.
 
     Returns:
-        Response: Mensaje de éxito o error.
+        Response: Mensaje de éxito (con la venta actualizada) o error.
     """
     data = request.get_json()
 
-    if not data or "items" not in data or "total" not in data:
+    if not data or "items" not in data or not isinstance(data["items"], list):
         return jsonify({"error": "Datos inválidos"}), 400
+    if len(data["items"]) == 0:
+        return jsonify({"error": "No se puede dejar una venta sin items"}), 400
 
     ventas = cargar_ventas()
+    indices = cargar_indices()
+
+    # Buscamos la venta por índice (sin recorrer la lista)
+    posicion = localizar(ventas, indices["ventas"], id)
+    if posicion is None:
+        return jsonify({"error": "Venta no encontrada"}), 404
+    venta = ventas[posicion]
+
+    productos = cargar_productos()
+    productos_idx = productos_por_id(productos)
+    anteriores = cantidades_por_producto(venta.get("items", []))
+    precios = {str(i["id"]): i.get("precio_unitario", 0) for i in venta.get("items", [])}
+
+    items_detallados, error = detallar_items(data["items"], productos_idx, reservado=anteriores, precios=precios)
+    if error:
+        return error
+
+    # Stock: devolvemos lo anterior y descontamos lo nuevo (solo la diferencia)
+    nuevas = cantidades_por_producto(items_detallados)
+    variaciones = {
+        clave: anteriores.get(clave, 0) - nuevas.get(clave, 0)
+        for clave in set(anteriores) | set(nuevas)
+    }
+    cambios_stock = ajustar_stock(productos_idx, variaciones)
+
+    total_anterior = venta.get("total", 0)
+    total = sum(i["cantidad"] * i["precio_unitario"] for i in items_detallados)
+    anterior = {**venta}
+    venta["items"] = items_detallados
+    venta["total"] = total
+    revisiones_service.marcar("ventas", venta)
+
+    # Caja: ajustamos el ingreso vinculado y el saldo por la diferencia
+    if total != total_anterior:
+        caja = cargar_caja()
+        movimiento_id = indices["movimiento_de_venta"].get(id)
+        posicion_mov = localizar(caja["movimientos"], indices["movimientos"], movimiento_id)
+        if posicion_mov is not None:
+            cambiar_monto_movimiento(caja, posicion_mov, total)
+            guardar_caja(caja)
 
-    for venta in ventas:
-        if venta["id"] == id:
-            venta["items"] = data["items"]
-            venta["total"] = data["total"]
-            guardar_ventas(ventas)
-            return jsonify({"message": "Venta actualizada correctamente"}), 200
+    guardar_productos(productos)
+    guardar_ventas(ventas)
+    guardar_indices(indices)
+    ranking_service.registrar(venta, anterior=anterior)
+    historial_service.quitar(anterior, conservar=nuevas)
+    historial_service.registrar(venta)
 
-    return jsonify({"error": "Venta no encontrada"}), 404
+    publicar("venta_actualizada", venta)
+    publicar_stock("venta_actualizada", cambios_stock)
+    return jsonify({"message": "Venta actualizada correctamente", "venta": venta}), 200
 
 def eliminar_venta(id):
     """
@@ -220,22 +399,54 @@ def eliminar_venta(id):
     Args:
         id (str): ID de la venta a eliminar.
 
-    Proceso:
-    - Filtra la lista de ventas eliminando la que tenga el ID dado.
-    - Guarda la nueva lista en ventas.json.
+    Proceso (en cascada, con una sola escritura por archivo):
+    - Busca la venta por índice.
+    - Devuelve al stock las unidades vendidas.
+    - Quita el ingreso vinculado en caja y descuenta su monto del saldo.
+    - Quita la venta de ventas.json y actualiza los índices.
+    Las facturas emitidas se conservan (son comprobantes), pero se informan en la respuesta.
 
     Returns:
         Response: Mensaje de éxito o error.
     """
     ventas = cargar_ventas()
+    indices = cargar_indices()
 
-    # Usamos lambda para filtrar las ventas que no tienen el mismo ID
-    ventas_filtradas = list(filter(lambda venta: venta["id"] != id, ventas))
-
-    if len(ventas_filtradas) == len(ventas):
+    posicion = localizar(ventas, indices["ventas"], id)
+    if posicion is None:
         return jsonify({"error": "Venta no encontrada"}), 404
+    venta = ventas[posicion]
 
-    guardar_ventas(ventas_filtradas)
-    
-    return jsonify({"message": "Venta eliminada correctamente"}), 200
+    # Stock: devolvemos las unidades vendidas
+    productos = cargar_productos()
+    cambios_stock = ajustar_stock(productos_por_id(productos), cantidades_por_producto(venta.get("items", [])))
+
+    # Caja: quitamos el ingreso de la venta y ajustamos el saldo
+    caja = cargar_caja()
+    movimiento_id = indices["movimiento_de_venta"].pop(id, None)
+    posicion_mov = localizar(caja["movimientos"], indices["movimientos"], movimiento_id)
+    movimiento = None
+    if posicion_mov is not None:
+        movimiento = quitar_movimiento(caja, posicion_mov)
+        quitar_posicion(indices["movimientos"], movimiento_id, posicion_mov)
+        guardar_caja(caja)
+
+    del ventas[posicion]
+    revisiones_service.borrar("ventas", venta)
+    quitar_posicion(indices["ventas"], id, posicion)
 
+    guardar_productos(productos)
+    guardar_ventas(ventas)
+    guardar_indices(indices)
+    ranking_service.registrar(venta, signo=-1)
+    historial_service.quitar(venta)
+
+    publicar("venta_eliminada", {"id": id})
+    if movimiento is not None:
+        publicar("movimiento_eliminado", {"id": movimiento["id"], "tipo": movimiento.get("tipo")})
+    publicar_stock("venta_eliminada", cambios_stock)
+
+    return jsonify({
+        "message": "Venta eliminada correctamente",
+        "facturas": indices["facturas_de_venta"].get(id, [])
+    }), 200
@@ -12,14 +12,9 @@ Este archivo **NO contiene lógica de negocio**, solo define las rutas y las vin
 """
 
 from flask import Blueprint
-# Importación de controladores (cada uno maneja la lógica para su dominio)
-from controllers.ventas_controller import registrar_venta, obtener_ventas, actualizar_venta, eliminar_venta
-from controllers.metricas_controller import obtener_metricas
-from controllers.productos_controller import obtener_productos, registrar_producto, eliminar_producto, editar_producto
-from controllers.caja_controller import obtener_caja, registrar_ingreso, registrar_egreso, eliminar_movimiento
-from controllers.calculadora_controller import calcular_precio
-from controllers.pagos_controller import obtener_pagos, registrar_pago
-from controllers.facturas_controller import generar_factura, descargar_pdf
+# Los controladores se importan recién en la primera petición a cada ruta (ver carga_diferida.py).
+# vista("modulo.funcion") apunta a controllers/modulo.py -> funcion.
+from routes.carga_diferida import vista
 
 # ============================
 # Blueprints por funcionalidad
@@ -39,63 +34,105 @@ calculadora_bp = Blueprint('calculadora', __name__, url_prefix='/api/calculadora
 
 # Grupo de rutas para PAGOS (egresos)
 pagos_bp = Blueprint('pagos', __name__, url_prefix='/api/pagos')
-pagos_bp.route('', methods=['GET'])(obtener_pagos)   # Listar todos los pagos registrados
-pagos_bp.route('', methods=['POST'])(registrar_pago) # Registrar un nuevo pago
+pagos_bp.route('', methods=['GET'])(vista("pagos_controller.obtener_pagos"))   # Listar todos los pagos registrados
+pagos_bp.route('', methods=['POST'])(vista("pagos_controller.registrar_pago")) # Registrar un nuevo pago
 
 # ========================
 # Rutas para Ventas
 # ========================
 
 # POST /api/ventas/compras  --> Registrar nueva venta
-ventas_bp.route("/compras", methods=["POST"])(registrar_venta)
+ventas_bp.route("/compras", methods=["POST"])(vista("ventas_controller.registrar_venta"))
 
 # GET /api/ventas/compras  --> Listar todas las ventas
-ventas_bp.route("/compras", methods=["GET"])(obtener_ventas)
+ventas_bp.route("/compras", methods=["GET"])(vista("ventas_controller.obtener_ventas"))
 
 # GET /api/ventas  --> Listar todas las ventas (ruta alternativa, útil para simplificar el frontend)
-ventas_bp.route('', methods=['GET'])(obtener_ventas)
+ventas_bp.route('', methods=['GET'])(vista("ventas_controller.obtener_ventas"))
 
 # PUT /api/ventas/<id>  --> Editar venta existente
-ventas_bp.route('/<int:id>', methods=['PUT'])(actualizar_venta)
+ventas_bp.route('/<id>', methods=['PUT'])(vista("ventas_controller.actualizar_venta"))
 
 # DELETE /api/ventas/<id>  --> Eliminar venta existente
-ventas_bp.route('/<int:id>', methods=['DELETE'])(eliminar_venta)
+ventas_bp.route('/<id>', methods=['DELETE'])(vista("ventas_controller.eliminar_venta"))
+
+# GET /api/ventas/<venta_id>/facturas  --> Facturas emitidas para una venta (por índice)
+ventas_bp.route('/<venta_id>/facturas', methods=['GET'])(vista("facturas_controller.obtener_facturas_de_venta"))
 
 # GET /api/ventas/metricas  --> Obtener métricas de ventas, ingresos, egresos, productos, etc.
-ventas_bp.route("/metricas", methods=["GET"])(obtener_metricas)
+ventas_bp.route("/metricas", methods=["GET"])(vista("metricas_controller.obtener_metricas"))
+
+# GET /api/ventas/ranking  --> Productos más vendidos por ventana (día/semana/mes/todo) con clasificación ABC
+ventas_bp.route("/ranking", methods=["GET"])(vista("metricas_controller.obtener_ranking"))
+
+# GET /api/ventas/pronostico  --> Demanda diaria estimada por producto y fecha de quiebre de stock
+ventas_bp.route("/pronostico", methods=["GET"])(vista("metricas_controller.obtener_pronostico"))
 
 # ========================
 # Rutas para Productos
 # ========================
 
-productos_bp.route('', methods=['GET'])(obtener_productos)        # Listar productos
-productos_bp.route('', methods=['POST'])(registrar_producto)      # Agregar nuevo producto
-productos_bp.route('/<int:id>', methods=['DELETE'])(eliminar_producto)  # Eliminar producto por ID
-productos_bp.route('/<int:id>', methods=['PUT'])(editar_producto)       # Editar producto por ID
+productos_bp.route('', methods=['GET'])(vista("productos_controller.obtener_productos"))        # Listar productos
+productos_bp.route('', methods=['POST'])(vista("productos_controller.registrar_producto"))      # Agregar nuevo producto
+productos_bp.route('/<int:id>', methods=['DELETE'])(vista("productos_controller.eliminar_producto"))  # Eliminar producto por ID
+productos_bp.route('/<int:id>', methods=['PUT'])(vista("productos_controller.editar_producto"))       # Editar producto por ID
+productos_bp.route('/<int:id>/ventas', methods=['GET'])(vista("productos_controller.obtener_ventas_de_producto"))  # Historial de ventas del producto
 
 # ========================
 # Rutas para Caja
 # ========================
 
-caja_bp.route("/", methods=["GET"])(obtener_caja)                   # Consultar estado de la caja
-caja_bp.route("/ingreso", methods=["POST"])(registrar_ingreso)      # Registrar un ingreso a la caja
-caja_bp.route("/egreso", methods=["POST"])(registrar_egreso)        # Registrar un egreso de la caja
-caja_bp.route("/movimiento/<id>", methods=["DELETE"])(eliminar_movimiento)  # Eliminar movimiento de la caja
+caja_bp.route("/", methods=["GET"])(vista("caja_controller.obtener_caja"))                   # Consultar estado de la caja
+caja_bp.route("/ingreso", methods=["POST"])(vista("caja_controller.registrar_ingreso"))      # Registrar un ingreso a la caja
+caja_bp.route("/egreso", methods=["POST"])(vista("caja_controller.registrar_egreso"))        # Registrar un egreso de la caja
+caja_bp.route("/movimiento/<id>", methods=["DELETE"])(vista("caja_controller.eliminar_movimiento"))  # Eliminar movimiento de la caja
+caja_bp.route("/conciliacion", methods=["GET"])(vista("caja_controller.conciliar_caja"))          # Verificar el saldo contra los movimientos
+caja_bp.route("/checkpoints", methods=["POST"])(vista("caja_controller.crear_checkpoint_caja"))   # Crear un checkpoint (cierre) del saldo
+caja_bp.route("/saldo", methods=["GET"])(vista("caja_controller.obtener_saldo_a_fecha"))          # Saldo al cierre de un día (?fecha=YYYY-MM-DD)
+caja_bp.route("/cierre", methods=["GET"])(vista("cierres_controller.obtener_cierre"))                # Reporte de cierre del día por método de pago
+caja_bp.route("/cierre", methods=["POST"])(vista("cierres_controller.cerrar_caja"))                  # Cerrar (archivar) la caja del día
 
 
 # ========================
 # Rutas para Calculadora
 # ========================
 
-calculadora_bp.route("/calcular", methods=["POST"])(calcular_precio) # Calcular precio, utilidad, etc.
+calculadora_bp.route("/calcular", methods=["POST"])(vista("calculadora_controller.calcular_precio")) # Calcular precio, utilidad, etc.
 
 # ========================
 # Rutas para Facturas
 # ========================
 
 facturas_bp = Blueprint("facturas", __name__, url_prefix="/api/facturas")
-facturas_bp.route("", methods=["POST"])(generar_factura)                      # Generar nueva factura
-facturas_bp.route("/pdf/<nombre_archivo>", methods=["GET"])(descargar_pdf)    # Descargar PDF de factura
+facturas_bp.route("", methods=["POST"])(vista("facturas_controller.generar_factura"))                      # Generar nueva factura
+facturas_bp.route("/pdf/<nombre_archivo>", methods=["GET"])(vista("facturas_controller.descargar_pdf"))    # Descargar PDF de factura
+facturas_bp.route("/exportar", methods=["GET"])(vista("facturas_controller.exportar_facturas"))           # Descargar facturas del mes (ZIP o PDF)
+
+# ========================
+# Rutas de instrumentación
+# ========================
+# Fuera de /api: /metrics es la ruta que Prometheus lee por defecto
+instrumentacion_bp = Blueprint("instrumentacion", __name__)
+instrumentacion_bp.route("/metrics", methods=["GET"])(vista("instrumentacion_controller.obtener_metricas_prometheus"))  # Latencias e I/O (CAJA_INSTRUMENTACION=1)
+
+# Perfilado a pedido (CAJA_PERFILADO=1)
+perfiles_bp = Blueprint("perfiles", __name__, url_prefix="/api/perfiles")
+perfiles_bp.route("", methods=["GET"])(vista("perfiles_controller.listar_perfiles"))                 # Perfiles guardados
+perfiles_bp.route("/activar", methods=["POST"])(vista("perfiles_controller.activar_perfilado"))      # Perfilar las próximas N peticiones de un endpoint
+perfiles_bp.route("/<perfil_id>", methods=["GET"])(vista("perfiles_controller.descargar_perfil"))    # Descargar un perfil (.prof o ?formato=texto)
+
+# Archivo de meses cerrados de ventas y caja (CAJA_PARTICIONES=1)
+archivo_bp = Blueprint("archivo", __name__, url_prefix="/api/archivo")
+archivo_bp.route("", methods=["GET"])(vista("archivo_controller.obtener_archivo"))          # Meses calientes y archivados
+archivo_bp.route("", methods=["POST"])(vista("archivo_controller.archivar_periodos"))       # Archivar los meses cerrados (?hasta=YYYY-MM)
+
+# Registro de cambios para consumidores incrementales
+cambios_bp = Blueprint("cambios", __name__, url_prefix="/api/cambios")
+cambios_bp.route("", methods=["GET"])(vista("cambios_controller.obtener_cambios"))          # Eventos posteriores a ?desde=<seq> (long-poll)
+
+# Sincronización incremental de clientes offline
+sync_bp = Blueprint("sync", __name__, url_prefix="/api/sync")
+sync_bp.route("", methods=["GET"])(vista("sync_controller.sincronizar"))                    # Registros cambiados y borrados desde ?desde=<rev>
 
 # NOTA:
 # Este archivo solo define las rutas y blueprints. Los blueprints se registran en la aplicación principal (app.py).
@@ -0,0 +1,88 @@
+"""
+Carga diferida de los controladores.
+
+Las rutas se registran apuntando a una "vista diferida" en lugar de a la función del
+controlador. El módulo del controlador (y todo lo que importa) se carga recién la primera
+vez que llega una petición a esa ruta. Así crear la app es rápido, y los procesos que
+nunca atienden ciertas rutas (por ejemplo, las de facturas con sus PDFs) no pagan su importación.
+
+Términos clave:
+- Vista (view function): Función que Flask ejecuta para atender un endpoint.
+- Carga diferida (lazy loading): Postergar una importación costosa hasta que realmente se necesita.
+- Ruta de importación: Texto "modulo.funcion" que indica dónde está la vista, ej:
+  "ventas_controller.registrar_venta" (dentro del paquete controllers).
+"""
+
+from importlib import import_module
+from threading import Lock
+
+PAQUETE_CONTROLADORES = "controllers"
+
+# Atributos que los decoradores agregan a las vistas y que se consultan desde afuera
+# (ej: asgi.py). El resto no se delega: Flask inspecciona la vista al registrarla
+# (methods, provide_automatic_options, ...) y eso no debe forzar la importación.
+ATRIBUTOS_DELEGADOS = ("almacenes_cache",)
+
+_vistas = {}
+_lock = Lock()
+
+
+class VistaDiferida:
+    """
+    Vista que importa su controlador la primera vez que se usa y después delega en él.
+    """
+
+    def __init__(self, ruta_importacion):
+        self.ruta_importacion = ruta_importacion
+        self.__name__ = ruta_importacion.rsplit(".", 1)[1]  # Flask usa __name__ como nombre del endpoint
+        self._vista = None
+
+    def resolver(self):
+        """
+        Importa el controlador (si todavía no se importó) y devuelve la función real.
+
+        Returns:
+            callable: Función del controlador.
+        """
+        if self._vista is None:
+            modulo, funcion = self.ruta_importacion.rsplit(".", 1)
+            self._vista = getattr(import_module(f"{PAQUETE_CONTROLADORES}.{modulo}"), funcion)
+        return self._vista
+
+    def __call__(self, *args, **kwargs):
+        return self.resolver()(*args, **kwargs)
+
+    def __getattr__(self, nombre):
+        if nombre in ATRIBUTOS_DELEGADOS:
+            return getattr(self.resolver(), nombre)
+        raise AttributeError(nombre)
+
+
+def vista(ruta_importacion):
+    """
+    Devuelve la vista diferida de un controlador. La misma ruta devuelve siempre el mismo
+    objeto, así una vista se puede registrar en varias URLs con el mismo endpoint.
+
+    Args:
+        ruta_importacion (str): "modulo.funcion" dentro de controllers.
+
+    Returns:
+        VistaDiferida: Vista lista para registrar en un blueprint.
+    """
+    with _lock:
+        if ruta_importacion not in _vistas:
+            _vistas[ruta_importacion] = VistaDiferida(ruta_importacion)
+        return _vistas[ruta_importacion]
+
+
+def resolver_todas(app):
+    """
+    Importa de una vez todos los controladores registrados en la app. Lo usa el servidor
+    de producción antes de crear los workers, para que cada uno no tenga que importarlos.
+
+    Args:
+        app (Flask): Aplicación con los blueprints ya registrados.
+    """
+    for funcion in app.view_functions.values():
+        if isinstance(funcion, VistaDiferida):
+            funcion.resolver()
@@ -10,13 +10,8 @@ Este archivo vincula las rutas HTTP con sus controladores respectivos. No contie
 """
 
 from flask import Blueprint
-from controllers.usuarios_controllers import (
-    registrar_usuario,
-    obtener_usuarios,
-    actualizar_usuario,
-    eliminar_usuario,
-    login_usuario
-)
+# El controlador de usuarios se importa en la primera petición (ver carga_diferida.py)
+from routes.carga_diferida import vista
 
 # Blueprint para usuarios.
 # url_prefix='/api/usuarios' hace que todas las rutas definidas aquí comiencen con ese prefijo.
@@ -28,21 +23,21 @@ usuarios_bp = Blueprint('usuarios', __name__, url_prefix='/api/usuarios')
 
 # POST /api/usuarios/
 # Registrar nuevo usuario (alta)
-usuarios_bp.route('/', methods=['POST'])(registrar_usuario)
+usuarios_bp.route('/', methods=['POST'])(vista("usuarios_controllers.registrar_usuario"))
 
 # GET /api/usuarios/
 # Obtener todos los usuarios (listado)
-usuarios_bp.route('/', methods=['GET'])(obtener_usuarios)
+usuarios_bp.route('/', methods=['GET'])(vista("usuarios_controllers.obtener_usuarios"))
 
 # PUT /api/usuarios/<usuario_id>
 # Actualizar usuario por su ID (modificación de datos)
-usuarios_bp.route('/<int:usuario_id>', methods=['PUT'])(actualizar_usuario)
+usuarios_bp.route('/<int:usuario_id>', methods=['PUT'])(vista("usuarios_controllers.actualizar_usuario"))
 
 # DELETE /api/usuarios/<usuario_id>
 # Eliminar usuario por su ID (baja)
-usuarios_bp.route('/<int:usuario_id>', methods=['DELETE'])(eliminar_usuario)
+usuarios_bp.route('/<int:usuario_id>', methods=['DELETE'])(vista("usuarios_controllers.eliminar_usuario"))
 
 # POST /api/usuarios/login
 # Login de usuario (autenticación, inicio de sesión)
-usuarios_bp.route('/login', methods=['POST'])(login_usuario)
+usuarios_bp.route('/login', methods=['POST'])(vista("usuarios_controllers.login_usuario"))
 
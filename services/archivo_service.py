@@ -0,0 +1,171 @@
+"""
+Archivo de períodos cerrados (datos fríos) de ventas y caja.
+
+Casi todas las consultas miran las últimas semanas, pero sin archivo cada una carga toda la
+historia. El trabajo de archivo (POST /api/archivo, o `python -m services.archivo_service`
+desde un cron) mueve los meses viejos de ventas y de caja, que incluye los pagos, a
+data/<almacén>/archivo/ comprimidos. Además guarda en el manifiesto un resumen por día de
+cada mes archivado.
+
+- Los endpoints de siempre siguen devolviendo los datos archivados: las particiones se leen
+  solo cuando una consulta llega a ellas (paginado, pagos, conciliación).
+- Las métricas usan el resumen de los meses archivados y solo recorren los meses calientes.
+- Si se edita o borra un registro archivado, su mes se reescribe en el archivo con el
+  resumen recalculado en ese momento (una vez por escritura, no en cada consulta).
+
+Requiere CAJA_PARTICIONES=1 (ver services/particiones_service.py).
+
+Términos clave:
+- Datos calientes: Meses recientes, que se leen y modifican seguido. Quedan sin comprimir.
+- Datos fríos: Meses cerrados que casi no se consultan. Se guardan comprimidos.
+- Resumen precalculado: Totales por día de un mes archivado (ventas, ingresos, egresos,
+  unidades por producto), calculados una vez al archivar.
+"""
+
+import sys
+from datetime import datetime
+
+import config
+from services import particiones_service
+from services.particiones_service import VistaParticionada
+from services.utilidades import ahora_str
+
+
+def mes_limite(meses_calientes=None):
+    """
+    Devuelve el último mes a archivar dejando `meses_calientes` meses sin archivar.
+
+    Args:
+        meses_calientes (int): Meses calientes, contando el actual. Por defecto, config.ARCHIVO_MESES_CALIENTES.
+
+    Returns:
+        str: Mes en formato YYYY-MM.
+    """
+    meses_calientes = config.ARCHIVO_MESES_CALIENTES if meses_calientes is None else meses_calientes
+    anio, mes = map(int, ahora_str()[:7].split("-"))
+    total = anio * 12 + (mes - 1) - max(meses_calientes, 1)
+    return f"{total // 12:04d}-{total % 12 + 1:02d}"
+
+
+def resumir_ventas(ventas):
+    """
+    Resume ventas por día, con las unidades vendidas por producto.
+
+    Args:
+        ventas (list): Ventas a resumir.
+
+    Returns:
+        dict: {"dias": {dia: [ventas, ingresos]}, "items": unidades, "productos": {nombre: unidades}}.
+    """
+    dias, productos, items = {}, {}, 0
+    for venta in ventas:
+        dia = dias.setdefault(venta.get("fecha", "")[:10], [0, 0])
+        dia[0] += 1
+        dia[1] += venta.get("total", 0)
+        for item in venta.get("items", []):
+            cantidad = item.get("cantidad", 0)
+            nombre = item.get("nombre", "Desconocido")
+            items += cantidad
+            productos[nombre] = productos.get(nombre, 0) + cantidad
+    return {"dias": dias, "items": items, "productos": productos}
+
+
+def resumir_movimientos(movimientos):
+    """
+    Resume los egresos de caja (los pagos) por día.
+
+    Args:
+        movimientos (list): Movimientos de caja.
+
+    Returns:
+        dict: {"egresos": {dia: [cantidad, monto]}}.
+    """
+    egresos = {}
+    for movimiento in movimientos:
+        if movimiento.get("tipo") != "egreso":
+            continue
+        dia = egresos.setdefault(movimiento.get("fecha", "")[:10], [0, 0])
+        dia[0] += 1
+        dia[1] += movimiento.get("monto", 0)
+    return {"egresos": egresos}
+
+
+# Resumidor de cada almacén, por nombre (también lo usa particiones_service al reescribir un mes archivado)
+RESUMIDORES = {"ventas": resumir_ventas, "caja": resumir_movimientos}
+
+
+def resumenes(registros, resumir):
+    """
+    Recorre los resúmenes de una lista de registros: el precalculado de cada mes archivado y
+    uno calculado en el momento para los demás (y para un mes archivado sin resumen, que solo
+    queda en manifiestos escritos antes de que se guardara al reescribirlo). Sin particiones,
+    un único resumen de todo.
+
+    Args:
+        registros (list | VistaParticionada): Ventas o movimientos.
+        resumir (callable): resumir_ventas o resumir_movimientos.
+
+    Yields:
+        dict: Resumen de cada tramo.
+    """
+    if not isinstance(registros, VistaParticionada):
+        yield resumir(registros)
+        return
+    for i, entrada in enumerate(registros.particiones):
+        if entrada.get("archivada") and entrada.get("resumen") is not None:
+            yield entrada["resumen"]
+        else:
+            yield resumir(registros.registros_de(i))
+
+
+def archivar(hasta_mes=None):
+    """
+    Archiva los meses de ventas y caja hasta `hasta_mes` inclusive (nunca el mes actual).
+
+    Args:
+        hasta_mes (str): Último mes a archivar (YYYY-MM). Por defecto, según mes_limite().
+
+    Returns:
+        dict: {"hasta": mes, "ventas": [meses archivados], "caja": [meses archivados]}.
+    """
+    hasta_mes = hasta_mes or mes_limite()
+    return {
+        "hasta": hasta_mes,
+        "ventas": particiones_service.ventas.archivar(hasta_mes, RESUMIDORES["ventas"]),
+        "caja": particiones_service.caja.archivar(hasta_mes, RESUMIDORES["caja"]),
+    }
+
+
+def estado():
+    """
+    Describe cada partición de ventas y caja: mes, cantidad de registros y si está archivada.
+
+    Returns:
+        dict: {"ventas": [...], "caja": [...]}.
+    """
+    return {
+        almacen.nombre: [
+            {"mes": p["mes"], "cantidad": p["cantidad"], "archivada": p.get("archivada", False)}
+            for p in almacen.manifiesto()["particiones"]
+        ]
+        for almacen in (particiones_service.ventas, particiones_service.caja)
+    }
+
+
+def mes_valido(mes):
+    """Indica si `mes` tiene el formato YYYY-MM."""
+    try:
+        datetime.strptime(mes, "%Y-%m")
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    # Uso (desde la carpeta del proyecto): python -m services.archivo_service [YYYY-MM]
+    if not particiones_service.habilitado():
+        sys.exit("El archivo requiere CAJA_PARTICIONES=1")
+    hasta = sys.argv[1] if len(sys.argv) > 1 else None
+    if hasta and not mes_valido(hasta):
+        sys.exit("Mes inválido. Usar el formato YYYY-MM")
+    print(archivar(hasta))
@@ -0,0 +1,143 @@
+"""
+Bitácoras: archivos de solo agregado (JSON Lines) ordenados por número de secuencia.
+
+Las usan el registro de cambios (eventos_service) y las revisiones para sincronización
+(revisiones_service). Cada línea es un JSON con un campo "seq" que crece de a uno.
+
+- agregar() asigna los números con el bloqueo de datos tomado, así no se repiten aunque
+  escriban varios workers, y sobreviven a los reinicios.
+- leer_desde() ubica el primer registro posterior a un número con búsqueda binaria sobre el
+  archivo y lee solo lo que sigue, sin recorrer la bitácora entera.
+
+Términos clave:
+- JSON Lines (.jsonl): Un JSON por línea; agregar es escribir al final del archivo.
+- Número de secuencia (seq): Posición del registro en la bitácora.
+- Búsqueda binaria: Como las líneas están ordenadas por seq, se encuentra una posición con
+  pocas lecturas salteadas.
+"""
+
+import json
+import os
+
+from services.persistencia_service import bloqueo
+
+_ultimo = {}  # ruta absoluta -> (tamaño del archivo, último seq)
+
+
+def ultimo_seq(ruta):
+    """
+    Devuelve el último seq de la bitácora, leyendo solo su final (o del caché si el
+    tamaño del archivo no cambió).
+
+    Args:
+        ruta (str): Archivo de la bitácora.
+
+    Returns:
+        int: Último seq (0 si está vacía o no existe).
+    """
+    try:
+        tamanio = os.path.getsize(ruta)
+    except FileNotFoundError:
+        return 0
+    clave = os.path.abspath(ruta)
+    guardado = _ultimo.get(clave)
+    if guardado and guardado[0] == tamanio:
+        return guardado[1]
+
+    with open(ruta, "rb") as f:
+        bloque = 4096
+        while True:
+            f.seek(max(0, tamanio - bloque))
+            contenido = f.read(tamanio)
+            # Se descarta una línea que otro worker esté escribiendo en este momento
+            lineas = contenido[:contenido.rfind(b"\n") + 1].splitlines()
+            if len(lineas) > 1 or bloque >= tamanio:
+                break
+            bloque *= 2
+    seq = json.loads(lineas[-1])["seq"] if lineas else 0
+    _ultimo[clave] = (tamanio, seq)
+    return seq
+
+
+def agregar(ruta, registros):
+    """
+    Agrega registros al final de la bitácora asignándoles números de secuencia consecutivos.
+
+    Args:
+        ruta (str): Archivo de la bitácora.
+        registros (list): Registros (dict) a agregar; se les asigna "seq" en el lugar.
+
+    Returns:
+        list: Los mismos registros, con su seq.
+    """
+    if not registros:
+        return registros
+    with bloqueo:
+        seq = ultimo_seq(ruta)
+        lineas = []
+        for registro in registros:
+            seq += 1
+            registro["seq"] = seq
+            lineas.append(json.dumps(registro, ensure_ascii=False) + "\n")
+        os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+        with open(ruta, "ab") as f:
+            f.write("".join(lineas).encode("utf-8"))
+            tamanio = f.tell()
+        _ultimo[os.path.abspath(ruta)] = (tamanio, seq)
+    return registros
+
+
+def _linea_desde(f, posicion):
+    """Ubica la primera línea que empieza en `posicion` o después: (offset, seq o None si no hay)."""
+    if posicion == 0:
+        f.seek(0)
+    else:
+        f.seek(posicion - 1)
+        f.readline()
+    offset = f.tell()
+    linea = f.readline()
+    if not linea.endswith(b"\n"):  # Fin del archivo (o una línea que se está escribiendo)
+        return offset, None
+    return offset, json.loads(linea)["seq"]
+
+
+def leer_desde(ruta, desde, limite=None, filtro=None):
+    """
+    Devuelve los registros con seq mayor a `desde`.
+
+    Args:
+        ruta (str): Archivo de la bitácora.
+        desde (int): Último seq ya procesado (0 para empezar del principio).
+        limite (int): Máximo de registros a devolver. Opcional.
+        filtro (callable): Si se indica, solo registros para los que devuelve True.
+
+    Returns:
+        tuple: (registros en orden de seq, hasta): "hasta" es el último seq revisado, el
+            "desde" de la próxima consulta (con filtro puede ser mayor al último devuelto).
+    """
+    if not os.path.exists(ruta):
+        return [], desde
+    registros, hasta = [], desde
+    with open(ruta, "rb") as f:
+        # Búsqueda binaria del primer registro con seq > desde
+        inicio, fin = 0, os.fstat(f.fileno()).st_size
+        while inicio < fin:
+            medio = (inicio + fin) // 2
+            _, seq = _linea_desde(f, medio)
+            if seq is None or seq > desde:
+                fin = medio
+            else:
+                inicio = medio + 1
+        f.seek(_linea_desde(f, inicio)[0])
+
+        for linea in f:
+            if not linea.endswith(b"\n"):
+                break
+            registro = json.loads(linea)
+            hasta = registro["seq"]
+            if filtro and not filtro(registro):
+                continue
+            registros.append(registro)
+            if limite and len(registros) >= limite:
+                break
+    return registros, hasta
@@ -0,0 +1,166 @@
+"""
+Servicio de caché HTTP para los endpoints de lectura (ETag / 304 Not Modified).
+
+El dashboard consulta cada pocos segundos productos, ventas, caja, pagos y métricas.
+Antes, cada consulta leía los JSON y volvía a serializar toda la respuesta aunque
+nada hubiera cambiado. Ahora cada almacén de datos tiene una versión, y con ella se
+arma el ETag de la respuesta:
+- Si el cliente manda `If-None-Match` con el ETag vigente, se responde 304 sin leer ni
+  serializar nada.
+- Si no, se busca la respuesta ya serializada en una caché LRU en memoria y, si tampoco
+  está, se ejecuta el endpoint y se guarda el resultado.
+
+Términos clave:
+- ETag: Identificador de una versión concreta de una respuesta. El navegador lo guarda y
+  lo reenvía en el header `If-None-Match`.
+- 304 Not Modified: Respuesta sin cuerpo que le indica al cliente que use la copia que ya tiene.
+- Versión de almacén: Contador que se incrementa en cada guardar_* de ese almacén,
+  combinado con la fecha de modificación y el tamaño del archivo (así también se detectan
+  cambios hechos por otro proceso o a mano).
+- LRU (Least Recently Used): Caché de tamaño fijo que, al llenarse, descarta la entrada usada
+  hace más tiempo.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict, defaultdict
+from functools import wraps
+
+from flask import make_response, request
+
+import config
+
+# Archivo de cada almacén (las mismas rutas que usan los controladores)
+ARCHIVOS = {
+    "productos": "data/productos.json",
+    "ventas": "data/ventas.json",
+    "caja": "data/caja.json",
+    "facturas": "data/facturas.json",
+    "indices": "data/indices.json",
+    "usuarios": "data/usuarios.json",
+    "cierres": "data/cierres.json",
+    "pagos_legado": "data/pagos.json",
+}
+
+# Con CAJA_PARTICIONES=1 ventas y caja son carpetas: su versión sale del manifiesto
+ARCHIVOS_PARTICIONADOS = {
+    "ventas": "data/ventas/manifiesto.json",
+    "caja": "data/caja/manifiesto.json",
+}
+
+MAX_RESPUESTAS = 256
+
+_contadores = defaultdict(int)
+_respuestas = OrderedDict()  # (endpoint, args, versión) -> (cuerpo, mimetype)
+_lock = threading.Lock()
+
+
+def incrementar_version(almacen):
+    """
+    Marca que un almacén cambió. Se llama desde cada guardar_*.
+
+    Args:
+        almacen (str): Nombre del almacén (clave de ARCHIVOS).
+    """
+    with _lock:
+        _contadores[almacen] += 1
+
+
+def version(almacenes):
+    """
+    Devuelve la versión combinada de varios almacenes sin leer su contenido
+    (solo el contador en memoria y un os.stat de cada archivo).
+
+    Args:
+        almacenes (tuple): Nombres de los almacenes.
+
+    Returns:
+        tuple: Versión comparable y hasheable.
+    """
+    partes = []
+    for almacen in almacenes:
+        try:
+            ruta = ARCHIVOS_PARTICIONADOS.get(almacen) if config.PARTICIONES else None
+            st = os.stat(ruta or ARCHIVOS[almacen])
+            firma = (st.st_mtime_ns, st.st_size, st.st_ino)
+        except FileNotFoundError:
+            firma = None
+        partes.append((almacen, _contadores[almacen], firma))
+    # El directorio de trabajo forma parte de la versión porque las rutas son relativas
+    return (os.getcwd(), tuple(partes))
+
+
+def limpiar():
+    """Vacía la caché de respuestas."""
+    with _lock:
+        _respuestas.clear()
+
+
+def clave_de(endpoint, args, kwargs, almacenes):
+    """
+    Arma la clave de caché de una respuesta.
+
+    Args:
+        endpoint (str): Nombre del endpoint de Flask.
+        args (iterable): Pares (parámetro, valor) de la query string.
+        kwargs (dict): Parámetros de la URL.
+        almacenes (tuple): Almacenes de los que depende la respuesta.
+
+    Returns:
+        tuple: (endpoint, args, kwargs, versión).
+    """
+    return (endpoint, tuple(sorted(args)), tuple(sorted(kwargs.items())), version(almacenes))
+
+
+def etag_de(clave):
+    """Devuelve el ETag que corresponde a una clave de caché."""
+    return hashlib.sha1(repr(clave).encode("utf-8")).hexdigest()
+
+
+def cacheable(*almacenes):
+    """
+    Decorador para endpoints GET cuya respuesta depende solo de los almacenes indicados
+    y de los parámetros de la query string.
+
+    Args:
+        *almacenes (str): Almacenes de los que depende la respuesta.
+    """
+    def decorador(funcion):
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            clave = clave_de(request.endpoint, request.args.items(multi=True), kwargs, almacenes)
+            etag = etag_de(clave)
+
+            # Comparación débil: si la respuesta se envió comprimida, el cliente la guardó como W/"..."
+            if request.if_none_match.contains_weak(etag):
+                respuesta = make_response("", 304)
+                respuesta.set_etag(etag)
+                return respuesta
+
+            with _lock:
+                guardada = _respuestas.get(clave)
+                if guardada is not None:
+                    _respuestas.move_to_end(clave)
+
+            if guardada is not None:
+                cuerpo, mimetype = guardada
+                respuesta = make_response(cuerpo, 200)
+                respuesta.mimetype = mimetype
+            else:
+                respuesta = make_response(funcion(*args, **kwargs))
+                if respuesta.status_code != 200:
+                    return respuesta
+                with _lock:
+                    _respuestas[clave] = (respuesta.get_data(), respuesta.mimetype)
+                    while len(_respuestas) > MAX_RESPUESTAS:
+                        _respuestas.popitem(last=False)
+
+            respuesta.set_etag(etag)
+            respuesta.headers["Cache-Control"] = "no-cache"  # siempre revalidar con el ETag
+            return respuesta
+
+        # Se expone para que el modo ASGI pueda responder 304 sin pasar por Flask
+        envoltura.almacenes_cache = almacenes
+        return envoltura
+    return decorador
@@ -0,0 +1,210 @@
+"""
+Servicio de cierres de caja diarios: totales de ingresos y egresos por día y por método de pago.
+
+Los totales se acumulan a medida que se registran movimientos (ventas, pagos, ingresos
+y egresos), así el reporte del día se sirve sin recorrer ventas ni movimientos.
+
+Términos clave:
+- Cierre de caja: Resumen de lo que entró y salió en un día, separado por método de pago.
+- Día abierto: Día cuyo cierre todavía se está acumulando (se guarda en data/cierres.json).
+- Día archivado: Día ya cerrado. Su resumen se agrega como una línea al final de
+  data/cierres_archivo.jsonl y nunca se modifica (registro inmutable).
+- Ajuste: Si después de archivar un día llega un movimiento con esa fecha (por ejemplo, un pago
+  cargado con fecha pasada), se archiva otra línea para ese día marcada como ajuste.
+- Offset: Posición en bytes de cada línea dentro del archivo, guardada por día para leerla
+  directamente sin recorrer el archivo completo.
+
+Estructura de data/cierres.json:
+- "desde": Primer día acumulado (los movimientos anteriores a esta funcionalidad no se cuentan).
+- "abiertos": {dia: {metodo: {"ingresos", "egresos", "operaciones"}}}
+- "archivo": {dia: [offset, ...]} posiciones de las líneas archivadas de cada día.
+"""
+
+import json
+import os
+from datetime import datetime
+
+from services.cache_service import incrementar_version
+from services.persistencia_service import escribir_json
+from services.instrumentacion_service import medir_io
+
+CIERRES_FILE = "data/cierres.json"
+ARCHIVO_FILE = "data/cierres_archivo.jsonl"
+SIN_METODO = "sin especificar"
+
+
+def _hoy():
+    return datetime.now().strftime("%Y-%m-%d")
+
+
+@medir_io("cierres", CIERRES_FILE)
+def cargar_cierres():
+    """
+    Carga el estado de los cierres desde el archivo JSON.
+    Si no existe, empieza a acumular desde hoy.
+
+    Returns:
+        dict: Estado de los cierres (desde, abiertos, archivo).
+    """
+    if not os.path.exists(CIERRES_FILE):
+        return {"desde": _hoy(), "abiertos": {}, "archivo": {}}
+    with open(CIERRES_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@medir_io("cierres", CIERRES_FILE)
+def guardar_cierres(cierres):
+    """
+    Guarda el estado de los cierres en el archivo JSON.
+
+    Args:
+        cierres (dict): Estado de los cierres.
+    """
+    escribir_json(CIERRES_FILE, cierres, ensure_ascii=False)
+    incrementar_version("cierres")
+
+
+def metodo_de(movimiento):
+    """
+    Devuelve el método de pago de un movimiento: "metodo" en los ingresos por venta
+    y detalles["metodo"] en los egresos y pagos.
+
+    Args:
+        movimiento (dict): Movimiento de caja.
+
+    Returns:
+        str: Método de pago, o "sin especificar".
+    """
+    metodo = movimiento.get("metodo") or movimiento.get("detalles", {}).get("metodo")
+    return metodo.strip().lower() if isinstance(metodo, str) and metodo.strip() else SIN_METODO
+
+
+def _archivar(cierres, dia):
+    """
+    Agrega el resumen de un día abierto al archivo inmutable y lo quita de los abiertos.
+    """
+    metodos = cierres["abiertos"].pop(dia)
+    registro = {
+        "fecha": dia,
+        # Formato compacto: metodo -> [ingresos, egresos, operaciones]
+        "metodos": {m: [t["ingresos"], t["egresos"], t["operaciones"]] for m, t in metodos.items()},
+        "ingresos": sum(t["ingresos"] for t in metodos.values()),
+        "egresos": sum(t["egresos"] for t in metodos.values()),
+        "cerrado": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "ajuste": dia in cierres["archivo"],
+    }
+
+    os.makedirs(os.path.dirname(ARCHIVO_FILE), exist_ok=True)
+    with open(ARCHIVO_FILE, "ab") as f:
+        offset = f.tell()
+        f.write(json.dumps(registro, ensure_ascii=False).encode("utf-8") + b"\n")
+    cierres["archivo"].setdefault(dia, []).append(offset)
+
+
+def archivar_dias_cerrados(cierres):
+    """
+    Archiva todos los días abiertos anteriores a hoy.
+
+    Args:
+        cierres (dict): Estado de los cierres.
+    """
+    hoy = _hoy()
+    for dia in sorted(d for d in cierres["abiertos"] if d < hoy):
+        _archivar(cierres, dia)
+
+
+def registrar(movimiento, monto, operaciones):
+    """
+    Acumula una variación en el cierre del día del movimiento.
+
+    Args:
+        movimiento (dict): Movimiento de caja (se usan su fecha, tipo y método).
+        monto (float): Variación del monto (negativa al quitar o reducir un movimiento).
+        operaciones (int): Variación de la cantidad de operaciones (1, -1 o 0).
+    """
+    tipo = movimiento.get("tipo")
+    dia = movimiento.get("fecha", "")[:10]
+    cierres = cargar_cierres()
+    if tipo not in ("ingreso", "egreso") or dia < cierres["desde"]:
+        return
+
+    archivar_dias_cerrados(cierres)
+
+    totales = cierres["abiertos"].setdefault(dia, {}).setdefault(
+        metodo_de(movimiento), {"ingresos": 0, "egresos": 0, "operaciones": 0}
+    )
+    totales["ingresos" if tipo == "ingreso" else "egresos"] += monto
+    totales["operaciones"] += operaciones
+    guardar_cierres(cierres)
+
+
+def _leer_archivados(offsets):
+    """Lee las líneas archivadas de un día yendo directo a cada offset."""
+    registros = []
+    with open(ARCHIVO_FILE, "rb") as f:
+        for offset in offsets:
+            f.seek(offset)
+            registros.append(json.loads(f.readline()))
+    return registros
+
+
+def reporte_del_dia(dia):
+    """
+    Arma el reporte de cierre de un día combinando lo archivado y lo que sigue abierto.
+
+    Args:
+        dia (str): Día del reporte (YYYY-MM-DD).
+
+    Returns:
+        dict: Totales por método, totales generales y si el día ya está cerrado.
+    """
+    cierres = cargar_cierres()
+    metodos = {}
+
+    def sumar(metodo, ingresos, egresos, operaciones):
+        totales = metodos.setdefault(metodo, {"ingresos": 0, "egresos": 0, "operaciones": 0})
+        totales["ingresos"] += ingresos
+        totales["egresos"] += egresos
+        totales["operaciones"] += operaciones
+
+    offsets = cierres["archivo"].get(dia, [])
+    if offsets:
+        for registro in _leer_archivados(offsets):
+            for metodo, (ingresos, egresos, operaciones) in registro["metodos"].items():
+                sumar(metodo, ingresos, egresos, operaciones)
+    for metodo, totales in cierres["abiertos"].get(dia, {}).items():
+        sumar(metodo, totales["ingresos"], totales["egresos"], totales["operaciones"])
+
+    for totales in metodos.values():
+        totales["neto"] = totales["ingresos"] - totales["egresos"]
+
+    total_ingresos = sum(t["ingresos"] for t in metodos.values())
+    total_egresos = sum(t["egresos"] for t in metodos.values())
+    return {
+        "fecha": dia,
+        "metodos": metodos,
+        "total_ingresos": total_ingresos,
+        "total_egresos": total_egresos,
+        "neto": total_ingresos - total_egresos,
+        "cerrado": bool(offsets) and dia not in cierres["abiertos"],
+        "disponible_desde": cierres["desde"],
+    }
+
+
+def cerrar_dia(dia):
+    """
+    Cierra (archiva) a pedido un día que todavía está abierto, incluido el día actual.
+    Los movimientos que lleguen después para ese día se archivan como ajuste.
+
+    Args:
+        dia (str): Día a cerrar (YYYY-MM-DD).
+
+    Returns:
+        bool: True si había algo para archivar.
+    """
+    cierres = cargar_cierres()
+    if dia not in cierres["abiertos"]:
+        return False
+    _archivar(cierres, dia)
+    guardar_cierres(cierres)
+    return True
@@ -0,0 +1,117 @@
+"""
+Compresión de las respuestas de la API (gzip y, si está instalado, brotli).
+
+Las respuestas de listados y métricas son JSON grandes y muy repetitivos, que se comprimen
+a una fracción de su tamaño. La compresión se negocia con el header `Accept-Encoding` del
+cliente y solo se aplica a respuestas de texto/JSON que superan un tamaño mínimo.
+
+Términos clave:
+- Accept-Encoding: Header con el que el cliente indica qué compresiones entiende (ej: "gzip, br").
+- Content-Encoding: Header con el que el servidor indica qué compresión aplicó.
+- Brotli (br): Algoritmo de compresión que suele lograr archivos más chicos que gzip.
+  Es opcional (`pip install brotli`); sin él se usa solo gzip.
+- Umbral: Tamaño mínimo para comprimir. En respuestas chicas el ahorro no compensa el tiempo.
+- ETag débil (W/"..."): Al comprimir, el cuerpo enviado ya no es byte a byte el original, así
+  que el ETag se marca como débil. Sigue sirviendo para responder 304.
+
+Las respuestas de archivos (PDF, exportaciones ZIP) se envían en streaming y no se tocan.
+"""
+
+import gzip
+import threading
+from collections import OrderedDict
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # Dependencia opcional
+    brotli = None
+
+UMBRAL_BYTES = 1024
+NIVEL_GZIP = 6
+CALIDAD_BROTLI = 5
+MAX_COMPRIMIDAS = 128
+TIPOS_COMPRIMIBLES = {"application/json", "text/html", "text/plain", "text/csv", "text/css", "application/javascript"}
+
+# Respuestas ya comprimidas, por (ETag, encoding): el dashboard pide lo mismo una y otra vez
+_comprimidas = OrderedDict()
+_lock = threading.Lock()
+
+
+def encodings_soportados():
+    """Devuelve las compresiones disponibles, de la preferida a la menos preferida."""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def comprimir(datos, encoding):
+    """
+    Comprime un cuerpo de respuesta.
+
+    Args:
+        datos (bytes): Cuerpo original.
+        encoding (str): "br" o "gzip".
+
+    Returns:
+        bytes: Cuerpo comprimido.
+    """
+    if encoding == "br":
+        return brotli.compress(datos, quality=CALIDAD_BROTLI)
+    return gzip.compress(datos, compresslevel=NIVEL_GZIP)
+
+
+def comprimir_respuesta(respuesta):
+    """
+    Comprime la respuesta si corresponde. Se registra como `after_request`.
+
+    Args:
+        respuesta (Response): Respuesta generada por el endpoint.
+
+    Returns:
+        Response: La misma respuesta, comprimida o no.
+    """
+    respuesta.vary.add("Accept-Encoding")
+    if (
+        respuesta.status_code != 200
+        or respuesta.direct_passthrough
+        or respuesta.is_streamed
+        or "Content-Encoding" in respuesta.headers
+        or respuesta.mimetype not in TIPOS_COMPRIMIBLES
+    ):
+        return respuesta
+
+    encoding = request.accept_encodings.best_match(encodings_soportados())
+    if encoding is None:
+        return respuesta
+
+    datos = respuesta.get_data()
+    if len(datos) < UMBRAL_BYTES:
+        return respuesta
+
+    etag, debil = respuesta.get_etag()
+    clave = (etag, encoding) if etag else None
+    with _lock:
+        comprimido = _comprimidas.get(clave) if clave else None
+    if comprimido is None:
+        comprimido = comprimir(datos, encoding)
+        if clave:
+            with _lock:
+                _comprimidas[clave] = comprimido
+                while len(_comprimidas) > MAX_COMPRIMIDAS:
+                    _comprimidas.popitem(last=False)
+
+    respuesta.set_data(comprimido)
+    respuesta.headers["Content-Encoding"] = encoding
+    if etag and not debil:
+        respuesta.set_etag(etag, weak=True)
+    return respuesta
+
+
+def configurar_compresion(app):
+    """
+    Activa la compresión de respuestas en la app.
+
+    Args:
+        app (Flask): Aplicación a configurar.
+    """
+    app.after_request(comprimir_respuesta)
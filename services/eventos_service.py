@@ -0,0 +1,141 @@
+"""
+Registro de cambios (change feed): cada controlador que modifica datos publica un evento
+después de guardar, y los consumidores leen solo lo nuevo en lugar de releer los JSON enteros.
+
+Tipos de evento y sus datos:
+- venta_creada / venta_actualizada: la venta.       - venta_eliminada: {"id"}.
+- movimiento_creado: el movimiento de caja.           - movimiento_eliminado: {"id", "tipo"}.
+- pago_registrado: el pago (con el formato de la API).
+- factura_emitida: la factura.
+- stock_cambiado: {"motivo", "productos": [{"id", "nombre", "stock", "variacion"}]}.
+- producto_eliminado: {"id", "nombre", "stock"} (stock que tenía al darse de baja).
+
+Los eventos se agregan a data/eventos.jsonl (una línea por evento) con un número de
+secuencia que nunca se repite ni retrocede, asignado con el bloqueo de datos tomado. Así vale
+entre varios workers y sobrevive a los reinicios. Un consumidor guarda el último número que
+procesó y pide GET /api/cambios?desde=<seq>. Si no hay nada nuevo, la petición espera
+(long-poll) hasta que llegue un evento o se cumpla el tiempo de espera.
+
+Dentro del proceso también se puede suscribir una función a ciertos tipos (suscribir()).
+
+Términos clave:
+- Publicar/suscribir (pub/sub): El que produce el evento no conoce a quién le interesa.
+- Número de secuencia (seq): Posición del evento en el registro; "desde" es el último ya leído.
+- Long-poll: La petición queda abierta hasta que hay novedades (o vence la espera), así el
+  consumidor se entera enseguida sin consultar a cada rato.
+
+El archivo es una bitácora (ver services/bitacora_service.py): el evento siguiente a "desde"
+se ubica con búsqueda binaria, sin recorrer el registro entero.
+"""
+
+import threading
+import time
+from collections import defaultdict
+
+from services import bitacora_service
+from services.utilidades import ahora_str
+
+EVENTOS_FILE = "data/eventos.jsonl"
+TIPOS = (
+    "venta_creada", "venta_actualizada", "venta_eliminada",
+    "movimiento_creado", "movimiento_eliminado",
+    "pago_registrado", "factura_emitida", "stock_cambiado", "producto_eliminado",
+)
+MAX_ESPERA = 30  # segundos máximos de un long-poll
+INTERVALO_SONDEO = 0.5  # cada cuánto se revisa el archivo (por eventos de otros workers)
+
+_suscriptores = defaultdict(list)  # tipo -> [funcion]
+_nuevos = threading.Condition()
+
+
+def suscribir(funcion, *tipos):
+    """
+    Registra una función que se llama con cada evento publicado en este proceso.
+
+    Args:
+        funcion (callable): Recibe el evento (dict con seq, tipo, fecha y datos).
+        *tipos (str): Tipos de evento que le interesan. Sin tipos, todos.
+    """
+    for tipo in tipos or (None,):
+        _suscriptores[tipo].append(funcion)
+
+
+def publicar(tipo, datos):
+    """
+    Agrega un evento al registro y avisa a los suscriptores y a los long-poll en espera.
+    Se llama después de guardar los datos que describe.
+
+    Args:
+        tipo (str): Tipo de evento (uno de TIPOS).
+        datos (dict): Datos del evento.
+
+    Returns:
+        dict: Evento publicado (con su seq).
+    """
+    evento = {"seq": None, "tipo": tipo, "fecha": ahora_str(), "datos": datos}
+    bitacora_service.agregar(EVENTOS_FILE, [evento])
+
+    with _nuevos:
+        _nuevos.notify_all()
+    for funcion in _suscriptores[tipo] + _suscriptores[None]:
+        try:
+            funcion(evento)
+        except Exception as e:  # Un consumidor con errores no debe romper la escritura
+            print(f"Error en el suscriptor {getattr(funcion, '__name__', funcion)} de {tipo}: {e}")
+    return evento
+
+
+def leer_desde(desde, limite=100, tipos=None):
+    """
+    Devuelve los eventos con seq mayor a `desde`.
+
+    Args:
+        desde (int): Último seq ya procesado por el consumidor (0 para empezar del principio).
+        limite (int): Máximo de eventos a devolver.
+        tipos (set): Si se indica, solo eventos de esos tipos.
+
+    Returns:
+        tuple: (eventos en orden de seq, hasta): "hasta" es el último seq revisado, el
+            "desde" de la próxima consulta (con filtro de tipos puede ser mayor al último devuelto).
+    """
+    filtro = (lambda evento: evento["tipo"] in tipos) if tipos else None
+    return bitacora_service.leer_desde(EVENTOS_FILE, desde, limite, filtro)
+
+
+def esperar(desde, espera, limite=100, tipos=None):
+    """
+    Long-poll: devuelve los eventos posteriores a `desde`; si no hay, espera hasta `espera`
+    segundos a que se publique alguno (en este proceso o en otro worker).
+
+    Args:
+        desde (int): Último seq ya procesado.
+        espera (float): Segundos máximos de espera (se acota entre 0 y MAX_ESPERA).
+        limite (int): Máximo de eventos a devolver.
+        tipos (set): Tipos a devolver (None para todos).
+
+    Returns:
+        tuple: (eventos nuevos, hasta), como leer_desde(). Sin eventos si venció la espera.
+    """
+    espera = min(espera, MAX_ESPERA) if espera > 0 else 0  # NaN o negativa: sin espera
+    vence = time.monotonic() + espera
+    while True:
+        if ultimo() > desde:
+            eventos, desde = leer_desde(desde, limite, tipos)
+            if eventos:
+                return eventos, desde
+            # Solo había eventos de otros tipos: se sigue esperando desde el último revisado
+        restante = vence - time.monotonic()
+        if restante <= 0:
+            return [], desde
+        with _nuevos:
+            _nuevos.wait(min(restante, INTERVALO_SONDEO))
+
+
+def ultimo():
+    """
+    Devuelve el último seq publicado (0 si todavía no hay eventos).
+
+    Returns:
+        int: Último seq.
+    """
+    return bitacora_service.ultimo_seq(EVENTOS_FILE)
@@ -0,0 +1,199 @@
+"""
+Historial de ventas por producto: para cada producto, la lista de ventas en las que aparece.
+
+Ver las ventas de un producto antes obligaba a recorrer todas las ventas y sus items. Este
+servicio mantiene una lista invertida por producto, actualizada al registrar, editar o
+eliminar cada venta, y guarda la de cada producto en su propio archivo:
+
+    data/ventas_de_producto/<producto_id>.json
+    {"nombre": "...", "ventas": [[fecha, venta_id, cantidad, precio_unitario], ...]}
+
+La lista tiene una entrada por venta (las líneas repetidas del mismo producto se suman),
+ordenada por fecha; las ventas del mismo segundo quedan en el orden en que se registraron.
+Consultar o actualizar el historial de un producto lee y escribe solo su archivo, así que el
+costo depende de las ventas de ese producto y no del total.
+
+La carpeta es un dato derivado: si no existe, se reconstruye recorriendo las ventas una vez
+(con el bloqueo de datos tomado, porque la primera consulta puede ser un GET).
+
+Términos clave:
+- Lista invertida (posting list): Para cada producto, las ventas que lo incluyen.
+- Entrada: [fecha, venta_id, cantidad, precio_unitario] de una venta en la lista de un producto.
+"""
+
+import json
+import os
+import shutil
+from bisect import bisect_left
+
+from services import instrumentacion_service
+from services.persistencia_service import bloqueo, escribir_json
+
+HISTORIAL_DIR = "data/ventas_de_producto"
+
+
+def _ruta(producto_id):
+    return os.path.join(HISTORIAL_DIR, f"{producto_id}.json")
+
+
+def entradas_de_venta(venta):
+    """
+    Arma las entradas de una venta: una por producto, sumando las líneas repetidas del mismo producto.
+
+    Args:
+        venta (dict): Venta con "id", "fecha" e "items".
+
+    Returns:
+        dict: {producto_id (texto): (nombre, [fecha, venta_id, cantidad, precio_unitario])}.
+    """
+    entradas = {}
+    for item in venta.get("items", []):
+        clave = str(item["id"])
+        if clave in entradas:
+            entradas[clave][1][2] += item["cantidad"]
+        else:
+            entrada = [venta.get("fecha", ""), venta["id"], item["cantidad"], item.get("precio_unitario", 0)]
+            entradas[clave] = (item.get("nombre", ""), entrada)
+    return entradas
+
+
+def _buscar_entrada(lista, fecha, venta_id):
+    """
+    Ubica la entrada de una venta en la lista de un producto.
+
+    Returns:
+        tuple: (posición de la entrada o None, posición donde insertarla si no está).
+    """
+    # La fecha ubica el grupo con búsqueda binaria; dentro del mismo segundo las
+    # entradas quedan en el orden en que se registraron las ventas
+    i = bisect_left(lista, [fecha])
+    while i < len(lista) and lista[i][0] == fecha:
+        if lista[i][1] == venta_id:
+            return i, i
+        i += 1
+    return None, i
+
+
+def _agregar(historial, nombre, entrada):
+    """Agrega (o reemplaza, si ya estaba) la entrada de una venta en un historial."""
+    historial["nombre"] = nombre or historial["nombre"]
+    posicion, insertar = _buscar_entrada(historial["ventas"], entrada[0], entrada[1])
+    if posicion is None:
+        historial["ventas"].insert(insertar, entrada)
+    else:
+        historial["ventas"][posicion] = entrada
+
+
+def reconstruir_historial():
+    """
+    Arma el historial de todos los productos recorriendo las ventas una vez y lo guarda.
+    Se escribe en una carpeta temporal que después reemplaza a la definitiva, así una
+    reconstrucción interrumpida no deja historiales a medias.
+    """
+    # Import local para evitar imports circulares (el controlador de ventas usa este servicio)
+    from controllers.ventas_controller import leer_ventas
+
+    historiales = {}
+    for venta in leer_ventas():
+        for clave, (nombre, entrada) in entradas_de_venta(venta).items():
+            _agregar(historiales.setdefault(clave, {"nombre": "", "ventas": []}), nombre, entrada)
+
+    temporal = HISTORIAL_DIR + ".tmp"
+    shutil.rmtree(temporal, ignore_errors=True)
+    os.makedirs(temporal)
+    for clave, historial in historiales.items():
+        escribir_json(os.path.join(temporal, f"{clave}.json"), historial, ensure_ascii=False)
+    os.replace(temporal, HISTORIAL_DIR)
+
+
+def _asegurar_historial():
+    """Reconstruye la carpeta de historiales si todavía no existe."""
+    if not os.path.exists(HISTORIAL_DIR):
+        with bloqueo:
+            if not os.path.exists(HISTORIAL_DIR):
+                reconstruir_historial()
+
+
+def cargar_historial(producto_id):
+    """
+    Carga el historial de ventas de un producto.
+
+    Args:
+        producto_id (int | str): ID del producto.
+
+    Returns:
+        dict | None: {"nombre", "ventas"} o None si el producto no tiene ventas.
+    """
+    _asegurar_historial()
+    try:
+        with open(_ruta(producto_id), "rb") as f:
+            contenido = f.read()
+    except FileNotFoundError:
+        return None
+    if instrumentacion_service.activa:
+        instrumentacion_service.bytes_io.sumar(len(contenido), "cargar", "historial")
+    return json.loads(contenido)
+
+
+def guardar_historial(producto_id, historial):
+    """
+    Guarda el historial de un producto (o borra su archivo si ya no tiene ventas).
+
+    Args:
+        producto_id (int | str): ID del producto.
+        historial (dict): {"nombre", "ventas"}.
+    """
+    if historial["ventas"]:
+        escribir_json(_ruta(producto_id), historial, ensure_ascii=False)
+    elif os.path.exists(_ruta(producto_id)):
+        os.remove(_ruta(producto_id))
+
+
+def registrar(venta):
+    """
+    Agrega una venta al historial de cada producto que incluye. Si la venta ya estaba (al
+    editarla, o porque el historial se reconstruyó después de guardarla), se reemplaza.
+    Se llama después de guardar las ventas.
+
+    Args:
+        venta (dict): Venta registrada (o con sus items nuevos, al editarla).
+    """
+    _asegurar_historial()
+    for clave, (nombre, entrada) in entradas_de_venta(venta).items():
+        historial = cargar_historial(clave) or {"nombre": "", "ventas": []}
+        _agregar(historial, nombre, entrada)
+        guardar_historial(clave, historial)
+
+
+def quitar(venta, conservar=()):
+    """
+    Quita una venta del historial de cada producto que incluía.
+
+    Args:
+        venta (dict): Venta tal como estaba registrada (con sus items anteriores).
+        conservar (iterable): IDs de producto (texto) cuya entrada no se quita (al editar
+            la venta, los productos que siguen en ella). Opcional.
+    """
+    _asegurar_historial()
+    for clave in entradas_de_venta(venta).keys() - set(conservar):
+        historial = cargar_historial(clave)
+        if historial is None:
+            continue
+        posicion, _ = _buscar_entrada(historial["ventas"], venta.get("fecha", ""), venta["id"])
+        if posicion is not None:
+            del historial["ventas"][posicion]
+            guardar_historial(clave, historial)
+
+
+def renombrar(producto_id, nombre):
+    """
+    Actualiza el nombre guardado en el historial de un producto (si tiene ventas).
+
+    Args:
+        producto_id (int | str): ID del producto.
+        nombre (str): Nombre nuevo.
+    """
+    historial = cargar_historial(producto_id)
+    if historial is not None and historial["nombre"] != nombre:
+        historial["nombre"] = nombre
+        guardar_historial(producto_id, historial)
@@ -0,0 +1,222 @@
+"""
+Servicio de idempotencia para los endpoints POST que registran datos.
+
+Cuando la red del punto de venta falla, el frontend reintenta el mismo POST y se
+terminaban registrando ventas, ingresos, pagos o facturas duplicadas. Si el cliente
+manda el header `Idempotency-Key`, la primera respuesta se guarda y los reintentos
+con la misma clave se responden desde memoria, sin volver a leer ni escribir los JSON.
+
+Términos clave:
+- Idempotencia: Propiedad de una operación que, repetida varias veces, produce el
+  mismo efecto que si se hubiera hecho una sola vez.
+- Idempotency-Key: Header con un valor único (por ejemplo un UUID) que el cliente
+  genera por operación y reutiliza en cada reintento de esa misma operación.
+- TTL (Time To Live): Tiempo que se conserva cada respuesta guardada. Pasado ese
+  tiempo la clave se olvida.
+- Almacén acotado: Se guarda como máximo una cantidad fija de respuestas; al llenarse
+  se descartan las más viejas, así la memoria no crece sin límite.
+
+Reglas:
+- Las claves se separan por endpoint: la misma clave en /api/pagos y en /api/caja/ingreso
+  son operaciones distintas.
+- Si se reutiliza una clave con un cuerpo distinto se responde 422 (es un error del cliente).
+- Si llega un reintento mientras la primera petición todavía se está procesando, se responde 409.
+- Las respuestas 5xx no se guardan, para que el reintento pueda volver a intentarlo.
+
+Con varios workers (servidor.py) el reintento puede llegar a otro proceso, así que se usa
+AlmacenIdempotenciaArchivo, que guarda las claves en data/idempotencia.json. Es consistente
+porque los POST se atienden con el bloqueo de datos tomado (ver persistencia_service).
+"""
+
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import jsonify, make_response, request
+
+from services.persistencia_service import escribir_json
+
+HEADER = "Idempotency-Key"
+HEADER_REPETIDA = "Idempotent-Replayed"
+TTL_SEGUNDOS = 24 * 60 * 60
+MAX_CLAVES = 10_000
+MAX_LARGO_CLAVE = 255
+IDEMPOTENCIA_FILE = "data/idempotencia.json"
+
+
+class AlmacenIdempotencia:
+    """
+    Almacén en memoria clave -> respuesta, acotado en cantidad y con vencimiento.
+
+    Las entradas se guardan en orden de llegada (OrderedDict), así las vencidas y las
+    más viejas siempre están al principio y se descartan sin recorrer todo el almacén.
+    """
+
+    def __init__(self, ttl=TTL_SEGUNDOS, max_claves=MAX_CLAVES):
+        self.ttl = ttl
+        self.max_claves = max_claves
+        self._entradas = OrderedDict()  # clave -> {"huella", "vence", "respuesta"}
+        self._lock = threading.Lock()
+
+    def _purgar(self, ahora):
+        while self._entradas:
+            clave, entrada = next(iter(self._entradas.items()))
+            if entrada["vence"] > ahora and len(self._entradas) <= self.max_claves:
+                break
+            del self._entradas[clave]
+
+    def reservar(self, clave, huella):
+        """
+        Reserva una clave para procesarla, o devuelve lo que ya hay guardado para ella.
+
+        Args:
+            clave (tuple): (endpoint, Idempotency-Key).
+            huella (str): Hash del cuerpo de la petición.
+
+        Returns:
+            tuple: (estado, respuesta). Estado es "nueva", "repetida", "en_curso" o "distinta".
+        """
+        ahora = time.time()
+        with self._lock:
+            self._cargar()
+            self._purgar(ahora)
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                self._entradas[clave] = {"huella": huella, "vence": ahora + self.ttl, "respuesta": None}
+                self._purgar(ahora)
+                self._guardar()
+                return "nueva", None
+            if entrada["huella"] != huella:
+                return "distinta", None
+            if entrada["respuesta"] is None:
+                return "en_curso", None
+            return "repetida", entrada["respuesta"]
+
+    def completar(self, clave, respuesta):
+        """Guarda la respuesta de una clave reservada."""
+        with self._lock:
+            self._cargar()
+            if clave in self._entradas:
+                self._entradas[clave]["respuesta"] = respuesta
+                self._guardar()
+
+    def liberar(self, clave):
+        """Quita la reserva de una clave (la petición falló y se puede reintentar)."""
+        with self._lock:
+            self._cargar()
+            if self._entradas.pop(clave, None) is not None:
+                self._guardar()
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._guardar()
+
+    def __len__(self):
+        return len(self._entradas)
+
+    # En memoria no hay nada que leer ni escribir
+    def _cargar(self):
+        pass
+
+    def _guardar(self):
+        pass
+
+
+class AlmacenIdempotenciaArchivo(AlmacenIdempotencia):
+    """
+    Variante del almacén compartida entre procesos: relee y reescribe el archivo en cada operación.
+    Solo se usa cuando hay varios workers.
+    """
+
+    def __init__(self, ruta=IDEMPOTENCIA_FILE, **kwargs):
+        super().__init__(**kwargs)
+        self.ruta = ruta
+
+    def _cargar(self):
+        self._entradas = OrderedDict()
+        if not os.path.exists(self.ruta):
+            return
+        with open(self.ruta, "r", encoding="utf-8") as f:
+            for entrada in json.load(f):
+                respuesta = entrada["respuesta"]
+                if respuesta is not None:
+                    respuesta = (base64.b64decode(respuesta[0]), respuesta[1], respuesta[2])
+                self._entradas[(entrada["endpoint"], entrada["clave"])] = {
+                    "huella": entrada["huella"], "vence": entrada["vence"], "respuesta": respuesta,
+                }
+
+    def _guardar(self):
+        entradas = []
+        for (endpoint, clave), entrada in self._entradas.items():
+            respuesta = entrada["respuesta"]
+            if respuesta is not None:
+                respuesta = [base64.b64encode(respuesta[0]).decode("ascii"), respuesta[1], respuesta[2]]
+            entradas.append({
+                "endpoint": endpoint, "clave": clave, "huella": entrada["huella"],
+                "vence": entrada["vence"], "respuesta": respuesta,
+            })
+        escribir_json(self.ruta, entradas)
+
+
+almacen = AlmacenIdempotencia()
+
+
+def usar_almacen_compartido(ruta=IDEMPOTENCIA_FILE):
+    """
+    Cambia el almacén en memoria por uno en archivo, compartido entre workers.
+
+    Args:
+        ruta (str): Archivo donde se guardan las claves.
+    """
+    global almacen
+    almacen = AlmacenIdempotenciaArchivo(ruta)
+
+
+def idempotente(funcion):
+    """
+    Decorador para endpoints POST: si la petición trae `Idempotency-Key`, la primera
+    respuesta se guarda y los reintentos con la misma clave la reciben otra vez.
+    Sin el header, el endpoint se comporta igual que siempre.
+    """
+    @wraps(funcion)
+    def envoltura(*args, **kwargs):
+        valor = request.headers.get(HEADER)
+        if not valor:
+            return funcion(*args, **kwargs)
+        if len(valor) > MAX_LARGO_CLAVE:
+            return jsonify({"error": f"{HEADER} demasiado larga (máximo {MAX_LARGO_CLAVE} caracteres)"}), 400
+
+        clave = (request.endpoint, valor)
+        huella = hashlib.sha256(request.get_data()).hexdigest()
+        estado, guardada = almacen.reservar(clave, huella)
+
+        if estado == "distinta":
+            return jsonify({"error": f"{HEADER} ya usada con otros datos"}), 422
+        if estado == "en_curso":
+            return jsonify({"error": "La petición original todavía se está procesando"}), 409
+        if estado == "repetida":
+            cuerpo, status, tipo = guardada
+            respuesta = make_response(cuerpo, status)
+            respuesta.mimetype = tipo
+            respuesta.headers[HEADER_REPETIDA] = "true"
+            return respuesta
+
+        try:
+            respuesta = make_response(funcion(*args, **kwargs))
+        except Exception:
+            almacen.liberar(clave)
+            raise
+
+        if respuesta.status_code >= 500:
+            almacen.liberar(clave)
+        else:
+            almacen.completar(clave, (respuesta.get_data(), respuesta.status_code, respuesta.mimetype))
+        return respuesta
+
+    return envoltura
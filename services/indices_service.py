@@ -0,0 +1,300 @@
+"""
+Servicio de índices cruzados entre ventas, movimientos de caja y facturas.
+
+Evita recorrer listas completas para encontrar un registro por su ID o para
+saber qué facturas y qué movimiento corresponden a una venta.
+
+Términos clave:
+- Índice: Diccionario que relaciona un ID con la posición del registro en su lista
+  (o con el ID de otro registro), para encontrarlo en O(1) en vez de recorrer todo.
+- Índice cruzado: Relación entre entidades distintas (venta -> movimiento, venta -> facturas, factura -> venta).
+- Posición: Lugar (0, 1, 2, ...) que ocupa el registro dentro de la lista guardada en el JSON.
+
+Estructura de data/indices.json:
+- "ventas": {venta_id: posición en ventas.json}
+- "movimientos": {movimiento_id: posición en caja["movimientos"]}
+- "facturas": {factura_id: posición en facturas.json}
+- "movimiento_de_venta": {venta_id: movimiento_id}
+- "facturas_de_venta": {venta_id: [factura_id, ...]}
+- "venta_de_factura": {factura_id: venta_id}
+- "pagos": [pago_id, ...] IDs de los movimientos de caja que son pagos, en orden de registro
+  (el ID del pago es el mismo que el de su egreso en caja)
+- "pagos_por_fecha": [[fecha, pago_id], ...] ordenada por fecha (índice secundario)
+- "pagos_por_destinatario" / "pagos_por_concepto" / "pagos_por_metodo":
+  {valor normalizado: [[fecha, pago_id], ...]} cada lista ordenada por fecha (índices secundarios)
+
+El archivo es un dato derivado: si no existe (o si se detecta que quedó desactualizado)
+se reconstruye a partir de ventas.json, caja.json y facturas.json.
+"""
+
+import json
+import os
+from bisect import bisect_left, bisect_right, insort
+
+from services.cache_service import incrementar_version
+from services.persistencia_service import bloqueo, escribir_json
+from services.instrumentacion_service import medir_io
+
+INDICES_FILE = "data/indices.json"
+
+
+def _indices_vacios():
+    return {
+        "ventas": {},
+        "movimientos": {},
+        "facturas": {},
+        "movimiento_de_venta": {},
+        "facturas_de_venta": {},
+        "venta_de_factura": {},
+        "pagos": [],
+        "pagos_por_fecha": [],
+        "pagos_por_destinatario": {},
+        "pagos_por_concepto": {},
+        "pagos_por_metodo": {},
+    }
+
+# Campos de los pagos que tienen índice secundario (se leen de movimiento["detalles"])
+CAMPOS_PAGO_INDEXADOS = ("destinatario", "concepto", "metodo")
+
+
+def reconstruir_indices():
+    """
+    Arma todos los índices recorriendo una única vez ventas, caja y facturas.
+
+    Returns:
+        dict: Índices recién construidos.
+    """
+    # Import local para evitar imports circulares (los controladores usan este servicio)
+    from controllers.ventas_controller import cargar_ventas
+    from controllers.caja_controller import cargar_caja
+    from controllers.facturas_controller import cargar_facturas
+
+    indices = _indices_vacios()
+    ventas = cargar_ventas()
+    movimientos = cargar_caja().get("movimientos", [])
+    facturas = cargar_facturas()
+
+    indices["ventas"] = posiciones_por_id(ventas)
+    indices["movimientos"] = posiciones_por_id(movimientos)
+    indices["facturas"] = posiciones_por_id(facturas)
+
+    # Las ventas registran su ingreso en caja con el mismo ID que la venta
+    for venta_id in indices["ventas"]:
+        if venta_id in indices["movimientos"]:
+            indices["movimiento_de_venta"][venta_id] = venta_id
+
+    for movimiento in movimientos:
+        if movimiento.get("origen") == "pago":
+            indices["pagos"].append(movimiento["id"])
+            indexar_pago(indices, movimiento)
+
+    for factura in facturas:
+        venta_id = factura.get("venta_id")
+        if venta_id:
+            indices["facturas_de_venta"].setdefault(venta_id, []).append(factura["id"])
+            indices["venta_de_factura"][factura["id"]] = venta_id
+
+    return indices
+
+
+@medir_io("indices", INDICES_FILE)
+def cargar_indices():
+    """
+    Carga los índices desde el archivo JSON.
+    Si el archivo no existe (o es de otra versión, con otros índices), los reconstruye y
+    los guarda con el bloqueo de datos tomado: desde un GET, una escritura concurrente podría
+    guardar en el medio y quedar pisada por posiciones viejas.
+
+    Returns:
+        dict: Índices cruzados.
+    """
+    indices = _leer_indices_vigentes()
+    if indices is not None:
+        return indices
+    with bloqueo:
+        indices = _leer_indices_vigentes()  # Otro worker pudo reconstruirlos mientras se esperaba
+        if indices is None:
+            indices = reconstruir_indices()
+            guardar_indices(indices)
+    return indices
+
+
+def _leer_indices_vigentes():
+    """Lee los índices guardados si existen y tienen los índices actuales (si no, None)."""
+    if not os.path.exists(INDICES_FILE):
+        return None
+    with open(INDICES_FILE, "r", encoding="utf-8") as f:
+        indices = json.load(f)
+    return indices if indices.keys() == _indices_vacios().keys() else None
+
+
+@medir_io("indices", INDICES_FILE)
+def guardar_indices(indices):
+    """
+    Guarda los índices en el archivo JSON.
+
+    Args:
+        indices (dict): Índices a guardar.
+    """
+    escribir_json(INDICES_FILE, indices, ensure_ascii=False)
+    incrementar_version("indices")
+
+
+def posiciones_por_id(registros):
+    """
+    Devuelve un diccionario {id: posición} para una lista de registros.
+
+    Args:
+        registros (list): Lista de dicts con clave "id".
+
+    Returns:
+        dict: Posición de cada registro según su ID.
+    """
+    return {registro["id"]: i for i, registro in enumerate(registros) if "id" in registro}
+
+
+def localizar(registros, posiciones, id_buscado):
+    """
+    Devuelve la posición de un registro usando el índice de posiciones.
+
+    Verifica que en esa posición esté realmente el registro buscado. Si el índice
+    quedó desactualizado, busca recorriendo la lista y corrige el índice en el lugar.
+
+    Args:
+        registros (list): Lista donde se busca.
+        posiciones (dict): Índice {id: posición} de esa lista.
+        id_buscado (str): ID del registro.
+
+    Returns:
+        int | None: Posición del registro, o None si no existe.
+    """
+    if id_buscado is None:
+        return None
+
+    posicion = posiciones.get(id_buscado)
+    if posicion is not None and posicion < len(registros) and registros[posicion].get("id") == id_buscado:
+        return posicion
+
+    # Índice desactualizado: búsqueda lineal y corrección
+    posicion = next((i for i, r in enumerate(registros) if r.get("id") == id_buscado), None)
+    if posicion is None:
+        posiciones.pop(id_buscado, None)
+    else:
+        posiciones[id_buscado] = posicion
+    return posicion
+
+
+def quitar_posicion(posiciones, id_eliminado, posicion):
+    """
+    Actualiza un índice de posiciones después de borrar un elemento de la lista:
+    quita el ID eliminado y corre un lugar hacia atrás a los que estaban después.
+
+    Args:
+        posiciones (dict): Índice {id: posición} a actualizar.
+        id_eliminado (str): ID del registro borrado.
+        posicion (int): Posición que ocupaba el registro borrado.
+    """
+    posiciones.pop(id_eliminado, None)
+    for clave, valor in posiciones.items():
+        if valor > posicion:
+            posiciones[clave] = valor - 1
+
+
+def registrar_venta_en_indices(indices, venta_id, posicion_venta, movimiento_id, posicion_movimiento):
+    """
+    Registra una venta nueva y su movimiento de caja en los índices.
+    """
+    indices["ventas"][venta_id] = posicion_venta
+    indices["movimientos"][movimiento_id] = posicion_movimiento
+    indices["movimiento_de_venta"][venta_id] = movimiento_id
+
+
+def registrar_factura_en_indices(indices, factura_id, posicion, venta_id):
+    """
+    Registra una factura nueva y su relación con la venta en los índices.
+    """
+    indices["facturas"][factura_id] = posicion
+    indices["facturas_de_venta"].setdefault(venta_id, []).append(factura_id)
+    indices["venta_de_factura"][factura_id] = venta_id
+
+
+def normalizar(valor):
+    """
+    Normaliza un valor para usarlo como clave de índice (sin espacios extremos y en minúsculas).
+    """
+    return str(valor).strip().lower()
+
+
+def indexar_pago(indices, movimiento):
+    """
+    Agrega un pago (su egreso de caja) a los índices secundarios por fecha,
+    destinatario, concepto y método. Las listas se mantienen ordenadas por fecha.
+
+    Args:
+        indices (dict): Índices a actualizar.
+        movimiento (dict): Egreso de caja con "origen": "pago".
+    """
+    entrada = [movimiento.get("fecha", ""), movimiento["id"]]
+    insort(indices["pagos_por_fecha"], entrada)
+    detalles = movimiento.get("detalles", {})
+    for campo in CAMPOS_PAGO_INDEXADOS:
+        clave = normalizar(detalles.get(campo, ""))
+        insort(indices[f"pagos_por_{campo}"].setdefault(clave, []), entrada)
+
+
+def desindexar_pago(indices, movimiento):
+    """
+    Quita un pago de todos los índices de pagos.
+
+    Args:
+        indices (dict): Índices a actualizar.
+        movimiento (dict): Egreso de caja del pago que se elimina.
+    """
+    if movimiento["id"] in indices["pagos"]:
+        indices["pagos"].remove(movimiento["id"])
+
+    entrada = [movimiento.get("fecha", ""), movimiento["id"]]
+    listas = [indices["pagos_por_fecha"]]
+    detalles = movimiento.get("detalles", {})
+    for campo in CAMPOS_PAGO_INDEXADOS:
+        listas.append(indices[f"pagos_por_{campo}"].get(normalizar(detalles.get(campo, "")), []))
+
+    for lista in listas:
+        i = bisect_left(lista, entrada)
+        if i < len(lista) and lista[i] == entrada:
+            del lista[i]
+
+
+def buscar_pagos(indices, filtros, desde=None, hasta=None):
+    """
+    Devuelve los IDs de los pagos que cumplen los filtros, ordenados por fecha ascendente.
+
+    Parte de la lista indexada más chica entre los filtros pedidos (o de la lista por fecha
+    si no hay filtros), recorta el rango de fechas con búsqueda binaria y verifica el resto
+    de los filtros por pertenencia a un conjunto. No recorre los movimientos de caja.
+
+    Args:
+        indices (dict): Índices cruzados.
+        filtros (dict): {campo: valor} con campos de CAMPOS_PAGO_INDEXADOS.
+        desde (str): Fecha mínima (YYYY-MM-DD), inclusive. Opcional.
+        hasta (str): Fecha máxima (YYYY-MM-DD), inclusive. Opcional.
+
+    Returns:
+        list: IDs de pagos.
+    """
+    listas = [
+        indices[f"pagos_por_{campo}"].get(normalizar(valor), [])
+        for campo, valor in filtros.items()
+    ]
+    if not listas:
+        listas = [indices["pagos_por_fecha"]]
+    listas.sort(key=len)
+    base, otras = listas[0], [{pago_id for _, pago_id in lista} for lista in listas[1:]]
+
+    inicio = bisect_left(base, [desde]) if desde else 0
+    fin = bisect_right(base, [hasta + " \uffff"]) if hasta else len(base)
+
+    return [
+        pago_id for _, pago_id in base[inicio:fin]
+        if all(pago_id in conjunto for conjunto in otras)
+    ]
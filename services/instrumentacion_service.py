@@ -0,0 +1,202 @@
+"""
+Instrumentación: mide cuánto tarda cada endpoint, cada lectura/escritura de los JSON
+(con los bytes leídos y escritos) y el dibujo de los PDF.
+
+Los resultados se exponen en formato de texto de Prometheus en GET /metrics.
+Se activa con la variable de entorno CAJA_INSTRUMENTACION=1 (ver config.py). Desactivada,
+cada punto medido solo evalúa un booleano y sigue de largo.
+
+Términos clave:
+- Prometheus: Sistema de monitoreo que cada tantos segundos lee (scrapea) un endpoint de texto
+  con las métricas de la aplicación.
+- Histograma: Cuenta cuántas mediciones cayeron por debajo de cada límite ("bucket") y guarda
+  también la suma y la cantidad. Permite calcular percentiles (p50, p95, p99) en Prometheus.
+- Contador: Valor que solo crece (ej: bytes escritos en total).
+- Etiquetas (labels): Pares clave=valor que separan una métrica por endpoint, almacén, etc.
+
+Con varios workers cada proceso tiene sus propias métricas: Prometheus las suma por instancia.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import g, request
+
+import config
+
+# Límites de los buckets en segundos (de 1 ms a 10 s)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+activa = config.INSTRUMENTACION
+
+
+class Histograma:
+    """Histograma con etiquetas, seguro para varios hilos."""
+
+    def __init__(self, nombre, descripcion, etiquetas, buckets=BUCKETS):
+        self.nombre = nombre
+        self.descripcion = descripcion
+        self.etiquetas = etiquetas
+        self.buckets = buckets
+        self._series = {}  # valores de etiquetas -> [conteos por bucket..., suma, cantidad]
+        self._lock = threading.Lock()
+
+    def observar(self, valor, *valores_etiquetas):
+        with self._lock:
+            serie = self._series.get(valores_etiquetas)
+            if serie is None:
+                serie = self._series[valores_etiquetas] = [0] * len(self.buckets) + [0.0, 0]
+            for i, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    serie[i] += 1
+            serie[-2] += valor
+            serie[-1] += 1
+
+    def exponer(self):
+        lineas = [f"# HELP {self.nombre} {self.descripcion}", f"# TYPE {self.nombre} histogram"]
+        with self._lock:
+            series = {k: list(v) for k, v in self._series.items()}
+        for valores, serie in sorted(series.items()):
+            base = _etiquetas(self.etiquetas, valores)
+            for limite, conteo in zip(self.buckets, serie):
+                lineas.append(f'{self.nombre}_bucket{{{base},le="{limite}"}} {conteo}')
+            lineas.append(f'{self.nombre}_bucket{{{base},le="+Inf"}} {serie[-1]}')
+            lineas.append(f"{self.nombre}_sum{{{base}}} {serie[-2]}")
+            lineas.append(f"{self.nombre}_count{{{base}}} {serie[-1]}")
+        return lineas
+
+
+class Contador:
+    """Contador con etiquetas, seguro para varios hilos."""
+
+    def __init__(self, nombre, descripcion, etiquetas):
+        self.nombre = nombre
+        self.descripcion = descripcion
+        self.etiquetas = etiquetas
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def sumar(self, valor, *valores_etiquetas):
+        with self._lock:
+            self._series[valores_etiquetas] = self._series.get(valores_etiquetas, 0) + valor
+
+    def exponer(self):
+        lineas = [f"# HELP {self.nombre} {self.descripcion}", f"# TYPE {self.nombre} counter"]
+        with self._lock:
+            series = dict(self._series)
+        for valores, total in sorted(series.items()):
+            lineas.append(f"{self.nombre}{{{_etiquetas(self.etiquetas, valores)}}} {total}")
+        return lineas
+
+
+def _etiquetas(nombres, valores):
+    return ",".join(f'{n}="{str(v)}"' for n, v in zip(nombres, valores))
+
+
+duracion_http = Histograma(
+    "caja_http_request_duration_seconds", "Duración de las peticiones HTTP por endpoint.",
+    ("blueprint", "endpoint", "method", "status"),
+)
+duracion_io = Histograma(
+    "caja_io_duration_seconds", "Duración de cada cargar_*/guardar_* sobre los archivos JSON.",
+    ("operacion", "almacen"),
+)
+bytes_io = Contador(
+    "caja_io_bytes_total", "Bytes leídos (cargar) y escritos (guardar) en los archivos JSON.",
+    ("operacion", "almacen"),
+)
+duracion_pdf = Histograma(
+    "caja_pdf_render_duration_seconds", "Tiempo de dibujo de PDFs de facturas.", ("tipo",),
+)
+
+METRICAS = (duracion_http, duracion_io, bytes_io, duracion_pdf)
+
+
+def medir_io(almacen, ruta):
+    """
+    Decorador para cargar_*/guardar_*: mide la duración y suma el tamaño del archivo
+    como bytes leídos o escritos.
+
+    Args:
+        almacen (str): Nombre del almacén (ventas, caja, ...).
+        ruta (str): Archivo JSON del almacén.
+    """
+    def decorador(funcion):
+        operacion = funcion.__name__.split("_", 1)[0]  # "cargar" o "guardar"
+
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if not activa:
+                return funcion(*args, **kwargs)
+            inicio = time.perf_counter()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                duracion_io.observar(time.perf_counter() - inicio, operacion, almacen)
+                try:
+                    bytes_io.sumar(os.path.getsize(ruta), operacion, almacen)
+                except OSError:
+                    pass
+
+        return envoltura
+    return decorador
+
+
+@contextmanager
+def medir_pdf(tipo):
+    """
+    Mide el tiempo de dibujo de un PDF.
+
+    Args:
+        tipo (str): "factura" o "consolidado".
+    """
+    if not activa:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        duracion_pdf.observar(time.perf_counter() - inicio, tipo)
+
+
+def _inicio_peticion():
+    if activa:
+        g.inicio_instrumentacion = time.perf_counter()
+
+
+def _fin_peticion(respuesta):
+    inicio = g.pop("inicio_instrumentacion", None)
+    if inicio is not None:
+        duracion_http.observar(
+            time.perf_counter() - inicio,
+            request.blueprint or "", request.endpoint or "sin_ruta", request.method, respuesta.status_code,
+        )
+    return respuesta
+
+
+def configurar_instrumentacion(app):
+    """
+    Registra la medición de todas las peticiones en la app.
+
+    Args:
+        app (Flask): Aplicación a instrumentar.
+    """
+    app.before_request(_inicio_peticion)
+    app.after_request(_fin_peticion)
+
+
+def exponer():
+    """
+    Devuelve todas las métricas en formato de texto de Prometheus.
+
+    Returns:
+        str: Texto listo para servir en /metrics.
+    """
+    lineas = []
+    for metrica in METRICAS:
+        lineas.extend(metrica.exponer())
+    return "\n".join(lineas) + "\n"
@@ -0,0 +1,80 @@
+"""
+Serialización JSON de las respuestas de la API.
+
+Flask serializa con el módulo json de la biblioteca estándar, escrito mayormente en Python.
+Si está instalado orjson (opcional, `pip install orjson`), las respuestas de jsonify y la
+lectura de request.get_json() pasan a usarlo; si no, todo sigue igual que antes.
+
+Términos clave:
+- JSON provider: Objeto de Flask (app.json) que decide cómo se convierten los datos a JSON
+  y de JSON. Existe desde Flask 2.2; en versiones anteriores se mantiene el comportamiento estándar.
+- orjson: Librería de JSON escrita en Rust. Serializa varias veces más rápido que json y
+  genera directamente bytes UTF-8, sin pasar por un str intermedio.
+"""
+
+try:
+    import orjson
+except ImportError:  # Dependencia opcional
+    orjson = None
+
+try:
+    from flask.json.provider import DefaultJSONProvider
+except ImportError:  # Flask < 2.2
+    DefaultJSONProvider = None
+
+
+if orjson is not None and DefaultJSONProvider is not None:
+
+    class ProveedorJSONRapido(DefaultJSONProvider):
+        """
+        JSON provider que usa orjson. Los tipos que orjson no conoce (Decimal, objetos con
+        __html__, etc.) se resuelven con la misma función `default` que usa Flask.
+
+        Genera los mismos valores que el provider estándar: claves ordenadas (sort_keys) y
+        fechas (datetime/date) con el formato HTTP de Flask, porque se las deja pasar a
+        `default`. Quedan dos diferencias de bytes: los caracteres no ASCII van en UTF-8 en
+        lugar de escapados (\u00f1) y NaN/Infinity salen como null (el estándar emite NaN,
+        que no es JSON válido). Los ETag no cambian: se arman con la versión de los datos,
+        no con el cuerpo de la respuesta (ver cache_service).
+        """
+
+        def _opciones(self, indentar=False):
+            opciones = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+            if self.sort_keys:
+                opciones |= orjson.OPT_SORT_KEYS
+            if indentar:
+                opciones |= orjson.OPT_INDENT_2
+            return opciones
+
+        def dumps(self, obj, **kwargs):
+            indentar = bool(kwargs.get("indent"))
+            return orjson.dumps(obj, default=self.default, option=self._opciones(indentar)).decode("utf-8")
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+        def response(self, *args, **kwargs):
+            obj = self._prepare_response_obj(args, kwargs)
+            indentar = (self.compact is None and self._app.debug) or self.compact is False
+            opciones = self._opciones(indentar) | orjson.OPT_APPEND_NEWLINE
+            cuerpo = orjson.dumps(obj, default=self.default, option=opciones)
+            return self._app.response_class(cuerpo, mimetype=self.mimetype)
+
+else:
+    ProveedorJSONRapido = None
+
+
+def configurar_json(app):
+    """
+    Instala el JSON provider rápido en la app si orjson está disponible.
+
+    Args:
+        app (Flask): Aplicación a configurar.
+
+    Returns:
+        str: Nombre del serializador en uso ("orjson" o "json").
+    """
+    if ProveedorJSONRapido is None:
+        return "json"
+    app.json = ProveedorJSONRapido(app)
+    return "orjson"
@@ -0,0 +1,616 @@
+"""
+Almacenamiento de ventas y movimientos de caja particionado por mes.
+
+En lugar de un único ventas.json / caja.json que crece para siempre, cada almacén pasa a ser
+una carpeta (data/ventas/, data/caja/) con un archivo por mes y un manifiesto chico:
+
+    data/caja/manifiesto.json     -> particiones, cantidades, rango de fechas y el resto
+                                     de la caja (saldo, checkpoints, netos por día)
+    data/caja/2025-05.3.json.gz   -> movimientos registrados en mayo (cerrada, comprimida)
+    data/caja/2025-06.7.json      -> movimientos registrados en junio (mes actual)
+
+Para el resto del código la lista sigue siendo una sola (mismas posiciones, mismos índices):
+cada partición es un tramo contiguo de la lista, el de los registros agregados ese mes.
+- Escritura: cargar() devuelve una lista perezosa y modificable (ListaParticionada) que lee
+  cada partición recién cuando se accede a una posición suya; guardar() reescribe solo las
+  particiones leídas cuyo contenido cambió. Un alta lee y escribe únicamente la partición del
+  mes actual (más el manifiesto); editar o borrar un registro lee solo la partición que lo
+  contiene (su posición sale de los índices).
+- Lectura: leer() devuelve una vista perezosa de solo lectura que abre solo las particiones
+  que se consultan (paginado, pagos por posición, movimientos más recientes).
+- Los meses anteriores quedan cerrados: solo se reescriben si se edita o borra un registro
+  suyo. Con CAJA_PARTICIONES_COMPRIMIR=1 se guardan comprimidos con gzip.
+
+Cada escritura crea archivos nuevos (con el número de generación en el nombre) y recién
+después reemplaza el manifiesto, así una lectura concurrente nunca mezcla versiones.
+
+Se activa con CAJA_PARTICIONES=1. La primera vez se migra el archivo único existente y se lo
+renombra a .migrado.
+
+Los meses viejos se pueden archivar (ver services/archivo_service.py): la partición pasa a
+data/<almacén>/archivo/ comprimida y su entrada del manifiesto guarda un resumen precalculado.
+Sigue siendo parte de la lista (mismas posiciones) y se lee igual, solo cuando se la pide.
+
+Términos clave:
+- Partición: Archivo con un tramo de la lista (los registros de un mes).
+- Manifiesto: Archivo que describe las particiones; es lo único que se lee para saber qué abrir.
+- Huella (hash): Resumen del contenido de una partición; si no cambió, no se reescribe.
+- Vista perezosa (lazy): Objeto que se comporta como una lista pero lee cada partición
+  recién cuando se accede a una posición suya.
+- Partición archivada (fría): Mes viejo, comprimido, que casi no se consulta.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from bisect import bisect_right
+from collections import Counter, OrderedDict
+from collections.abc import MutableSequence, Sequence
+
+from flask import g, has_app_context
+
+import config
+from services import instrumentacion_service
+from services.persistencia_service import bloqueo, escribir_bytes, escribir_json
+from services.utilidades import ahora_str, epoch_de
+
+try:
+    import orjson
+except ImportError:  # Dependencia opcional
+    orjson = None
+
+MANIFIESTO = "manifiesto.json"
+CARPETA_ARCHIVO = "archivo"
+MAX_ARCHIVADAS = 24
+
+# Contenido ya descomprimido de las particiones archivadas, por ruta. Sus archivos nunca se
+# modifican (cada escritura crea uno nuevo), así que la ruta identifica el contenido
+_archivadas = OrderedDict()
+_lock_archivadas = threading.Lock()
+
+
+def habilitado():
+    return config.PARTICIONES
+
+
+def _serializar(registros):
+    if orjson is not None:
+        return orjson.dumps(registros, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(registros, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _deserializar(contenido):
+    return orjson.loads(contenido) if orjson is not None else json.loads(contenido)
+
+
+def _huella(contenido):
+    return hashlib.sha1(contenido).hexdigest()
+
+
+def _ts(registro):
+    try:
+        return epoch_de(registro)
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class AlmacenParticionado:
+    """
+    Lista de registros guardada en una partición por mes más un manifiesto.
+    """
+
+    def __init__(self, nombre, directorio, archivo_legado=None, clave_lista=None, contar_por=None, vacio=None):
+        """
+        Args:
+            nombre (str): Nombre del almacén (para métricas).
+            directorio (str): Carpeta de las particiones.
+            archivo_legado (str): Archivo único a migrar la primera vez. Opcional.
+            clave_lista (str): Si el documento es un dict, clave de la lista particionada
+                (ej: "movimientos"); el resto de las claves va al manifiesto. None si es una lista.
+            contar_por (str): Campo cuyos valores se cuentan por partición (ej: "tipo"). Opcional.
+            vacio (dict): Documento inicial si no hay archivo a migrar (ej: saldo en 0), igual al
+                que crea la versión de un solo archivo. Opcional; por defecto solo la lista vacía.
+        """
+        self.nombre = nombre
+        self.directorio = directorio
+        self.archivo_legado = archivo_legado
+        self.clave_lista = clave_lista
+        self.contar_por = contar_por
+        self.vacio = vacio
+        self.ruta_manifiesto = os.path.join(directorio, MANIFIESTO)
+        # Partición de cada ID según la última carga: la usa el guardar() siguiente. Dentro de
+        # una petición se guarda en flask.g (se libera al terminar); fuera, por hilo
+        self._local = threading.local()
+
+    # ---------- Manifiesto y particiones ----------
+
+    def manifiesto(self):
+        """
+        Lee el manifiesto. Si todavía no existe, migra el archivo único (o crea uno vacío).
+
+        Returns:
+            dict: generacion, particiones (mes, archivo, cantidad, rango de fechas, ...) y extra.
+        """
+        if not os.path.exists(self.ruta_manifiesto):
+            with bloqueo:
+                if not os.path.exists(self.ruta_manifiesto):
+                    self._migrar()
+        with open(self.ruta_manifiesto, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _leer_particion(self, entrada):
+        ruta = os.path.abspath(os.path.join(self.directorio, entrada["archivo"]))
+        if entrada.get("archivada"):
+            with _lock_archivadas:
+                contenido = _archivadas.get(ruta)
+                if contenido is not None:
+                    _archivadas.move_to_end(ruta)
+                    return _deserializar(contenido)
+
+        with open(ruta, "rb") as f:
+            contenido = f.read()
+        if instrumentacion_service.activa:
+            instrumentacion_service.bytes_io.sumar(len(contenido), "cargar", self.nombre)
+        if entrada.get("comprimida"):
+            contenido = gzip.decompress(contenido)
+
+        if entrada.get("archivada"):
+            with _lock_archivadas:
+                _archivadas[ruta] = contenido
+                while len(_archivadas) > MAX_ARCHIVADAS:
+                    _archivadas.popitem(last=False)
+        return _deserializar(contenido)
+
+    def _documento(self, registros, extra):
+        if self.clave_lista is None:
+            return registros
+        return {**extra, self.clave_lista: registros}
+
+    def _migrar(self):
+        """Pasa el archivo único a particiones: un tramo nuevo cada vez que avanza el mes."""
+        documento = [] if self.clave_lista is None else {**(self.vacio or {}), self.clave_lista: []}
+        if self.archivo_legado and os.path.exists(self.archivo_legado):
+            with open(self.archivo_legado, "r", encoding="utf-8") as f:
+                documento = json.load(f)
+        registros = documento if self.clave_lista is None else documento.get(self.clave_lista, [])
+
+        grupos, mes_actual = [], None
+        for registro in registros:
+            mes = (registro.get("fecha") or "")[:7]
+            if not grupos or (mes and mes > mes_actual):
+                mes_actual = mes or ahora_str()[:7]
+                grupos.append((mes_actual, []))
+            grupos[-1][1].append(registro)
+
+        os.makedirs(self.directorio, exist_ok=True)
+        particiones = [self._escribir_particion({"mes": mes}, grupo, 1) for mes, grupo in grupos]
+        extra = None if self.clave_lista is None else {k: v for k, v in documento.items() if k != self.clave_lista}
+        escribir_json(self.ruta_manifiesto, {"generacion": 1, "particiones": particiones, "extra": extra}, ensure_ascii=False)
+        if self.archivo_legado and os.path.exists(self.archivo_legado):
+            os.replace(self.archivo_legado, self.archivo_legado + ".migrado")
+
+    def _escribir_particion(self, entrada, registros, generacion, contenido=None, resumen=None):
+        """
+        Escribe una partición en un archivo nuevo y devuelve su entrada del manifiesto.
+        Si la entrada estaba archivada, sigue archivada: con el resumen indicado o, si no se
+        indica (al editar o borrar un registro archivado), con uno recalculado en el momento.
+        """
+        contenido = contenido if contenido is not None else _serializar(registros)
+        cerrada = entrada["mes"] < ahora_str()[:7]
+        archivada = entrada.get("archivada", False)
+        comprimir = archivada or (cerrada and config.PARTICIONES_COMPRIMIR)
+        archivo = f"{entrada['mes']}.{generacion}.json" + (".gz" if comprimir else "")
+        if archivada:
+            archivo = f"{CARPETA_ARCHIVO}/{archivo}"
+            os.makedirs(os.path.join(self.directorio, CARPETA_ARCHIVO), exist_ok=True)
+        datos = gzip.compress(contenido, compresslevel=9 if archivada else 6) if comprimir else contenido
+        escribir_bytes(os.path.join(self.directorio, archivo), datos)
+        if instrumentacion_service.activa:
+            instrumentacion_service.bytes_io.sumar(len(datos), "guardar", self.nombre)
+
+        fechas = [ts for ts in map(_ts, registros) if ts is not None]
+        nueva = {
+            "mes": entrada["mes"],
+            "archivo": archivo,
+            "cantidad": len(registros),
+            "desde_ts": min(fechas, default=None),
+            "hasta_ts": max(fechas, default=None),
+            "cerrada": cerrada,
+            "comprimida": comprimir,
+            "huella": _huella(contenido),
+        }
+        if self.contar_por:
+            nueva["conteos"] = dict(Counter(r.get(self.contar_por) for r in registros))
+        if archivada:
+            nueva.update({"archivada": True, "resumen": resumen if resumen is not None else self._resumir(registros)})
+        return nueva
+
+    def _resumir(self, registros):
+        """Calcula el resumen de una partición archivada con el resumidor de este almacén (o None)."""
+        # Import local: archivo_service importa este módulo
+        from services.archivo_service import RESUMIDORES
+
+        resumir = RESUMIDORES.get(self.nombre)
+        return resumir(registros) if resumir else None
+
+    # ---------- Lectura y escritura ----------
+
+    def cargar(self):
+        """
+        Devuelve el documento (lista o dict) para modificarlo y guardarlo. La lista es una
+        ListaParticionada: no lee ninguna partición hasta que se accede a una posición suya.
+
+        Returns:
+            ListaParticionada | dict: Lista, o dict con la lista en clave_lista.
+        """
+        manifiesto = self.manifiesto()
+        return self._documento(ListaParticionada(self, manifiesto), manifiesto["extra"])
+
+    def leer(self):
+        """
+        Devuelve el documento con la lista como vista perezosa (solo lectura).
+
+        Returns:
+            VistaParticionada | dict: Vista, o dict con la vista en clave_lista.
+        """
+        manifiesto = self.manifiesto()
+        return self._documento(VistaParticionada(self, manifiesto["particiones"]), manifiesto["extra"])
+
+    def _recordar(self, generacion, pertenencia):
+        if has_app_context():
+            setattr(g, f"particiones_{self.nombre}", (generacion, pertenencia))
+        else:
+            self._local.estado = (generacion, pertenencia)
+
+    def _pertenencia(self, manifiesto):
+        """Partición de cada ID, leyendo los archivos (si no se cargó la versión actual)."""
+        if has_app_context():
+            estado = g.get(f"particiones_{self.nombre}")
+        else:
+            estado = getattr(self._local, "estado", None)
+        if estado is not None and estado[0] == manifiesto["generacion"]:
+            return estado[1]
+        return {
+            registro.get("id"): i
+            for i, entrada in enumerate(manifiesto["particiones"])
+            for registro in self._leer_particion(entrada)
+        }
+
+    def guardar(self, documento):
+        """
+        Guarda el documento reescribiendo solo las particiones que cambiaron.
+
+        Los registros nuevos al final de la lista van a la partición del mes actual (se crea
+        si hace falta). Un registro desconocido en el medio queda en la partición del anterior.
+
+        Args:
+            documento (list | dict): Documento completo, como lo devolvió cargar().
+        """
+        registros = documento if self.clave_lista is None else documento[self.clave_lista]
+        extra = None if self.clave_lista is None else {k: v for k, v in documento.items() if k != self.clave_lista}
+
+        with bloqueo:
+            manifiesto = self.manifiesto()
+            if isinstance(registros, ListaParticionada) and registros.almacen is self:
+                if manifiesto["generacion"] == registros.generacion:
+                    self._guardar_lista(registros, extra, manifiesto)
+                    return
+                # Otra escritura guardó después de cargar (no pasa con el bloqueo tomado en toda
+                # la petición): se guarda como una lista común, ubicando cada registro por su ID
+                registros = list(registros)
+            particiones = manifiesto["particiones"]
+            pertenencia = self._pertenencia(manifiesto)
+            mes_actual = ahora_str()[:7]
+            actual = len(particiones) - 1 if particiones and particiones[-1]["mes"] >= mes_actual else len(particiones)
+
+            destinos = [pertenencia.get(r.get("id")) for r in registros]
+            ultimo_conocido = max((i for i, d in enumerate(destinos) if d is not None), default=-1)
+            grupos = [[] for _ in range(max(actual + 1, len(particiones)))]
+            anterior = 0
+            for i, (registro, destino) in enumerate(zip(registros, destinos)):
+                if destino is None:
+                    destino = actual if i > ultimo_conocido else anterior
+                destino = max(destino, anterior)
+                anterior = destino
+                grupos[destino].append(registro)
+                if destinos[i] != destino:
+                    pertenencia[registro.get("id")] = destino
+
+            generacion = manifiesto["generacion"] + 1
+            nuevas, reemplazados = [], []
+            for i, grupo in enumerate(grupos):
+                entrada = particiones[i] if i < len(particiones) else {"mes": mes_actual}
+                if i >= len(particiones) and not grupo:
+                    continue
+                contenido = _serializar(grupo)
+                cerrada = entrada["mes"] < mes_actual
+                sin_cambios = (
+                    entrada.get("huella") == _huella(contenido)
+                    and entrada["comprimida"] == (entrada.get("archivada", False) or (cerrada and config.PARTICIONES_COMPRIMIR))
+                )
+                if sin_cambios:
+                    nuevas.append({**entrada, "cerrada": cerrada})
+                    continue
+                nuevas.append(self._escribir_particion(entrada, grupo, generacion, contenido))
+                if "archivo" in entrada:
+                    reemplazados.append(entrada["archivo"])
+
+            self._publicar({"generacion": generacion, "particiones": nuevas, "extra": extra}, reemplazados)
+            self._recordar(generacion, pertenencia)
+
+    def _guardar_lista(self, lista, extra, manifiesto):
+        """
+        Guarda una ListaParticionada: las particiones que no se leyeron no cambiaron y se
+        conservan sin abrirlas; de las leídas se reescriben solo las que cambiaron.
+        """
+        mes_actual = ahora_str()[:7]
+        generacion = manifiesto["generacion"] + 1
+        entradas, segmentos, reemplazados = [], [], []
+        for i, entrada in enumerate(lista.entradas):
+            segmento = lista.segmentos[i]
+            nueva = "archivo" not in entrada
+            if nueva and not segmento:
+                continue
+            cerrada = entrada["mes"] < mes_actual
+            comprimir = entrada.get("archivada", False) or (cerrada and config.PARTICIONES_COMPRIMIR)
+            if segmento is None and entrada["comprimida"] != comprimir:
+                segmento = lista.registros_de(i)  # El mes se cerró: se reescribe comprimido
+            contenido = None if segmento is None else _serializar(segmento)
+            if segmento is None or (entrada.get("huella") == _huella(contenido) and entrada["comprimida"] == comprimir):
+                entradas.append({**entrada, "cerrada": cerrada})
+            else:
+                entradas.append(self._escribir_particion(entrada, segmento, generacion, contenido))
+                if not nueva:
+                    reemplazados.append(entrada["archivo"])
+            segmentos.append(segmento)
+
+        self._publicar({"generacion": generacion, "particiones": entradas, "extra": extra}, reemplazados)
+        lista.generacion, lista.entradas, lista.segmentos = generacion, entradas, segmentos
+
+    def _publicar(self, manifiesto, reemplazados):
+        """Reemplaza el manifiesto y recién después borra los archivos que dejó de usar."""
+        escribir_json(self.ruta_manifiesto, manifiesto, ensure_ascii=False)
+        for archivo in reemplazados:
+            try:
+                os.remove(os.path.join(self.directorio, archivo))
+            except OSError:
+                pass
+
+    def archivar(self, hasta_mes, resumir=None):
+        """
+        Archiva las particiones de meses cerrados hasta `hasta_mes` inclusive: las mueve
+        comprimidas a la carpeta de archivo y guarda su resumen en el manifiesto.
+        El mes actual nunca se archiva.
+
+        Args:
+            hasta_mes (str): Último mes a archivar (YYYY-MM).
+            resumir (callable): Recibe los registros de la partición y devuelve su resumen. Opcional.
+
+        Returns:
+            list: Meses archivados.
+        """
+        with bloqueo:
+            manifiesto = self.manifiesto()
+            mes_actual = ahora_str()[:7]
+            generacion = manifiesto["generacion"] + 1
+            nuevas, reemplazados, archivados = [], [], []
+            for entrada in manifiesto["particiones"]:
+                if entrada.get("archivada") or entrada["mes"] > hasta_mes or entrada["mes"] >= mes_actual:
+                    nuevas.append(entrada)
+                    continue
+                registros = self._leer_particion(entrada)
+                resumen = resumir(registros) if resumir else None
+                nuevas.append(self._escribir_particion({**entrada, "archivada": True}, registros, generacion, resumen=resumen))
+                reemplazados.append(entrada["archivo"])
+                archivados.append(entrada["mes"])
+            if not archivados:
+                return []
+
+            self._publicar({**manifiesto, "generacion": generacion, "particiones": nuevas}, reemplazados)
+            return archivados
+
+
+class ListaParticionada(MutableSequence):
+    """
+    Lista modificable sobre las particiones (la devuelve cargar()): lee cada partición recién
+    cuando se accede a una posición suya. Las posiciones son las de la lista completa.
+    Los registros nuevos al final van a la partición del mes actual.
+    """
+
+    def __init__(self, almacen, manifiesto):
+        self.almacen = almacen
+        self.generacion = manifiesto["generacion"]
+        self.entradas = list(manifiesto["particiones"])
+        self.segmentos = [None] * len(self.entradas)  # Registros de cada partición leída
+
+    @property
+    def abiertas(self):
+        """Cantidad de particiones leídas hasta ahora."""
+        return sum(segmento is not None for segmento in self.segmentos)
+
+    def registros_de(self, i):
+        """
+        Devuelve los registros de la partición `i` (la lee si todavía no se leyó).
+
+        Returns:
+            list: Registros de esa partición (modificables).
+        """
+        if self.segmentos[i] is None:
+            self.segmentos[i] = self.almacen._leer_particion(self.entradas[i])
+        return self.segmentos[i]
+
+    def _cantidad(self, i):
+        segmento = self.segmentos[i]
+        return len(segmento) if segmento is not None else self.entradas[i]["cantidad"]
+
+    def _ubicar(self, indice):
+        """Devuelve (partición, posición dentro de ella) de una posición de la lista."""
+        total = len(self)
+        if indice < 0:
+            indice += total
+        if not 0 <= indice < total:
+            raise IndexError(indice)
+        for i in range(len(self.entradas)):
+            cantidad = self._cantidad(i)
+            if indice < cantidad:
+                return i, indice
+            indice -= cantidad
+        raise IndexError(indice)
+
+    def __len__(self):
+        return sum(self._cantidad(i) for i in range(len(self.entradas)))
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            inicio, fin, paso = indice.indices(len(self))
+            if paso != 1:
+                return [self[i] for i in range(inicio, fin, paso)]
+            # Solo se leen las particiones que se superponen con el tramo pedido
+            resultado, base = [], 0
+            for i in range(len(self.entradas)):
+                cantidad = self._cantidad(i)
+                if base + cantidad > inicio and base < fin:
+                    resultado.extend(self.registros_de(i)[max(inicio - base, 0):fin - base])
+                base += cantidad
+            return resultado
+        i, j = self._ubicar(indice)
+        return self.registros_de(i)[j]
+
+    def __setitem__(self, indice, registro):
+        if isinstance(indice, slice):
+            raise TypeError("ListaParticionada no admite asignar tramos")
+        i, j = self._ubicar(indice)
+        self.registros_de(i)[j] = registro
+
+    def __delitem__(self, indice):
+        if isinstance(indice, slice):
+            for posicion in sorted(range(*indice.indices(len(self))), reverse=True):
+                del self[posicion]
+            return
+        i, j = self._ubicar(indice)
+        del self.registros_de(i)[j]
+
+    def insert(self, indice, registro):
+        if indice < 0:
+            indice = max(indice + len(self), 0)
+        if indice < len(self):
+            # En el medio: queda en la partición del registro que ocupaba esa posición
+            i, j = self._ubicar(indice)
+            self.registros_de(i).insert(j, registro)
+            return
+        mes_actual = ahora_str()[:7]
+        if not self.entradas or self.entradas[-1]["mes"] < mes_actual:
+            self.entradas.append({"mes": mes_actual})
+            self.segmentos.append([])
+        self.registros_de(len(self.entradas) - 1).append(registro)
+
+    def __iter__(self):
+        for i in range(len(self.entradas)):
+            yield from self.registros_de(i)
+
+
+class VistaParticionada(Sequence):
+    """
+    Lista de solo lectura sobre las particiones: lee cada una recién cuando se la necesita.
+    """
+
+    def __init__(self, almacen, particiones):
+        self._almacen = almacen
+        self._particiones = particiones
+        self._inicios = []
+        total = 0
+        for entrada in particiones:
+            self._inicios.append(total)
+            total += entrada["cantidad"]
+        self._total = total
+        self._cargadas = {}
+
+    @property
+    def abiertas(self):
+        """Cantidad de particiones leídas hasta ahora."""
+        return len(self._cargadas)
+
+    @property
+    def particiones(self):
+        """Entradas del manifiesto de cada partición (mes, cantidad, archivada, resumen, ...)."""
+        return self._particiones
+
+    def _particion(self, i):
+        if i not in self._cargadas:
+            self._cargadas[i] = self._almacen._leer_particion(self._particiones[i])
+        return self._cargadas[i]
+
+    def registros_de(self, i):
+        """
+        Devuelve los registros de la partición `i` (la lee si todavía no se leyó).
+
+        Returns:
+            list: Registros de esa partición.
+        """
+        return self._particion(i)
+
+    def __len__(self):
+        return self._total
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self[i] for i in range(*indice.indices(self._total))]
+        if indice < 0:
+            indice += self._total
+        if not 0 <= indice < self._total:
+            raise IndexError(indice)
+        p = bisect_right(self._inicios, indice) - 1
+        return self._particion(p)[indice - self._inicios[p]]
+
+    def __iter__(self):
+        for i in range(len(self._particiones)):
+            yield from self._particion(i)
+
+    def mas_recientes(self, cantidad, valor=None):
+        """
+        Devuelve los `cantidad` registros más recientes por fecha (del más nuevo al más viejo,
+        igual que ordenar toda la lista con reverse=True), abriendo solo las particiones
+        necesarias: se recorren por fecha máxima y se corta cuando ninguna otra puede aportar.
+
+        Args:
+            cantidad (int): Registros a devolver.
+            valor (str): Si se indica, solo registros con contar_por == valor (ej: tipo "egreso").
+
+        Returns:
+            tuple: (registros, total de registros que cumplen el filtro).
+        """
+        campo = self._almacen.contar_por
+        if valor is None:
+            total = self._total
+        else:
+            total = sum(p.get("conteos", {}).get(valor, 0) for p in self._particiones)
+        if cantidad <= 0:
+            return [], total
+
+        orden = sorted(
+            (i for i, p in enumerate(self._particiones) if p["hasta_ts"] is not None),
+            key=lambda i: self._particiones[i]["hasta_ts"], reverse=True,
+        )
+        candidatos = []  # (-fecha, posición, registro)
+        for i in orden:
+            entrada = self._particiones[i]
+            if len(candidatos) >= cantidad:
+                candidatos.sort(key=lambda c: c[:2])
+                if entrada["hasta_ts"] < -candidatos[cantidad - 1][0]:
+                    break
+            if valor is not None and not entrada.get("conteos", {}).get(valor):
+                continue
+            for j, registro in enumerate(self._particion(i)):
+                if valor is None or registro.get(campo) == valor:
+                    candidatos.append((-(_ts(registro) or 0), self._inicios[i] + j, registro))
+        candidatos.sort(key=lambda c: c[:2])
+        return [registro for _, _, registro in candidatos[:cantidad]], total
+
+
+ventas = AlmacenParticionado("ventas", "data/ventas", archivo_legado="data/ventas.json")
+caja = AlmacenParticionado(
+    "caja", "data/caja", archivo_legado="data/caja.json", clave_lista="movimientos", contar_por="tipo",
+    vacio={"saldo": 0},
+)
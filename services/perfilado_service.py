@@ -0,0 +1,203 @@
+"""
+Perfilado a pedido: captura un perfil de cProfile de peticiones puntuales para ver en qué
+funciones se va el tiempo de un endpoint lento, sin perfilar todo el tráfico.
+
+Se habilita con CAJA_PERFILADO=1 (ver config.py). Deshabilitado no se registra ningún hook,
+así que no cuesta nada. Habilitado, una petición se perfila si:
+- trae el header "X-Perfilar: 1", o
+- su endpoint fue marcado desde POST /api/perfiles/activar (las próximas N peticiones).
+
+Si CAJA_PERFILADO_TOKEN está definido, el header y los endpoints de /api/perfiles exigen
+"X-Perfilado-Token" con ese valor.
+
+Los últimos perfiles se guardan en memoria (buffer circular) y se descargan desde
+GET /api/perfiles/<id> como archivo .prof (para snakeviz o `python -m pstats`) o como texto.
+
+Términos clave:
+- cProfile: Perfilador de la librería estándar. Cuenta llamadas y tiempo de cada función.
+- Buffer circular (ring buffer): Lista de tamaño fijo; al llenarse, cada perfil nuevo
+  descarta al más viejo.
+- pstats: Módulo estándar para leer y ordenar los resultados de cProfile.
+"""
+
+import cProfile
+import io
+import marshal
+import pstats
+import threading
+import time
+import uuid
+from collections import deque
+
+from flask import g, request
+
+import config
+from services.utilidades import ahora_str
+
+HEADER = "X-Perfilar"
+HEADER_TOKEN = "X-Perfilado-Token"
+HEADER_ID = "X-Perfil-Id"
+MAX_PERFILES = 20
+
+perfiles = deque(maxlen=MAX_PERFILES)
+pendientes = {}  # endpoint -> cantidad de próximas peticiones a perfilar
+_lock = threading.Lock()
+# cProfile admite un solo perfil activo por proceso (Python 3.12+): se perfila de a una petición
+_en_curso = threading.Lock()
+
+
+def habilitado():
+    return config.PERFILADO
+
+
+def token_valido():
+    """
+    Indica si la petición trae el token de perfilado (o si no se configuró ninguno).
+
+    Returns:
+        bool: True si puede usar el perfilado.
+    """
+    return not config.PERFILADO_TOKEN or request.headers.get(HEADER_TOKEN) == config.PERFILADO_TOKEN
+
+
+def activar(endpoint, cantidad):
+    """
+    Marca las próximas `cantidad` peticiones a `endpoint` para perfilarlas.
+
+    Args:
+        endpoint (str): Nombre del endpoint de Flask (ej: "ventas.registrar_venta").
+        cantidad (int): Peticiones a perfilar.
+    """
+    with _lock:
+        pendientes[endpoint] = pendientes.get(endpoint, 0) + cantidad
+
+
+def _tomar_pendiente(endpoint):
+    with _lock:
+        restantes = pendientes.get(endpoint, 0)
+        if not restantes:
+            return False
+        if restantes == 1:
+            del pendientes[endpoint]
+        else:
+            pendientes[endpoint] = restantes - 1
+        return True
+
+
+def _inicio_peticion():
+    pedido = request.headers.get(HEADER) == "1" and token_valido()
+    if not (pedido or (pendientes and _tomar_pendiente(request.endpoint))):
+        return
+    if not _en_curso.acquire(blocking=False):
+        g.perfil_ocupado = True
+        return
+    perfil = cProfile.Profile()
+    g.perfil = perfil
+    g.perfil_inicio = time.perf_counter()
+    perfil.enable()
+
+
+def _detener():
+    perfil = g.pop("perfil", None)
+    if perfil is None:
+        return None
+    perfil.disable()
+    _en_curso.release()
+    return perfil
+
+
+def _fin_peticion(respuesta):
+    perfil = _detener()
+    if perfil is None:
+        if g.pop("perfil_ocupado", False):
+            respuesta.headers[HEADER_ID] = "ocupado"
+        return respuesta
+
+    perfil.create_stats()
+    registro = {
+        "id": uuid.uuid4().hex[:12],
+        "fecha": ahora_str(),
+        "metodo": request.method,
+        "ruta": request.full_path.rstrip("?"),
+        "endpoint": request.endpoint,
+        "status": respuesta.status_code,
+        "duracion_ms": round((time.perf_counter() - g.pop("perfil_inicio")) * 1000, 2),
+        "stats": marshal.dumps(perfil.stats),
+    }
+    with _lock:
+        perfiles.append(registro)
+    respuesta.headers[HEADER_ID] = registro["id"]
+    return respuesta
+
+
+def _al_terminar(_error=None):
+    # Si la vista lanzó una excepción no pasa por after_request: el perfil se descarta
+    _detener()
+
+
+def configurar_perfilado(app):
+    """
+    Registra los hooks de perfilado si CAJA_PERFILADO=1.
+
+    Se llama después de configurar_bloqueo, así el perfil no incluye la espera del bloqueo
+    de datos y su after_request corre antes de la compresión.
+
+    Args:
+        app (Flask): Aplicación a perfilar.
+    """
+    if not habilitado():
+        return
+    app.before_request(_inicio_peticion)
+    app.after_request(_fin_peticion)
+    app.teardown_request(_al_terminar)
+
+
+def listar():
+    """
+    Devuelve los perfiles guardados, del más nuevo al más viejo, sin los datos de cProfile.
+
+    Returns:
+        list: Metadatos de cada perfil.
+    """
+    with _lock:
+        return [{k: v for k, v in p.items() if k != "stats"} for p in reversed(perfiles)]
+
+
+def buscar(perfil_id):
+    """
+    Busca un perfil por ID.
+
+    Returns:
+        dict | None: Perfil con sus datos, o None si ya no está en el buffer.
+    """
+    with _lock:
+        return next((p for p in perfiles if p["id"] == perfil_id), None)
+
+
+class _Volcado:
+    """Adaptador para que pstats.Stats lea estadísticas ya volcadas con marshal."""
+
+    def __init__(self, datos):
+        self.stats = marshal.loads(datos)
+
+    def create_stats(self):
+        pass
+
+
+def como_texto(perfil, orden="cumulative", limite=40):
+    """
+    Formatea un perfil como el reporte de texto de pstats.
+
+    Args:
+        perfil (dict): Perfil guardado.
+        orden (str): Columna de orden de pstats ("cumulative", "tottime", "calls", ...).
+        limite (int): Cantidad de funciones a mostrar.
+
+    Returns:
+        str: Reporte de texto.
+    """
+    salida = io.StringIO()
+    stats = pstats.Stats(_Volcado(perfil["stats"]), stream=salida)
+    stats.strip_dirs().sort_stats(orden).print_stats(limite)
+    encabezado = f"{perfil['metodo']} {perfil['ruta']} -> {perfil['status']} en {perfil['duracion_ms']} ms ({perfil['fecha']})\n"
+    return encabezado + salida.getvalue()
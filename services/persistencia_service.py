@@ -0,0 +1,159 @@
+"""
+Servicio de persistencia segura para varios procesos y varios hilos.
+
+Los controladores guardan los datos en archivos JSON con el patrón "cargar -> modificar -> guardar".
+Con un solo proceso de desarrollo eso alcanzaba, pero en producción hay varios workers
+(procesos) con varios hilos cada uno atendiendo pedidos a la vez. Sin coordinación, dos
+ventas simultáneas leen la misma caja y la segunda en guardar pisa a la primera.
+
+Este módulo aporta:
+- Un bloqueo de datos que vale entre procesos (archivo de lock del sistema operativo) y entre
+  hilos (RLock). Toda petición que modifica datos (POST, PUT, PATCH, DELETE) lo toma completo,
+  así cada "cargar -> modificar -> guardar" se ejecuta sin que otro lo intercale.
+- Escritura atómica de los JSON: se escribe un archivo temporal y se lo reemplaza de una vez,
+  así una lectura concurrente nunca ve un archivo escrito a medias.
+
+Términos clave:
+- Worker: Proceso del servidor de producción que atiende peticiones. Hay varios en paralelo.
+- Lock de archivo (flock): Bloqueo que da el sistema operativo sobre un archivo y que respetan
+  todos los procesos que lo piden. Se libera solo si el proceso termina.
+- Reentrante: El mismo hilo puede tomar el bloqueo varias veces sin trabarse a sí mismo.
+- Escritura atómica: os.replace cambia el archivo viejo por el nuevo en un solo paso.
+"""
+
+import json
+import os
+import tempfile
+import threading
+
+from flask import g, request
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+LOCK_FILE = "data/.bloqueo"
+METODOS_DE_ESCRITURA = ("POST", "PUT", "PATCH", "DELETE")
+
+
+class BloqueoDatos:
+    """
+    Bloqueo reentrante de los datos: RLock dentro del proceso y lock de archivo entre procesos.
+    """
+
+    def __init__(self, ruta=LOCK_FILE):
+        self.ruta = ruta
+        self._rlock = threading.RLock()
+        self._profundidad = 0  # Solo la toca el hilo que tiene el RLock
+        self._archivo = None
+
+    def adquirir(self):
+        self._rlock.acquire()
+        self._profundidad += 1
+        if self._profundidad > 1:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+            self._archivo = open(self.ruta, "a+b")
+            if fcntl is not None:
+                fcntl.flock(self._archivo.fileno(), fcntl.LOCK_EX)
+            else:
+                self._archivo.seek(0)
+                msvcrt.locking(self._archivo.fileno(), msvcrt.LK_LOCK, 1)
+        except Exception:
+            self._cerrar()
+            self._profundidad -= 1
+            self._rlock.release()
+            raise
+
+    def liberar(self):
+        self._profundidad -= 1
+        if self._profundidad == 0:
+            self._cerrar()
+        self._rlock.release()
+
+    def _cerrar(self):
+        if self._archivo is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._archivo.fileno(), fcntl.LOCK_UN)
+            else:
+                self._archivo.seek(0)
+                msvcrt.locking(self._archivo.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._archivo.close()
+            self._archivo = None
+
+    def __enter__(self):
+        self.adquirir()
+        return self
+
+    def __exit__(self, *exc):
+        self.liberar()
+
+
+bloqueo = BloqueoDatos()
+
+
+def _reemplazar_atomico(ruta, escribir, modo="w", encoding="utf-8"):
+    """Escribe con `escribir(archivo)` en un temporal del mismo directorio y lo mueve a `ruta`."""
+    directorio = os.path.dirname(ruta) or "."
+    os.makedirs(directorio, exist_ok=True)
+    fd, temporal = tempfile.mkstemp(dir=directorio, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, modo, encoding=encoding) as f:
+            escribir(f)
+        os.chmod(temporal, 0o644)  # mkstemp crea el archivo solo legible por el dueño
+        os.replace(temporal, ruta)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+
+def escribir_json(ruta, datos, **opciones):
+    """
+    Guarda datos en un archivo JSON de forma atómica (archivo temporal + os.replace).
+
+    Args:
+        ruta (str): Archivo destino.
+        datos: Datos a serializar.
+        **opciones: Opciones de json.dump (indent, ensure_ascii, ...).
+    """
+    _reemplazar_atomico(ruta, lambda f: json.dump(datos, f, **opciones))
+
+
+def escribir_bytes(ruta, contenido):
+    """
+    Guarda bytes ya serializados (o comprimidos) de forma atómica, igual que escribir_json.
+
+    Args:
+        ruta (str): Archivo destino.
+        contenido (bytes): Contenido completo del archivo.
+    """
+    _reemplazar_atomico(ruta, lambda f: f.write(contenido), "wb", None)
+
+
+def _tomar_bloqueo():
+    if request.method in METODOS_DE_ESCRITURA:
+        bloqueo.adquirir()
+        g.bloqueo_datos = True
+
+
+def _soltar_bloqueo(_error=None):
+    if g.pop("bloqueo_datos", False):
+        bloqueo.liberar()
+
+
+def configurar_bloqueo(app):
+    """
+    Hace que cada petición que modifica datos se ejecute con el bloqueo de datos tomado.
+
+    Args:
+        app (Flask): Aplicación a configurar.
+    """
+    app.before_request(_tomar_bloqueo)
+    app.teardown_request(_soltar_bloqueo)
@@ -0,0 +1,256 @@
+"""
+Pronóstico de ventas y de quiebres de stock a partir del historial de ventas por día.
+
+Para cada producto se arma la serie de unidades vendidas por día de los últimos
+HISTORIA_DIAS días (hasta ayer, el último día completo) y se estima su demanda diaria con
+suavizado exponencial. También se informan las medias móviles de 7 y 28 días. Con la demanda
+y el stock actual se proyecta en cuántos días se agota cada producto.
+
+El cálculo se hace una vez por día (de noche con `python -m services.pronostico_service`
+desde un cron, o en la primera consulta del día) y se guarda en data/pronostico.json. La
+consulta solo cruza esa demanda con el stock actual, así que es instantánea y refleja las
+ventas del día.
+
+Si NumPy está instalado, las series de todos los productos se procesan juntas como una
+matriz (productos x días). Si no, se calcula lo mismo en Python puro.
+
+Términos clave:
+- Media móvil: Promedio de los últimos N días.
+- Suavizado exponencial: Promedio que pesa más los días recientes:
+  nivel = alfa * ventas_del_día + (1 - alfa) * nivel_anterior. Con alfa = 0.3 reacciona a
+  cambios de tendencia sin saltar con cada día atípico.
+- Quiebre de stock: Día en que el stock llega a cero al ritmo de venta estimado.
+"""
+
+import json
+import math
+import os
+from datetime import datetime, timedelta
+
+from services import archivo_service
+from services.particiones_service import VistaParticionada
+from services.persistencia_service import bloqueo, escribir_json
+from services.instrumentacion_service import medir_io
+from services.utilidades import ahora_str, epoch
+
+try:
+    import numpy
+except ImportError:  # Dependencia opcional
+    numpy = None
+
+PRONOSTICO_FILE = "data/pronostico.json"
+HISTORIA_DIAS = 90
+ALFA = 0.3
+DIAS_INICIALES = 7  # el nivel arranca en el promedio de la primera semana
+
+
+def _dias(hoy, cantidad):
+    """Los `cantidad` días anteriores a `hoy`, del más viejo al más nuevo."""
+    inicio = datetime.strptime(hoy, "%Y-%m-%d") - timedelta(days=cantidad)
+    return [(inicio + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(cantidad)]
+
+
+def _ventas_desde(ventas, dia):
+    """Recorre las ventas desde `dia`; con particiones, saltea los meses anteriores sin leerlos."""
+    if not isinstance(ventas, VistaParticionada):
+        yield from (v for v in ventas if v.get("fecha", "") >= dia)
+        return
+    limite = epoch(f"{dia} 00:00:00")
+    for i, entrada in enumerate(ventas.particiones):
+        if entrada["hasta_ts"] is not None and entrada["hasta_ts"] < limite:
+            continue
+        yield from (v for v in ventas.registros_de(i) if v.get("fecha", "") >= dia)
+
+
+def suavizado_exponencial(series, alfa=ALFA):
+    """
+    Nivel final del suavizado exponencial de cada serie.
+
+    Args:
+        series (list): Una lista de valores por día para cada serie (todas del mismo largo).
+        alfa (float): Peso del día más reciente (0 a 1).
+
+    Returns:
+        list: Nivel estimado de cada serie.
+    """
+    if not series:
+        return []
+    inicial = min(DIAS_INICIALES, len(series[0]))
+    if numpy is not None:
+        matriz = numpy.asarray(series, dtype=float)
+        nivel = matriz[:, :inicial].mean(axis=1)
+        for t in range(inicial, matriz.shape[1]):
+            nivel = alfa * matriz[:, t] + (1 - alfa) * nivel
+        return nivel.tolist()
+
+    niveles = []
+    for serie in series:
+        nivel = sum(serie[:inicial]) / inicial
+        for valor in serie[inicial:]:
+            nivel = alfa * valor + (1 - alfa) * nivel
+        niveles.append(nivel)
+    return niveles
+
+
+def media_movil(series, ventana):
+    """
+    Promedio de los últimos `ventana` días de cada serie.
+
+    Args:
+        series (list): Una lista de valores por día para cada serie.
+        ventana (int): Cantidad de días.
+
+    Returns:
+        list: Promedio de cada serie.
+    """
+    if not series:
+        return []
+    if numpy is not None:
+        return numpy.asarray(series, dtype=float)[:, -ventana:].mean(axis=1).tolist()
+    return [sum(serie[-ventana:]) / len(serie[-ventana:]) for serie in series]
+
+
+def calcular(hoy=None):
+    """
+    Calcula la demanda diaria estimada de cada producto y de las ventas totales.
+
+    Args:
+        hoy (str): Día del cálculo (YYYY-MM-DD). Por defecto, hoy.
+
+    Returns:
+        dict: Pronóstico (día, parámetros, ventas totales y demanda por producto).
+    """
+    # Import local para evitar imports circulares (los controladores usan los servicios)
+    from controllers.ventas_controller import leer_ventas
+
+    hoy = hoy or ahora_str()[:10]
+    dias = _dias(hoy, HISTORIA_DIAS)
+    posicion = {dia: i for i, dia in enumerate(dias)}
+    recientes = [v for v in _ventas_desde(leer_ventas(), dias[0]) if v.get("fecha", "")[:10] in posicion]
+
+    # Totales por día: el mismo resumen que usan las métricas (ventas_por_dia, ingresos_por_dia)
+    por_dia = archivo_service.resumir_ventas(recientes)["dias"]
+    totales = [[por_dia.get(dia, (0, 0))[0] for dia in dias], [por_dia.get(dia, (0, 0))[1] for dia in dias]]
+
+    # Unidades por producto y por día
+    series, nombres = {}, {}
+    for venta in recientes:
+        i = posicion[venta["fecha"][:10]]
+        for item in venta.get("items", []):
+            clave = str(item.get("id"))
+            serie = series.setdefault(clave, [0] * len(dias))
+            serie[i] += item.get("cantidad", 0)
+            nombres[clave] = item.get("nombre", "Desconocido")
+
+    claves = list(series)
+    matriz = [series[clave] for clave in claves]
+    demanda = suavizado_exponencial(matriz)
+    media_7 = media_movil(matriz, 7)
+    media_28 = media_movil(matriz, 28)
+    ventas_diarias, ingresos_diarios = suavizado_exponencial(totales)
+
+    return {
+        "dia": hoy,
+        "generado": ahora_str(),
+        "historia": {"desde": dias[0], "hasta": dias[-1]},
+        "alfa": ALFA,
+        "numpy": numpy is not None,
+        "ventas": {
+            "ventas_diarias": round(ventas_diarias, 2),
+            "ingresos_diarios": round(ingresos_diarios, 2),
+            "proximos_7_dias": {"ventas": round(ventas_diarias * 7, 2), "ingresos": round(ingresos_diarios * 7, 2)},
+        },
+        "productos": {
+            clave: {
+                "nombre": nombres[clave],
+                "demanda_diaria": round(demanda[i], 4),
+                "media_7": round(media_7[i], 4),
+                "media_28": round(media_28[i], 4),
+                "vendidas": sum(matriz[i]),
+            }
+            for i, clave in enumerate(claves)
+        },
+    }
+
+
+@medir_io("pronostico", PRONOSTICO_FILE)
+def guardar_pronostico(pronostico):
+    """
+    Guarda el pronóstico calculado en el archivo JSON.
+
+    Args:
+        pronostico (dict): Resultado de calcular().
+    """
+    escribir_json(PRONOSTICO_FILE, pronostico, ensure_ascii=False)
+
+
+@medir_io("pronostico", PRONOSTICO_FILE)
+def cargar_pronostico():
+    """
+    Devuelve el pronóstico del día. Si no existe o es de un día anterior, lo recalcula y lo
+    guarda con el bloqueo de datos tomado (se llama desde un GET, que no lo toma), así lee
+    las ventas sin escrituras a medias y un solo worker lo calcula.
+
+    Returns:
+        dict: Pronóstico del día.
+    """
+    pronostico = _leer_del_dia()
+    if pronostico is not None:
+        return pronostico
+    with bloqueo:
+        pronostico = _leer_del_dia()  # Otro worker pudo calcularlo mientras se esperaba
+        if pronostico is None:
+            pronostico = calcular()
+            guardar_pronostico(pronostico)
+    return pronostico
+
+
+def _leer_del_dia():
+    """Lee el pronóstico guardado si es de hoy (None si no existe o es de otro día)."""
+    if not os.path.exists(PRONOSTICO_FILE):
+        return None
+    with open(PRONOSTICO_FILE, "r", encoding="utf-8") as f:
+        pronostico = json.load(f)
+    return pronostico if pronostico.get("dia") == ahora_str()[:10] else None
+
+
+def quiebres(pronostico, productos):
+    """
+    Cruza la demanda estimada con el stock actual y proyecta el día de quiebre de cada producto.
+
+    Args:
+        pronostico (dict): Pronóstico del día.
+        productos (list): Productos con su stock actual.
+
+    Returns:
+        list: Productos con demanda y días restantes, primero los que se agotan antes
+            (los que no tienen ventas recientes van al final, sin fecha de quiebre).
+    """
+    hoy = datetime.strptime(pronostico["dia"], "%Y-%m-%d")
+    resultado = []
+    for producto in productos:
+        estimado = pronostico["productos"].get(str(producto["id"]), {})
+        demanda = estimado.get("demanda_diaria", 0)
+        stock = producto.get("stock", 0)
+        dias_restantes = stock / demanda if demanda > 0 else None
+        resultado.append({
+            "id": producto["id"],
+            "nombre": producto.get("nombre", ""),
+            "stock": stock,
+            "stock_minimo": producto.get("stock_minimo"),
+            "demanda_diaria": demanda,
+            "media_7": estimado.get("media_7", 0),
+            "media_28": estimado.get("media_28", 0),
+            "dias_restantes": None if dias_restantes is None else round(dias_restantes, 1),
+            "fecha_quiebre": None if dias_restantes is None else (hoy + timedelta(days=math.floor(dias_restantes))).strftime("%Y-%m-%d"),
+        })
+    resultado.sort(key=lambda p: (p["dias_restantes"] is None, p["dias_restantes"] or 0))
+    return resultado
+
+
+if __name__ == "__main__":
+    # Uso (desde la carpeta del proyecto, por ejemplo cada noche desde un cron):
+    #   python -m services.pronostico_service
+    calculado = calcular()
+    guardar_pronostico(calculado)
+    print(f"Pronóstico de {len(calculado['productos'])} productos guardado en {PRONOSTICO_FILE}")
@@ -0,0 +1,263 @@
+"""
+Ranking de productos más vendidos (por unidades y por facturación) en ventanas móviles, con
+clasificación ABC.
+
+En lugar de contar todos los items de todas las ventas en cada consulta, el ranking se
+mantiene al registrar, editar o eliminar cada venta (igual que los cierres de caja):
+- Por cada día de los últimos DIAS_GUARDADOS hay un resumen Space-Saving de unidades y otro de
+  facturación, más los totales exactos del día.
+- Un resumen más acumula todo el histórico.
+- Las ventanas (día, semana = 7 días, mes = 30 días) se arman sumando los resúmenes de sus días.
+
+Cada resumen guarda a lo sumo CAPACIDAD productos, así la memoria y el archivo
+(data/ranking.json) no crecen con la cantidad de productos ni de ventas. Si el archivo no
+existe se reconstruye recorriendo las ventas una vez.
+
+Términos clave:
+- Space-Saving: Algoritmo de "heavy hitters" (productos más frecuentes) con memoria acotada.
+  Guarda k contadores; si llega un producto nuevo y no hay lugar, reemplaza al de menor
+  conteo y hereda ese conteo como "error" máximo. Los productos que de verdad están arriba
+  siempre quedan, con conteo exacto o sobreestimado a lo sumo en "error".
+- Clasificación ABC: Se ordenan los productos por facturación (o unidades) y se acumula su
+  participación: A hasta el 80% del total, B hasta el 95%, C el resto.
+- Ventana móvil: Período que termina hoy (ej: los últimos 7 días).
+"""
+
+import json
+import os
+from datetime import datetime, timedelta
+
+from services.persistencia_service import bloqueo, escribir_json
+from services.instrumentacion_service import medir_io
+
+RANKING_FILE = "data/ranking.json"
+CAPACIDAD = 100
+DIAS_GUARDADOS = 31
+VENTANAS = {"dia": 1, "semana": 7, "mes": 30}
+MEDIDAS = ("unidades", "ingresos")
+LIMITE_A = 0.80
+LIMITE_B = 0.95
+
+
+def _resumen_vacio():
+    return {"unidades": {}, "ingresos": {}, "totales": {"unidades": 0, "ingresos": 0}}
+
+
+def _ranking_vacio():
+    return {"capacidad": CAPACIDAD, "dias": {}, "todo": _resumen_vacio(), "nombres": {}}
+
+
+def sumar(contadores, clave, peso, capacidad=CAPACIDAD):
+    """
+    Suma `peso` a un producto en un resumen Space-Saving ({clave: [conteo, error]}).
+
+    Si el producto no está y el resumen está lleno, reemplaza al de menor conteo. Los pesos
+    negativos (ventas eliminadas) solo descuentan si el producto está en el resumen.
+
+    Args:
+        contadores (dict): Resumen a modificar en el lugar.
+        clave (str): ID del producto.
+        peso (float): Unidades o importe a sumar.
+        capacidad (int): Máximo de productos del resumen.
+    """
+    if clave in contadores:
+        contadores[clave][0] += peso
+        if contadores[clave][0] <= 0:
+            del contadores[clave]
+    elif peso <= 0:
+        return
+    elif len(contadores) < capacidad:
+        contadores[clave] = [peso, 0]
+    else:
+        minimo = min(contadores, key=lambda c: contadores[c][0])
+        conteo = contadores.pop(minimo)[0]
+        contadores[clave] = [conteo + peso, conteo]
+
+
+def fusionar(resumenes, capacidad=CAPACIDAD):
+    """
+    Suma varios resúmenes Space-Saving en uno.
+
+    A un producto que falta en un resumen lleno se le suma como error el mínimo de ese
+    resumen (pudo haber tenido hasta ese conteo). Se conservan los `capacidad` mayores.
+
+    Args:
+        resumenes (list): Resúmenes {clave: [conteo, error]}.
+        capacidad (int): Máximo de productos del resultado.
+
+    Returns:
+        dict: Resumen fusionado.
+    """
+    claves = set().union(*resumenes) if resumenes else set()
+    fusionado = {clave: [0, 0] for clave in claves}
+    for resumen in resumenes:
+        minimo = min((c for c, _ in resumen.values()), default=0) if len(resumen) >= capacidad else 0
+        for clave, contador in fusionado.items():
+            conteo, error = resumen.get(clave, (minimo, minimo))
+            contador[0] += conteo
+            contador[1] += error
+    mayores = sorted(fusionado.items(), key=lambda par: -par[1][0])[:capacidad]
+    return dict(mayores)
+
+
+@medir_io("ranking", RANKING_FILE)
+def cargar_ranking():
+    """
+    Carga el ranking desde el archivo JSON. Si no existe, lo reconstruye a partir de las ventas.
+    La reconstrucción se hace con el bloqueo de datos tomado: desde un GET, una venta
+    concurrente podría guardar su ranking en el medio y quedaría pisada por una copia vieja.
+
+    Returns:
+        dict: Estado del ranking (resúmenes por día, histórico y nombres de productos).
+    """
+    if not os.path.exists(RANKING_FILE):
+        with bloqueo:
+            if not os.path.exists(RANKING_FILE):
+                ranking = reconstruir_ranking()
+                guardar_ranking(ranking)
+                return ranking
+    with open(RANKING_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@medir_io("ranking", RANKING_FILE)
+def guardar_ranking(ranking):
+    """
+    Guarda el ranking en el archivo JSON.
+
+    Args:
+        ranking (dict): Estado del ranking.
+    """
+    escribir_json(RANKING_FILE, ranking, ensure_ascii=False)
+
+
+def _hoy():
+    return datetime.now().strftime("%Y-%m-%d")
+
+
+def _dia_limite(dias):
+    """Primer día de una ventana de `dias` días que termina hoy."""
+    return (datetime.now() - timedelta(days=dias - 1)).strftime("%Y-%m-%d")
+
+
+def _acumular(ranking, venta, signo):
+    dia = venta.get("fecha", "")[:10]
+    destinos = [ranking["todo"]]
+    if dia >= _dia_limite(DIAS_GUARDADOS):
+        destinos.append(ranking["dias"].setdefault(dia, _resumen_vacio()))
+
+    for item in venta.get("items", []):
+        clave = str(item.get("id"))
+        unidades = item.get("cantidad", 0) * signo
+        importe = item.get("cantidad", 0) * item.get("precio_unitario", 0) * signo
+        if signo > 0:
+            ranking["nombres"][clave] = item.get("nombre", "Desconocido")
+        for resumen in destinos:
+            sumar(resumen["unidades"], clave, unidades, ranking["capacidad"])
+            sumar(resumen["ingresos"], clave, importe, ranking["capacidad"])
+            resumen["totales"]["unidades"] += unidades
+            resumen["totales"]["ingresos"] += importe
+
+
+def reconstruir_ranking():
+    """
+    Arma el ranking recorriendo una única vez todas las ventas.
+
+    Returns:
+        dict: Ranking recién construido.
+    """
+    # Import local para evitar imports circulares (ventas_controller usa este servicio)
+    from controllers.ventas_controller import leer_ventas
+
+    ranking = _ranking_vacio()
+    for venta in leer_ventas():
+        _acumular(ranking, venta, 1)
+    return ranking
+
+
+def registrar(venta, signo=1, anterior=None):
+    """
+    Actualiza el ranking con una venta nueva (signo=1), eliminada (signo=-1) o editada
+    (la versión `anterior` se descuenta y la actual se suma).
+
+    Args:
+        venta (dict): Venta con sus items (id, nombre, cantidad, precio_unitario).
+        signo (int): 1 para sumar la venta, -1 para descontarla.
+        anterior (dict): Versión anterior de una venta editada. Opcional.
+    """
+    if not os.path.exists(RANKING_FILE):
+        # Se llama después de guardar las ventas: la reconstrucción ya incluye este cambio
+        guardar_ranking(reconstruir_ranking())
+        return
+
+    ranking = cargar_ranking()
+    if anterior is not None:
+        _acumular(ranking, anterior, -1)
+    _acumular(ranking, venta, signo)
+    limite = _dia_limite(DIAS_GUARDADOS)
+    ranking["dias"] = {dia: resumen for dia, resumen in ranking["dias"].items() if dia >= limite}
+    guardar_ranking(ranking)
+
+
+def clasificar(contadores, total):
+    """
+    Ordena un resumen de mayor a menor y asigna la clase ABC según la participación acumulada.
+
+    Args:
+        contadores (dict): Resumen {clave: [conteo, error]}.
+        total (float): Total exacto de la medida en el período (para la participación).
+
+    Returns:
+        list: [{"id", "valor", "error", "participacion", "acumulado", "clase"}] de mayor a menor.
+    """
+    filas, acumulado = [], 0
+    for clave, (valor, error) in sorted(contadores.items(), key=lambda par: (-par[1][0], par[0])):
+        participacion = valor / total if total else 0
+        # La clase se decide por lo acumulado antes del producto: el que cruza el 80% sigue siendo A
+        clase = "A" if acumulado < LIMITE_A else "B" if acumulado < LIMITE_B else "C"
+        acumulado += participacion
+        filas.append({
+            "id": clave,
+            "valor": valor,
+            "error": error,
+            "participacion": round(participacion, 4),
+            "acumulado": round(min(acumulado, 1), 4),
+            "clase": clase,
+        })
+    return filas
+
+
+def ranking(ventana="mes", medida="ingresos", cantidad=10):
+    """
+    Devuelve los productos más vendidos de una ventana con su clasificación ABC.
+
+    Args:
+        ventana (str): "dia", "semana", "mes" o "todo".
+        medida (str): "unidades" o "ingresos".
+        cantidad (int): Productos a devolver.
+
+    Returns:
+        dict: Ventana, período, total exacto, productos (con nombre y clase) y si es aproximado.
+    """
+    estado = cargar_ranking()
+    if ventana == "todo":
+        resumenes, desde = [estado["todo"]], None
+    else:
+        desde = _dia_limite(VENTANAS[ventana])
+        resumenes = [r for dia, r in estado["dias"].items() if desde <= dia <= _hoy()]
+
+    contadores = fusionar([r[medida] for r in resumenes], estado["capacidad"])
+    total = sum(r["totales"][medida] for r in resumenes)
+    filas = clasificar(contadores, total)
+    for fila in filas:
+        fila["nombre"] = estado["nombres"].get(fila["id"], "Desconocido")
+    return {
+        "ventana": ventana,
+        "medida": medida,
+        "desde": desde,
+        "hasta": _hoy(),
+        "total": total,
+        "aproximado": any(f["error"] for f in filas),
+        "productos": filas[:cantidad],
+        "clases": {c: sum(1 for f in filas if f["clase"] == c) for c in "ABC"},
+    }
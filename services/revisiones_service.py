@@ -0,0 +1,107 @@
+"""
+Revisiones para sincronización incremental de clientes (puntos de venta offline).
+
+Cada alta, modificación o baja de un producto, una venta o un movimiento de caja (los pagos
+son movimientos) se anota en la bitácora data/revisiones.jsonl con un número de revisión
+global que solo crece. El registro guarda ese número en su campo "rev".
+
+Un cliente guarda la última revisión que recibió y pide GET /api/sync?desde=<rev>. El
+servidor lee de la bitácora solo las anotaciones posteriores (ver bitacora_service) y
+devuelve el estado actual de esos registros. Los borrados van como lápidas (solo el ID).
+El costo depende de la cantidad de cambios, no del tamaño de los datos.
+
+Las anotaciones se hacen antes de guardar (el registro se guarda ya con su "rev"), con el
+bloqueo de datos tomado durante toda la petición. Por eso GET /api/sync también lee con el
+bloqueo: si no, podría ver la anotación N junto con el registro todavía sin guardar, devolver
+hasta=N con el estado viejo y no volver a mandarlo nunca. Si una escritura falla después de
+anotar, la anotación queda y el cliente recibe el registro tal como quedó guardado (o una
+lápida si no llegó a existir): puede recibir algo de más, pero no se pierde un cambio.
+
+Términos clave:
+- Revisión (rev): Número de la última modificación de un registro. Comparable entre colecciones.
+- Delta: Lo que cambió desde una revisión (registros modificados + lápidas).
+- Lápida (tombstone): Marca de que un registro se borró, para que el cliente también lo borre.
+"""
+
+from services import bitacora_service
+
+REVISIONES_FILE = "data/revisiones.jsonl"
+COLECCIONES = ("productos", "ventas", "caja", "pagos")
+
+
+def _anotacion(coleccion, registro_id, borrado=False, pago=False):
+    anotacion = {"seq": None, "col": coleccion, "id": registro_id}
+    if borrado:
+        anotacion["borrado"] = True
+    if pago:
+        anotacion["pago"] = True
+    return anotacion
+
+
+def marcar(coleccion, *registros):
+    """
+    Anota un cambio de los registros y les asigna su nueva revisión (campo "rev").
+    Los movimientos de caja con "origen": "pago" cuentan también como cambio del pago.
+
+    Args:
+        coleccion (str): "productos", "ventas" o "caja".
+        *registros (dict): Registros modificados o nuevos (se modifican en el lugar).
+    """
+    anotaciones = [
+        _anotacion(coleccion, registro["id"], pago=registro.get("origen") == "pago") for registro in registros
+    ]
+    bitacora_service.agregar(REVISIONES_FILE, anotaciones)
+    for registro, anotacion in zip(registros, anotaciones):
+        registro["rev"] = anotacion["seq"]
+
+
+def borrar(coleccion, registro):
+    """
+    Anota la baja de un registro (lápida).
+
+    Args:
+        coleccion (str): "productos", "ventas" o "caja".
+        registro (dict): Registro borrado.
+    """
+    bitacora_service.agregar(
+        REVISIONES_FILE, [_anotacion(coleccion, registro["id"], borrado=True, pago=registro.get("origen") == "pago")],
+    )
+
+
+def ultima():
+    """
+    Devuelve la última revisión anotada (0 si todavía no hay).
+
+    Returns:
+        int: Última revisión.
+    """
+    return bitacora_service.ultimo_seq(REVISIONES_FILE)
+
+
+def cambios_desde(desde, colecciones, limite):
+    """
+    Lee las anotaciones posteriores a `desde` y deja la última de cada registro.
+
+    Args:
+        desde (int): Última revisión que tiene el cliente.
+        colecciones (set): Colecciones pedidas (los pagos salen de las anotaciones de caja).
+        limite (int): Máximo de anotaciones a leer por llamada.
+
+    Returns:
+        tuple: ({coleccion: {id: borrado}}, hasta, completo). Si completo es False quedan
+            cambios posteriores a "hasta" y el cliente debe volver a pedir.
+    """
+    def pedida(anotacion):
+        return anotacion["col"] in colecciones or ("pagos" in colecciones and anotacion.get("pago"))
+
+    anotaciones, hasta = bitacora_service.leer_desde(REVISIONES_FILE, desde, limite, pedida)
+    cambios = {coleccion: {} for coleccion in colecciones}
+    for anotacion in anotaciones:
+        borrado = anotacion.get("borrado", False)
+        destinos = [anotacion["col"]] + (["pagos"] if anotacion.get("pago") else [])
+        for coleccion in destinos:
+            if coleccion in cambios:
+                # Se reinserta para que cada colección quede ordenada por su último cambio
+                cambios[coleccion].pop(anotacion["id"], None)
+                cambios[coleccion][anotacion["id"]] = borrado
+    return cambios, hasta, len(anotaciones) < limite
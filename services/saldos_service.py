@@ -0,0 +1,212 @@
+"""
+Servicio de checkpoints (cierres diarios) del saldo de la caja y conciliación.
+
+El saldo de la caja se modifica de forma incremental en cada movimiento. Para poder
+verificarlo sin sumar todo el historial, se guardan "checkpoints": fotos del saldo
+en un punto de la lista de movimientos. La conciliación solo suma los movimientos
+posteriores al último checkpoint.
+
+Términos clave:
+- Checkpoint: Registro con el saldo acumulado hasta una posición de la lista de movimientos
+  ("posicion" y "saldo") y el saldo al cierre de un día ("fecha" y "saldo_al_cierre").
+- Conciliación: Comparar el saldo guardado contra el saldo calculado a partir de los movimientos.
+  La diferencia entre ambos se informa como "diferencia" (drift).
+- Neto diario: Ingresos menos egresos de un día. Se mantiene en caja["netos_por_dia"] para
+  responder "¿cuál era el saldo al día X?" sin recorrer movimientos.
+
+Los checkpoints y los netos diarios se guardan dentro de caja.json, así se escriben
+junto con los movimientos. Se crea un checkpoint automáticamente con el primer
+movimiento de cada día (cierre del día anterior) y también se puede crear a pedido.
+"""
+
+from bisect import bisect_right
+from datetime import datetime, timedelta
+
+TOLERANCIA = 0.01  # Diferencias menores a un centavo se consideran redondeo
+
+
+def importe(movimiento):
+    """
+    Devuelve el efecto de un movimiento sobre el saldo (positivo si es ingreso, negativo si es egreso).
+
+    Args:
+        movimiento (dict): Movimiento de caja.
+
+    Returns:
+        float: Monto con signo.
+    """
+    if movimiento.get("tipo") == "ingreso":
+        return movimiento.get("monto", 0)
+    if movimiento.get("tipo") == "egreso":
+        return -movimiento.get("monto", 0)
+    return 0
+
+
+def preparar(caja):
+    """
+    Asegura que la caja tenga las estructuras de checkpoints y netos diarios.
+    Si faltan (cajas creadas antes de esta funcionalidad), los netos se calculan una única vez.
+
+    Args:
+        caja (dict): Estado de la caja (se modifica en el lugar).
+    """
+    caja.setdefault("checkpoints", [])
+    if "netos_por_dia" not in caja:
+        netos = {}
+        for movimiento in caja.get("movimientos", []):
+            dia = movimiento.get("fecha", "")[:10]
+            netos[dia] = netos.get(dia, 0) + importe(movimiento)
+        caja["netos_por_dia"] = netos
+
+
+def _saldo_al_cierre(caja, dia):
+    """Suma los netos diarios de todos los días hasta `dia` inclusive."""
+    return sum(neto for d, neto in caja["netos_por_dia"].items() if d <= dia)
+
+
+def crear_checkpoint(caja, dia):
+    """
+    Crea un checkpoint con todos los movimientos registrados hasta ahora.
+
+    El saldo posicional se calcula desde el checkpoint anterior sumando solo los
+    movimientos nuevos (no se copia caja["saldo"], así un desvío no queda "aprobado").
+
+    Args:
+        caja (dict): Estado de la caja.
+        dia (str): Día que se cierra (YYYY-MM-DD).
+
+    Returns:
+        dict: Checkpoint creado.
+    """
+    preparar(caja)
+    movimientos = caja.get("movimientos", [])
+    anterior = caja["checkpoints"][-1] if caja["checkpoints"] else {"posicion": 0, "saldo": 0}
+
+    checkpoint = {
+        "fecha": dia,
+        "posicion": len(movimientos),
+        "saldo": anterior["saldo"] + sum(importe(m) for m in movimientos[anterior["posicion"]:]),
+        "saldo_al_cierre": _saldo_al_cierre(caja, dia),
+        "creado": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    caja["checkpoints"].append(checkpoint)
+    return checkpoint
+
+
+def cerrar_dias_anteriores(caja):
+    """
+    Crea el checkpoint de cierre del día anterior si todavía no existe y hubo movimientos
+    desde el último checkpoint. Se llama antes de agregar cada movimiento, así el primer
+    movimiento del día cierra automáticamente la jornada previa.
+
+    Args:
+        caja (dict): Estado de la caja.
+    """
+    preparar(caja)
+    ayer = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+    ultimo = caja["checkpoints"][-1] if caja["checkpoints"] else None
+
+    if ultimo and ultimo["fecha"] >= ayer:
+        return
+    if len(caja.get("movimientos", [])) > (ultimo["posicion"] if ultimo else 0):
+        crear_checkpoint(caja, ayer)
+
+
+def aplicar_variacion(caja, fecha, variacion, posicion=None):
+    """
+    Registra una variación del saldo en los netos diarios y en los checkpoints afectados.
+
+    Args:
+        caja (dict): Estado de la caja.
+        fecha (str): Fecha del movimiento que cambia.
+        variacion (float): Cambio en el saldo (con signo).
+        posicion (int): Posición del movimiento modificado o quitado. None si el movimiento
+            se agregó al final (no afecta el saldo posicional de ningún checkpoint).
+    """
+    preparar(caja)
+    dia = fecha[:10]
+    caja["netos_por_dia"][dia] = caja["netos_por_dia"].get(dia, 0) + variacion
+
+    # Checkpoints ordenados: se recorren desde el último y se corta cuando ya no afecta
+    for checkpoint in reversed(caja["checkpoints"]):
+        afecta_cierre = dia <= checkpoint["fecha"]
+        afecta_posicion = posicion is not None and posicion < checkpoint["posicion"]
+        if not afecta_cierre and not afecta_posicion:
+            break
+        if afecta_cierre:
+            checkpoint["saldo_al_cierre"] += variacion
+        if afecta_posicion:
+            checkpoint["saldo"] += variacion
+
+
+def desplazar_checkpoints(caja, posicion):
+    """
+    Corre un lugar hacia atrás la posición de los checkpoints posteriores a un movimiento quitado.
+
+    Args:
+        caja (dict): Estado de la caja.
+        posicion (int): Posición que ocupaba el movimiento quitado.
+    """
+    for checkpoint in reversed(caja.get("checkpoints", [])):
+        if checkpoint["posicion"] <= posicion:
+            break
+        checkpoint["posicion"] -= 1
+
+
+def conciliar(caja, completa=False):
+    """
+    Verifica el saldo guardado sumando solo los movimientos posteriores al último checkpoint.
+
+    Args:
+        caja (dict): Estado de la caja.
+        completa (bool): Si es True, suma todos los movimientos desde el principio
+            (auditoría completa, también valida el último checkpoint).
+
+    Returns:
+        dict: Saldo guardado, saldo calculado, diferencia y checkpoint usado.
+    """
+    preparar(caja)
+    movimientos = caja.get("movimientos", [])
+    checkpoint = None if completa or not caja["checkpoints"] else caja["checkpoints"][-1]
+    base = checkpoint or {"posicion": 0, "saldo": 0}
+
+    pendientes = movimientos[base["posicion"]:]
+    calculado = base["saldo"] + sum(importe(m) for m in pendientes)
+    diferencia = caja.get("saldo", 0) - calculado
+
+    resultado = {
+        "saldo": caja.get("saldo", 0),
+        "saldo_calculado": round(calculado, 2),
+        "diferencia": round(diferencia, 2),
+        "consistente": abs(diferencia) < TOLERANCIA,
+        "checkpoint": checkpoint,
+        "movimientos_revisados": len(pendientes),
+    }
+    if completa and caja["checkpoints"]:
+        ultimo = caja["checkpoints"][-1]
+        esperado = sum(importe(m) for m in movimientos[:ultimo["posicion"]])
+        resultado["diferencia_checkpoint"] = round(ultimo["saldo"] - esperado, 2)
+    return resultado
+
+
+def saldo_a_fecha(caja, dia):
+    """
+    Devuelve el saldo al cierre de un día.
+
+    Si el día tiene checkpoint, se responde directamente con su saldo al cierre
+    (búsqueda binaria). Si no, se suman los netos diarios hasta ese día, que son
+    uno por día y no uno por movimiento.
+
+    Args:
+        caja (dict): Estado de la caja.
+        dia (str): Día consultado (YYYY-MM-DD).
+
+    Returns:
+        float: Saldo al cierre del día.
+    """
+    preparar(caja)
+    checkpoints = caja["checkpoints"]
+    i = bisect_right([c["fecha"] for c in checkpoints], dia)
+    if i and checkpoints[i - 1]["fecha"] == dia:
+        return checkpoints[i - 1]["saldo_al_cierre"]
+    return _saldo_al_cierre(caja, dia)
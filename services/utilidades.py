@@ -0,0 +1,158 @@
+"""
+Utilidades compartidas para el manejo de fechas en Caja Plus.
+
+Todas las fechas se guardan como texto con el formato canónico "%Y-%m-%d %H:%M:%S"
+(por ejemplo "2025-06-13 16:39:29"). Este módulo centraliza cómo se generan, se leen
+y se agrupan, para no repetir strptime en cada controlador y en cada registro.
+
+Términos clave:
+- Formato canónico: El formato fijo con el que se guardan todas las fechas.
+- Epoch: Cantidad de segundos desde el 1/1/1970. Es un entero, así que ordenar y
+  comparar fechas con él es más rápido que hacerlo con datetime o con texto.
+- Memoización (lru_cache): Guardar el resultado de una función para no recalcularlo
+  cuando se la vuelve a llamar con los mismos argumentos. Las etiquetas de semana se
+  calculan una vez por día distinto, no una vez por registro.
+"""
+
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+FORMATO_FECHA = "%Y-%m-%d %H:%M:%S"
+
+# Diccionario de nombres de meses en español (para etiquetas de semana/mes)
+MESES_ES = {
+    1: "enero", 2: "febrero", 3: "marzo", 4: "abril", 5: "mayo", 6: "junio",
+    7: "julio", 8: "agosto", 9: "septiembre", 10: "octubre", 11: "noviembre", 12: "diciembre"
+}
+
+
+def ahora_str():
+    """
+    Devuelve la fecha y hora actual en el formato canónico.
+
+    Returns:
+        str: Fecha actual, ej. '2025-06-13 16:39:29'.
+    """
+    return datetime.now().strftime(FORMATO_FECHA)
+
+
+def parsear_fecha(texto):
+    """
+    Convierte una fecha en formato canónico a datetime.
+
+    Usa datetime.fromisoformat, que está implementado en C y lee el formato canónico
+    decenas de veces más rápido que strptime. Si el texto tiene otro formato,
+    se intenta con strptime para dar el mismo error que antes.
+
+    Args:
+        texto (str): Fecha, ej. '2025-06-13 16:39:29' o '2025-06-13'.
+
+    Returns:
+        datetime: Fecha convertida.
+
+    Raises:
+        ValueError: Si el texto no es una fecha válida.
+    """
+    try:
+        return datetime.fromisoformat(texto)
+    except (TypeError, ValueError):
+        return datetime.strptime(texto, FORMATO_FECHA)
+
+
+def parsear_fecha_flexible(texto):
+    """
+    Convierte una fecha ingresada por el usuario. Acepta ISO (YYYY-MM-DD, con o sin hora),
+    DD/MM/YYYY y MM/DD/YYYY. En los dos últimos formatos se completa con la hora actual.
+
+    Args:
+        texto (str): Fecha ingresada.
+
+    Returns:
+        datetime: Fecha convertida.
+
+    Raises:
+        ValueError: Si no coincide con ninguno de los formatos aceptados.
+    """
+    texto = texto.strip()
+    try:
+        return datetime.fromisoformat(texto)
+    except ValueError:
+        pass
+
+    for formato in ("%d/%m/%Y", "%m/%d/%Y"):
+        try:
+            fecha = datetime.strptime(texto, formato)
+        except ValueError:
+            continue
+        ahora = datetime.now()
+        return fecha.replace(hour=ahora.hour, minute=ahora.minute, second=ahora.second)
+
+    raise ValueError(f"Formato de fecha inválido: {texto}")
+
+
+def epoch(texto):
+    """
+    Devuelve el epoch (segundos, entero) de una fecha en formato canónico.
+    Se guarda junto al texto ("fecha_ts") para ordenar y comparar sin volver a parsear.
+
+    Args:
+        texto (str): Fecha en formato canónico.
+
+    Returns:
+        int: Segundos desde 1970.
+    """
+    return int(parsear_fecha(texto).timestamp())
+
+
+def epoch_de(registro):
+    """
+    Devuelve el epoch de un registro con "fecha": usa "fecha_ts" si ya está guardado
+    y, si no (registros viejos), lo calcula.
+
+    Args:
+        registro (dict): Venta, movimiento o pago.
+
+    Returns:
+        int: Segundos desde 1970.
+    """
+    ts = registro.get("fecha_ts")
+    return ts if ts is not None else epoch(registro["fecha"])
+
+
+@lru_cache(maxsize=4096)
+def _semana_label_dia(dia):
+    fecha = datetime.fromisoformat(dia)
+    start_of_week = fecha - timedelta(days=fecha.weekday())  # lunes de esa semana
+    end_of_week = start_of_week + timedelta(days=6)          # domingo de esa semana
+    mes = MESES_ES[start_of_week.month]
+    return f"{start_of_week.day}-{end_of_week.day} {mes} {end_of_week.year}"
+
+
+def semana_label(fecha):
+    """
+    Devuelve una etiqueta en español que representa la semana de una fecha dada.
+    El resultado se memoriza por día, así muchos registros del mismo día no lo recalculan.
+
+    Args:
+        fecha (datetime | str): Fecha de referencia (datetime o texto que empieza con YYYY-MM-DD).
+
+    Returns:
+        str: Etiqueta de semana, ej. '10-16 marzo 2025'
+    """
+    dia = fecha[:10] if isinstance(fecha, str) else fecha.strftime("%Y-%m-%d")
+    return _semana_label_dia(dia)
+
+
+@lru_cache(maxsize=4096)
+def periodos_de_dia(dia):
+    """
+    Devuelve las claves de agrupación de un día: (día, semana, mes, año).
+    Se memoriza por día.
+
+    Args:
+        dia (str): Día en formato YYYY-MM-DD.
+
+    Returns:
+        tuple: ('2025-06-13', '9-15 junio 2025', '2025-06', '2025')
+    """
+    return dia, _semana_label_dia(dia), dia[:7], dia[:4]
@@ -0,0 +1,112 @@
+"""
+Punto de entrada de producción de Caja Plus.
+
+`python app.py` levanta el servidor de desarrollo de Flask: un solo proceso, con el
+debugger activado y sin preparar nada para la carga real. Este archivo levanta la misma
+aplicación con un servidor WSGI de producción:
+
+- gunicorn (Linux/macOS): varios workers (procesos) con varios hilos cada uno.
+- waitress (Windows, o si gunicorn no está instalado): un proceso con varios hilos.
+
+La cantidad de workers, hilos, host y puerto se configura en config.py (variables de entorno
+CAJA_WORKERS, CAJA_THREADS, CAJA_HOST, CAJA_PUERTO). Con CAJA_MODO=asgi se usa en cambio el
+modo asíncrono de asgi.py sobre uvicorn.
+
+Uso:
+    pip install gunicorn      # o: pip install waitress
+    python servidor.py
+
+Términos clave:
+- WSGI: Interfaz estándar entre un servidor web de Python y la aplicación (Flask la implementa).
+- Precarga (preload): La app se importa y se "calienta" una sola vez en el proceso principal,
+  antes de crear los workers; cada worker arranca con esas cachés ya armadas.
+- Calentar cachés: Importar todos los controladores, crear los archivos faltantes, reconstruir índices, migrar datos legados y
+  resolver una vez los endpoints de lectura, para que la primera petición real no pague ese costo.
+"""
+
+import config
+from app import app
+from routes.carga_diferida import resolver_todas
+from services import idempotencia_service
+
+# Endpoints de lectura que consulta el dashboard apenas abre
+ENDPOINTS_A_CALENTAR = ("/api/productos", "/api/ventas", "/api/caja/", "/api/pagos", "/api/ventas/metricas")
+
+
+def calentar(aplicacion):
+    """
+    Prepara los datos y las cachés antes de recibir tráfico: crea los JSON que falten,
+    arma los índices derivados, migra los pagos legados y deja en la caché de respuestas
+    los endpoints de lectura principales.
+
+    Args:
+        aplicacion (Flask): Aplicación a calentar.
+    """
+    # Los controladores se cargan en diferido; en producción conviene importarlos todos una vez
+    resolver_todas(aplicacion)
+    cliente = aplicacion.test_client()
+    for url in ENDPOINTS_A_CALENTAR:
+        respuesta = cliente.get(url)
+        print(f"[calentar] {url} -> {respuesta.status_code}")
+
+
+def servir_con_gunicorn(aplicacion):
+    from gunicorn.app.base import BaseApplication
+
+    class ServidorGunicorn(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{config.HOST}:{config.PUERTO}")
+            self.cfg.set("workers", config.WORKERS)
+            self.cfg.set("threads", config.THREADS)
+            self.cfg.set("timeout", config.TIMEOUT)
+            self.cfg.set("preload_app", True)
+
+        def load(self):
+            return aplicacion
+
+    ServidorGunicorn().run()
+
+
+def servir_con_waitress(aplicacion):
+    from waitress import serve
+    serve(aplicacion, host=config.HOST, port=config.PUERTO, threads=config.THREADS)
+
+
+def servir_con_uvicorn():
+    import uvicorn
+    from asgi import aplicacion
+    # El calentamiento lo hace asgi.py al recibir el evento de arranque (lifespan)
+    print(f"Caja Plus en {config.HOST}:{config.PUERTO} (uvicorn, ASGI, pool de {config.THREADS} hilos)")
+    uvicorn.run(aplicacion, host=config.HOST, port=config.PUERTO, lifespan="on")
+
+
+def main():
+    if config.MODO == "asgi":
+        return servir_con_uvicorn()
+
+    try:
+        import gunicorn  # noqa: F401
+        servidor = "gunicorn"
+    except ImportError:
+        try:
+            import waitress  # noqa: F401
+            servidor = "waitress"
+        except ImportError:
+            raise SystemExit("Falta un servidor de producción: pip install gunicorn (o waitress en Windows)")
+
+    # Con varios procesos, un reintento puede caer en otro worker: las claves de idempotencia se comparten
+    if servidor == "gunicorn" and config.WORKERS > 1:
+        idempotencia_service.usar_almacen_compartido()
+
+    calentar(app)
+
+    if servidor == "gunicorn":
+        print(f"Caja Plus en {config.HOST}:{config.PUERTO} (gunicorn, {config.WORKERS} workers x {config.THREADS} hilos)")
+        servir_con_gunicorn(app)
+    else:
+        print(f"Caja Plus en {config.HOST}:{config.PUERTO} (waitress, {config.THREADS} hilos)")
+        servir_con_waitress(app)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,9 +8,23 @@ en tus tests sin complicaciones de rutas.
 import sys
 import os
 
+import pytest
+
 # Calcula la ruta al directorio padre (donde está app.py)
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 
 # Inserta ROOT al inicio de sys.path si no está ya presente
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def datos_tmp(tmp_path, monkeypatch):
+    """
+    Fixture que ejecuta el test dentro de un directorio temporal con una carpeta
+    `data/` vacía. Como los controladores usan rutas relativas ("data/..."),
+    así los tests que escriben no modifican los archivos reales del proyecto.
+    """
+    (tmp_path / "data").mkdir()
+    monkeypatch.chdir(tmp_path)
+    return tmp_path / "data"
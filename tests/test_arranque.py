@@ -0,0 +1,20 @@
+import subprocess
+import sys
+
+from conftest import ROOT
+
+
+def test_crear_app_no_importa_controladores_ni_reportlab():
+    """
+    Esta funcion verifica que importar la app (create_app) no cargue los controladores
+    ni reportlab, y que se carguen recién con la primera petición que los usa.
+    """
+    codigo = (
+        "import sys, app\n"
+        "cargados = lambda: [m for m in sys.modules if m.startswith(('controllers', 'reportlab'))]\n"
+        "assert cargados() == [], cargados()\n"
+        "app.app.test_client().get('/api/productos')\n"
+        "assert 'controllers.productos_controller' in sys.modules\n"
+        "assert not any(m.startswith('reportlab') for m in sys.modules)\n"
+    )
+    subprocess.run([sys.executable, "-c", codigo], cwd=ROOT, check=True)
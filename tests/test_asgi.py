@@ -0,0 +1,74 @@
+import asyncio
+import json
+
+import pytest
+
+from asgi import aplicacion
+
+CAJA = {
+    "saldo": 1000,
+    "movimientos": [
+        {"id": "a", "tipo": "ingreso", "monto": 1000, "descripcion": "Venta #1", "fecha": "2025-06-01 10:00:00"},
+    ],
+}
+
+
+def pedir(metodo, ruta, cuerpo=b"", headers=(), query=b""):
+    """
+    Ejecuta una petición contra la app ASGI y devuelve (status, headers, cuerpo).
+    """
+    scope = {
+        "type": "http", "method": metodo, "path": ruta, "query_string": query,
+        "headers": [(b"content-type", b"application/json")] + list(headers),
+        "http_version": "1.1", "scheme": "http", "server": ("testserver", 80), "client": ("127.0.0.1", 1),
+    }
+    enviados = []
+
+    async def receive():
+        return {"type": "http.request", "body": cuerpo, "more_body": False}
+
+    async def send(mensaje):
+        enviados.append(mensaje)
+
+    asyncio.run(aplicacion(scope, receive, send))
+    inicio = enviados[0]
+    return inicio["status"], dict(inicio["headers"]), b"".join(m.get("body", b"") for m in enviados[1:])
+
+
+@pytest.fixture
+def caja_tmp(datos_tmp):
+    (datos_tmp / "caja.json").write_text(json.dumps(CAJA), encoding="utf-8")
+    return datos_tmp
+
+
+def test_lectura_y_304_desde_el_event_loop(caja_tmp):
+    """
+    Esta funcion verifica que GET /api/caja/ funcione en modo ASGI, que con el ETag vigente
+    se responda 304 y que después de un ingreso (POST por el mismo modo) el ETag cambie.
+    """
+    status, headers, cuerpo = pedir("GET", "/api/caja/")
+    assert status == 200
+    assert json.loads(cuerpo)["saldo"] == 1000
+    etag = headers[b"etag"]
+
+    status, _, cuerpo = pedir("GET", "/api/caja/", headers=[(b"if-none-match", etag)])
+    assert status == 304 and cuerpo == b""
+
+    status, _, _ = pedir("POST", "/api/caja/ingreso", json.dumps({"total": 5, "descripcion": "x"}).encode())
+    assert status == 201
+    assert pedir("GET", "/api/caja/", headers=[(b"if-none-match", etag)])[0] == 200
+
+
+def test_pdf_en_bloques(caja_tmp, monkeypatch):
+    """
+    Esta funcion verifica que descargar_pdf envíe el archivo completo en bloques.
+    """
+    from controllers import facturas_controller
+    monkeypatch.setattr(facturas_controller, "PDF_DIR", str(caja_tmp / "facturas_pdf"))
+    (caja_tmp / "facturas_pdf").mkdir()
+    contenido = bytes(range(256)) * 1024  # 256 KB -> varios bloques de 64 KB
+    (caja_tmp / "facturas_pdf" / "FAC-1.pdf").write_bytes(contenido)
+
+    status, _, cuerpo = pedir("GET", "/api/facturas/pdf/FAC-1.pdf")
+    assert status == 200
+    assert cuerpo == contenido
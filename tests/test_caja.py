@@ -0,0 +1,189 @@
+import json
+
+import pytest
+from app import app
+
+CAJA = {
+    "saldo": 700,
+    "movimientos": [
+        {"id": "a", "tipo": "ingreso", "monto": 1000, "descripcion": "Venta #1", "fecha": "2025-06-01 10:00:00"},
+        {"id": "b", "tipo": "egreso", "monto": 200, "descripcion": "Luz", "fecha": "2025-06-02 11:00:00"},
+        {"id": "c", "tipo": "ingreso", "monto": 400, "descripcion": "Venta #2", "fecha": "2025-06-03 12:00:00"},
+        {"id": "d", "tipo": "egreso", "monto": 500, "descripcion": "Alquiler", "fecha": "2025-06-03 18:00:00"},
+    ],
+}
+
+
+@pytest.fixture
+def client(datos_tmp):
+    """
+    Test client que trabaja sobre un directorio de datos temporal con una caja de cuatro movimientos.
+    """
+    (datos_tmp / "caja.json").write_text(json.dumps(CAJA), encoding="utf-8")
+    app.config["TESTING"] = True
+    return app.test_client()
+
+
+def test_checkpoint_y_conciliacion(client, datos_tmp):
+    """
+    Esta funcion verifica que el primer movimiento del día cree el checkpoint del día anterior,
+    que la conciliación solo revise los movimientos posteriores y que informe la diferencia
+    si el saldo guardado no coincide con los movimientos.
+    """
+    assert client.post("/api/caja/ingreso", json={"total": 50, "descripcion": "3"}).status_code == 201
+
+    conciliacion = client.get("/api/caja/conciliacion").get_json()
+    assert conciliacion["consistente"]
+    assert conciliacion["checkpoint"]["saldo"] == 700
+    assert conciliacion["movimientos_revisados"] == 1
+
+    # Quitar un movimiento viejo ajusta el checkpoint y el saldo en conjunto
+    assert client.delete("/api/caja/movimiento/b").status_code == 200
+    assert client.get("/api/caja/conciliacion?completa=1").get_json()["diferencia_checkpoint"] == 0
+
+    # Un saldo modificado a mano aparece como diferencia
+    caja = json.loads((datos_tmp / "caja.json").read_text(encoding="utf-8"))
+    caja["saldo"] += 10
+    (datos_tmp / "caja.json").write_text(json.dumps(caja), encoding="utf-8")
+    conciliacion = client.get("/api/caja/conciliacion").get_json()
+    assert not conciliacion["consistente"]
+    assert conciliacion["diferencia"] == 10
+
+
+def test_saldo_a_fecha(client):
+    """
+    Esta funcion verifica GET /api/caja/saldo?fecha=YYYY-MM-DD.
+    """
+    assert client.get("/api/caja/saldo?fecha=2025-06-01").get_json()["saldo"] == 1000
+    assert client.get("/api/caja/saldo?fecha=2025-06-02").get_json()["saldo"] == 800
+    assert client.get("/api/caja/saldo?fecha=2025-06-30").get_json()["saldo"] == 700
+    assert client.get("/api/caja/saldo?fecha=junio").status_code == 400
+
+
+def test_cierre_del_dia_por_metodo(client, datos_tmp):
+    """
+    Esta funcion verifica que el cierre del día acumule ventas y pagos por método de pago,
+    que al cerrar la caja quede archivado y que lo registrado después se sume como ajuste.
+    """
+    (datos_tmp / "productos.json").write_text(json.dumps([
+        {"id": 1, "nombre": "Remera", "descripcion": "", "precio": 100, "stock": 10, "categoria": "", "stock_minimo": 1}
+    ]), encoding="utf-8")
+    venta = {"items": [{"id": 1, "cantidad": 2}], "metodoPago": "Efectivo"}
+    pago = {"destinatario": "Textil SA", "concepto": "proveedor", "descripcion": "Telas",
+            "monto": 50, "metodo": "transferencia"}
+
+    assert client.post("/api/ventas/compras", json=venta).status_code == 201
+    assert client.post("/api/pagos", json=pago).status_code == 201
+
+    cierre = client.get("/api/caja/cierre").get_json()
+    assert cierre["metodos"]["efectivo"]["ingresos"] == 200
+    assert cierre["metodos"]["transferencia"]["egresos"] == 50
+    assert cierre["neto"] == 150
+    assert not cierre["cerrado"]
+
+    assert client.post("/api/caja/cierre").status_code == 201
+    assert client.get("/api/caja/cierre").get_json()["cerrado"]
+
+    assert client.post("/api/ventas/compras", json=venta).status_code == 201
+    cierre = client.get("/api/caja/cierre").get_json()
+    assert cierre["metodos"]["efectivo"] == {"ingresos": 400, "egresos": 0, "operaciones": 2, "neto": 400}
+
+
+def test_ingreso_idempotente(client, datos_tmp):
+    """
+    Esta funcion verifica que un reintento con el mismo Idempotency-Key devuelva la misma
+    respuesta sin registrar otro movimiento, y que la clave no se pueda reutilizar con otros datos.
+    """
+    from services.idempotencia_service import almacen
+    almacen.limpiar()
+    headers = {"Idempotency-Key": "pos-1-0001"}
+
+    primera = client.post("/api/caja/ingreso", json={"total": 50, "descripcion": "x"}, headers=headers)
+    reintento = client.post("/api/caja/ingreso", json={"total": 50, "descripcion": "x"}, headers=headers)
+    assert primera.status_code == reintento.status_code == 201
+    assert reintento.get_json() == primera.get_json()
+    assert reintento.headers["Idempotent-Replayed"] == "true"
+
+    caja = json.loads((datos_tmp / "caja.json").read_text(encoding="utf-8"))
+    assert len(caja["movimientos"]) == 5
+    assert caja["saldo"] == 750
+
+    otra = client.post("/api/caja/ingreso", json={"total": 99, "descripcion": "x"}, headers=headers)
+    assert otra.status_code == 422
+
+
+def test_etag_de_caja(client):
+    """
+    Esta funcion verifica que GET /api/caja/ responda 304 mientras la caja no cambie
+    y que un movimiento nuevo invalide el ETag.
+    """
+    primera = client.get("/api/caja/")
+    etag = primera.headers["ETag"]
+    assert client.get("/api/caja/", headers={"If-None-Match": etag}).status_code == 304
+
+    # Otra query string es otra respuesta
+    assert client.get("/api/caja/?tipo=egreso", headers={"If-None-Match": etag}).status_code == 200
+
+    client.post("/api/caja/ingreso", json={"total": 50, "descripcion": "x"})
+    nueva = client.get("/api/caja/", headers={"If-None-Match": etag})
+    assert nueva.status_code == 200
+    assert nueva.get_json()["saldo"] == 750
+
+
+def test_ingresos_concurrentes(client, datos_tmp):
+    """
+    Esta funcion verifica que varios ingresos registrados a la vez desde distintos hilos
+    no se pisen: con el bloqueo de datos se guardan todos y el saldo coincide.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    def registrar(i):
+        return app.test_client().post("/api/caja/ingreso", json={"total": 10, "descripcion": str(i)}).status_code
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        assert set(pool.map(registrar, range(40))) == {201}
+
+    caja = json.loads((datos_tmp / "caja.json").read_text(encoding="utf-8"))
+    assert len(caja["movimientos"]) == 44
+    assert caja["saldo"] == 700 + 400
+    assert client.get("/api/caja/conciliacion?completa=1").get_json()["consistente"]
+
+
+def test_metricas_prometheus(client, monkeypatch):
+    """
+    Esta funcion verifica que /metrics responda 404 con la instrumentación desactivada y que,
+    activada, informe la latencia del endpoint y los bytes leídos y escritos de caja.json.
+    """
+    from services import instrumentacion_service
+    assert client.get("/metrics").status_code == 404
+
+    monkeypatch.setattr(instrumentacion_service, "activa", True)
+    assert client.post("/api/caja/ingreso", json={"total": 10, "descripcion": "x"}).status_code == 201
+
+    texto = client.get("/metrics").get_data(as_text=True)
+    assert "# TYPE caja_http_request_duration_seconds histogram" in texto
+    assert 'caja_http_request_duration_seconds_count{blueprint="caja",endpoint="caja.registrar_ingreso",method="POST",status="201"}' in texto
+    assert 'caja_io_bytes_total{operacion="guardar",almacen="caja"}' in texto
+    assert 'caja_io_duration_seconds_bucket{operacion="cargar",almacen="caja",le="+Inf"}' in texto
+
+
+def test_numeracion_de_ventas_y_baja_del_ingreso(client, datos_tmp):
+    """
+    Esta funcion verifica que la descripción "Venta #N" salga de la cantidad de ingresos que
+    guarda la caja (contada una sola vez si falta) y que eliminar el ingreso de una venta
+    lo quite del vínculo venta -> movimiento.
+    """
+    (datos_tmp / "productos.json").write_text(json.dumps([
+        {"id": 1, "nombre": "Remera", "descripcion": "", "precio": 100, "stock": 10, "categoria": "Ropa", "stock_minimo": 1},
+    ]), encoding="utf-8")
+    venta = client.post("/api/ventas/compras", json={"items": [{"id": 1, "cantidad": 1}], "metodoPago": "efectivo"}).get_json()["venta"]
+    caja = json.loads((datos_tmp / "caja.json").read_text(encoding="utf-8"))
+    assert caja["movimientos"][-1]["descripcion"] == "Venta #3"
+    assert caja["movimientos_por_tipo"] == {"ingreso": 3, "egreso": 2}
+
+    assert client.delete(f"/api/caja/movimiento/{venta['id']}").status_code == 200
+    indices = json.loads((datos_tmp / "indices.json").read_text(encoding="utf-8"))
+    assert venta["id"] not in indices["movimiento_de_venta"]
+    client.post("/api/ventas/compras", json={"items": [{"id": 1, "cantidad": 1}], "metodoPago": "efectivo"})
+    caja = json.loads((datos_tmp / "caja.json").read_text(encoding="utf-8"))
+    assert caja["movimientos"][-1]["descripcion"] == "Venta #3"
@@ -0,0 +1,70 @@
+import json
+import threading
+import time
+
+import pytest
+from app import app
+from services import eventos_service
+
+PRODUCTOS = [{"id": 1, "nombre": "Remera", "descripcion": "", "precio": 1000, "stock": 10, "categoria": "Ropa", "stock_minimo": 2}]
+
+
+@pytest.fixture
+def client(datos_tmp):
+    """
+    Test client sobre un directorio de datos temporal con un producto en stock.
+    """
+    (datos_tmp / "productos.json").write_text(json.dumps(PRODUCTOS), encoding="utf-8")
+    return app.test_client()
+
+
+def test_eventos_de_una_venta_y_lectura_incremental(client):
+    """
+    Esta funcion verifica que una venta publique venta_creada, movimiento_creado y
+    stock_cambiado con seq consecutivos, que ?desde y ?tipos devuelvan solo lo pedido y que
+    la baja de un producto publique producto_eliminado.
+    """
+    venta = client.post("/api/ventas/compras", json={"items": [{"id": 1, "cantidad": 3}], "metodoPago": "efectivo"})
+    assert venta.status_code == 201
+
+    cambios = client.get("/api/cambios?desde=0&espera=0").get_json()
+    assert [(e["seq"], e["tipo"]) for e in cambios["cambios"]] == [
+        (1, "venta_creada"), (2, "movimiento_creado"), (3, "stock_cambiado"),
+    ]
+    assert cambios["hasta"] == 3
+    assert cambios["cambios"][2]["datos"]["productos"] == [{"id": 1, "nombre": "Remera", "stock": 7, "variacion": -3}]
+
+    venta_id = venta.get_json()["venta"]["id"]
+    assert client.delete(f"/api/ventas/{venta_id}").status_code == 200
+    siguientes = client.get("/api/cambios?desde=3&espera=0&tipos=stock_cambiado").get_json()
+    assert [e["seq"] for e in siguientes["cambios"]] == [6]
+    assert siguientes["hasta"] == 6
+
+    assert client.delete("/api/productos/1").status_code == 200
+    baja = client.get("/api/cambios?desde=6&espera=0").get_json()["cambios"]
+    assert [(e["tipo"], e["datos"]) for e in baja] == [("producto_eliminado", {"id": 1, "nombre": "Remera", "stock": 10})]
+    assert client.get("/api/cambios?tipos=otro").status_code == 400
+
+
+def test_long_poll_y_busqueda_en_el_registro(datos_tmp):
+    """
+    Esta funcion verifica que leer desde un seq intermedio encuentre el evento siguiente y
+    que el long-poll devuelva el evento publicado mientras esperaba, y que una espera que no
+    es un número finito se rechace (y no deje el long-poll sin vencimiento).
+    """
+    for i in range(50):
+        eventos_service.publicar("movimiento_creado", {"id": str(i)})
+    eventos, hasta = eventos_service.leer_desde(37, limite=5)
+    assert [e["seq"] for e in eventos] == [38, 39, 40, 41, 42] and hasta == 42
+
+    for espera in ("nan", "inf", "-1"):
+        assert app.test_client().get(f"/api/cambios?desde=50&espera={espera}").status_code == 400
+    inicio = time.monotonic()
+    assert eventos_service.esperar(50, float("nan")) == ([], 50)
+    assert time.monotonic() - inicio < 0.5
+
+    threading.Timer(0.2, eventos_service.publicar, ("pago_registrado", {"id": "x"})).start()
+    inicio = time.monotonic()
+    respuesta = app.test_client().get("/api/cambios?desde=50&espera=5").get_json()
+    assert [e["tipo"] for e in respuesta["cambios"]] == ["pago_registrado"]
+    assert time.monotonic() - inicio < 2
@@ -0,0 +1,41 @@
+import os
+import sys
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from carga_concurrente import verificar  # noqa: E402
+
+
+def test_verificar_detecta_escritura_perdida_y_sobreventa():
+    """
+    Esta funcion verifica que la prueba de carga detecte una venta aceptada que no quedó en el
+    archivo (escritura perdida), un stock vendido de más y un ID de factura repetido.
+    """
+    inicial = {
+        "productos": [{"id": 1, "stock": 2}],
+        "ventas": [],
+        "caja": {"saldo": 0, "movimientos": []},
+        "facturas": [],
+    }
+    # Dos ventas aceptadas de 2 unidades cada una, pero la segunda pisó a la primera
+    final = {
+        "productos": [{"id": 1, "stock": 0}],
+        "ventas": [{"id": "b"}],
+        "caja": {"saldo": 100, "movimientos": [{"tipo": "ingreso", "monto": 100}]},
+        "facturas": [{"id": "FAC-1"}, {"id": "FAC-1"}],
+    }
+    resultado = {
+        "aceptadas": Counter(venta=2, factura=2),
+        "vendidos": Counter({"1": 4}),
+        "variacion_saldo": 200,
+        "facturas": ["FAC-1", "FAC-1"],
+    }
+    violaciones = " | ".join(verificar(inicial, final, resultado))
+    assert "ventas: 1 nuevos en el archivo pero 2 aceptados" in violaciones
+    assert "sobreventa" in violaciones
+    assert "saldo inicial + operaciones aceptadas" in violaciones
+    assert "IDs de factura repetidos: FAC-1" in violaciones
+
+    assert verificar(inicial, inicial, {**resultado, "aceptadas": Counter(), "vendidos": Counter(),
+                                        "variacion_saldo": 0, "facturas": []}) == []
@@ -0,0 +1,52 @@
+import io
+import json
+import zipfile
+
+import pytest
+from app import app
+
+FACTURAS = [
+    {"id": "FAC-2025-06-001", "fecha": "2025-06-13 16:39:39", "cliente": "Ana", "venta_id": "v1",
+     "items": [{"id": 1, "nombre": "Remera", "cantidad": 2, "precio_unitario": 100}], "total": 200},
+    {"id": "FAC-2025-06-002", "fecha": "2025-06-20 10:00:00", "cliente": "Luis", "venta_id": "v2",
+     "items": [{"id": 2, "nombre": "Buzo", "cantidad": 1, "precio_unitario": 300}], "total": 300},
+    {"id": "FAC-2025-07-001", "fecha": "2025-07-02 11:34:57", "cliente": "Eva", "venta_id": "v3",
+     "items": [], "total": 0},
+]
+
+
+@pytest.fixture
+def client(datos_tmp):
+    """
+    Test client que trabaja sobre un directorio de datos temporal con tres facturas.
+    """
+    (datos_tmp / "facturas.json").write_text(json.dumps(FACTURAS), encoding="utf-8")
+    app.config["TESTING"] = True
+    return app.test_client()
+
+
+def test_exportar_facturas_zip_del_mes(client):
+    """
+    Esta funcion verifica que GET /api/facturas/exportar con formato zip
+    devuelva un ZIP con un PDF por cada factura del mes pedido (y solo de ese mes).
+    """
+    resp = client.get("/api/facturas/exportar?mes=2025-06&formato=zip")
+    assert resp.status_code == 200
+    assert resp.mimetype == "application/zip"
+
+    with zipfile.ZipFile(io.BytesIO(resp.data)) as zf:
+        assert zf.namelist() == ["FAC-2025-06-001.pdf", "FAC-2025-06-002.pdf"]
+        assert zf.read("FAC-2025-06-001.pdf").startswith(b"%PDF")
+
+
+def test_exportar_facturas_pdf_consolidado(client):
+    """
+    Esta funcion verifica que el formato pdf devuelva un único PDF y que
+    un mes sin facturas responda 404.
+    """
+    resp = client.get("/api/facturas/exportar?mes=2025-07&formato=pdf")
+    assert resp.status_code == 200
+    assert resp.data.startswith(b"%PDF")
+
+    resp = client.get("/api/facturas/exportar?mes=2024-01")
+    assert resp.status_code == 404
@@ -0,0 +1,21 @@
+import os
+import sys
+
+from app import app
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from generador_datos import generar  # noqa: E402
+
+
+def test_datos_sinteticos_consistentes(datos_tmp):
+    """
+    Esta funcion verifica que los datos del generador de benchmarks sean válidos para la API:
+    la caja concilia con sus movimientos y los pagos y ventas generados se pueden listar.
+    """
+    tamanios = generar(str(datos_tmp.parent), 200)
+    client = app.test_client()
+
+    assert client.get("/api/caja/conciliacion?completa=1").get_json()["consistente"]
+    assert client.get("/api/pagos").get_json()["total"] == tamanios["pagos"]
+    assert client.get("/api/ventas").get_json()["total"] == tamanios["ventas"]
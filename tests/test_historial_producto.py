@@ -0,0 +1,86 @@
+import json
+
+import pytest
+from app import app
+
+PRODUCTOS = [
+    {"id": i, "nombre": f"Producto {i}", "descripcion": "", "precio": precio, "stock": 100, "categoria": "Varios", "stock_minimo": 1}
+    for i, precio in [(1, 1000), (2, 100)]
+]
+
+
+@pytest.fixture
+def client(datos_tmp):
+    """
+    Test client sobre un directorio de datos temporal con dos productos y una venta vieja
+    (sin índices guardados, así se prueba también la reconstrucción).
+    """
+    (datos_tmp / "productos.json").write_text(json.dumps(PRODUCTOS), encoding="utf-8")
+    (datos_tmp / "ventas.json").write_text(json.dumps([
+        {"id": "vieja", "fecha": "2020-01-01 10:00:00", "total": 180, "items": [
+            {"id": 2, "nombre": "Producto 2", "cantidad": 1, "precio_unitario": 90},
+            {"id": 2, "nombre": "Producto 2", "cantidad": 1, "precio_unitario": 90},
+        ]},
+    ]), encoding="utf-8")
+    return app.test_client()
+
+
+def vender(client, items):
+    respuesta = client.post("/api/ventas/compras", json={"items": items, "metodoPago": "efectivo"})
+    assert respuesta.status_code == 201
+    return respuesta.get_json()["venta"]
+
+
+def test_historial_de_ventas_por_producto(client):
+    """
+    Esta funcion verifica que el historial de un producto se mantenga al registrar, editar y
+    eliminar ventas, que se pagine de la venta más reciente a la más antigua y que los
+    totales cuenten todas las ventas del producto.
+    """
+    primera = vender(client, [{"id": 1, "cantidad": 1}, {"id": 2, "cantidad": 3}])
+    segunda = vender(client, [{"id": 2, "cantidad": 1}])
+    tercera = vender(client, [{"id": 1, "cantidad": 2}])
+
+    historial = client.get("/api/productos/2/ventas?per_page=2").get_json()
+    assert [v["venta_id"] for v in historial["ventas"]] == [segunda["id"], primera["id"]]
+    assert historial["totales"] == {
+        "ventas": 3, "unidades": 6, "ingresos": 180 + 400,
+        "primera_venta": "2020-01-01 10:00:00", "ultima_venta": segunda["fecha"],
+    }
+    pagina_2 = client.get("/api/productos/2/ventas?per_page=2&page=2").get_json()
+    assert [(v["venta_id"], v["cantidad"], v["subtotal"]) for v in pagina_2["ventas"]] == [("vieja", 2, 180)]
+    assert pagina_2["total_pages"] == 2
+
+    # Editar la primera venta: el producto 2 sale de ella y el 1 cambia de cantidad
+    respuesta = client.put(f"/api/ventas/{primera['id']}", json={"items": [{"id": 1, "cantidad": 4}]})
+    assert respuesta.status_code == 200
+    assert client.delete(f"/api/ventas/{tercera['id']}").status_code == 200
+
+    producto_1 = client.get("/api/productos/1/ventas").get_json()
+    assert [(v["venta_id"], v["cantidad"]) for v in producto_1["ventas"]] == [(primera["id"], 4)]
+    assert producto_1["totales"]["ingresos"] == 4000
+    producto_2 = client.get("/api/productos/2/ventas").get_json()
+    assert [v["venta_id"] for v in producto_2["ventas"]] == [segunda["id"], "vieja"]
+
+    assert client.get("/api/productos/99/ventas").status_code == 404
+
+
+def test_historial_en_un_archivo_por_producto(client, datos_tmp):
+    """
+    Esta funcion verifica que el historial de cada producto se guarde en su propio archivo
+    (fuera de los índices), que la consulta no necesite los demás archivos y que el
+    nombre se actualice al editar el producto.
+    """
+    vender(client, [{"id": 1, "cantidad": 1}])
+    carpeta = datos_tmp / "ventas_de_producto"
+    assert sorted(p.name for p in carpeta.iterdir()) == ["1.json", "2.json"]
+    indices = json.loads((datos_tmp / "indices.json").read_text(encoding="utf-8"))
+    assert "ventas_de_producto" not in indices
+
+    assert client.put("/api/productos/1", json={"nombre": "Campera"}).status_code == 200
+    (datos_tmp / "indices.json").unlink()
+    (datos_tmp / "productos.json").unlink()
+    historial = client.get("/api/productos/1/ventas").get_json()
+    assert historial["producto"] == {"id": 1, "nombre": "Campera"}
+    assert historial["totales"]["unidades"] == 1
+    assert not (datos_tmp / "indices.json").exists()
@@ -0,0 +1,21 @@
+from datetime import date, datetime
+
+import pytest
+from flask import Flask
+
+from services.json_service import ProveedorJSONRapido
+
+
+@pytest.mark.skipif(ProveedorJSONRapido is None, reason="orjson no está instalado")
+def test_orjson_genera_lo_mismo_que_el_provider_estandar():
+    """
+    Esta funcion verifica que, con orjson, las respuestas tengan los mismos bytes que con el
+    provider estándar de Flask (claves ordenadas y fechas en formato HTTP) para datos ASCII.
+    """
+    datos = {"b": 1, "a": {"z": 2.5, "y": [3, None, True]}, "fecha": datetime(2025, 6, 13, 16, 39, 29), "dia": date(2025, 6, 1)}
+    app = Flask(__name__)
+    with app.app_context():
+        estandar = app.json.response(datos).get_data()
+        app.json = ProveedorJSONRapido(app)
+        assert app.json.response(datos).get_data() == estandar
+        assert app.json.loads(app.json.dumps(datos)) == app.json.loads(estandar)
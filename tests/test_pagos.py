@@ -0,0 +1,88 @@
+import json
+
+import pytest
+from app import app
+
+PAGO = {"destinatario": "Textil SA", "concepto": "proveedor", "descripcion": "Telas",
+        "monto": 150, "metodo": "transferencia", "fecha": "2025-06-02"}
+
+
+@pytest.fixture
+def client(datos_tmp):
+    """
+    Test client que trabaja sobre un directorio de datos temporal.
+    """
+    app.config["TESTING"] = True
+    return app.test_client()
+
+
+def test_pago_se_guarda_una_sola_vez(client, datos_tmp):
+    """
+    Esta funcion verifica que POST /api/pagos guarde el pago solo como egreso de caja
+    y que GET /api/pagos lo devuelva con el formato de pago.
+    """
+    assert client.post("/api/pagos", json=PAGO).status_code == 201
+    assert not (datos_tmp / "pagos.json").exists()
+
+    pagos = client.get("/api/pagos").get_json()["pagos"]
+    assert len(pagos) == 1
+    assert pagos[0]["destinatario"] == "Textil SA"
+    assert pagos[0]["fecha"].startswith("2025-06-02")
+
+    caja = client.get("/api/caja/").get_json()
+    assert caja["saldo"] == -150
+    assert caja["movimientos"][0]["id"] == pagos[0]["id"]
+
+
+def test_migracion_de_pagos_legados(client, datos_tmp):
+    """
+    Esta funcion verifica que un pagos.json del formato anterior se unifique con la caja
+    sin duplicar los egresos que ya estaban registrados.
+    """
+    egreso = {"id": "1", "tipo": "egreso", "monto": 100.0, "descripcion": "Luz", "fecha": "2025-06-01 10:00:00",
+              "detalles": {"destinatario": "Edesur", "concepto": "servicios", "metodo": "debito"}}
+    (datos_tmp / "caja.json").write_text(json.dumps({"saldo": -100.0, "movimientos": [egreso]}), encoding="utf-8")
+    (datos_tmp / "pagos.json").write_text(json.dumps([
+        {"id": "1", "fecha": "2025-06-01 10:00:00", "destinatario": "Edesur", "concepto": "servicios",
+         "descripcion": "Luz", "monto": 100.0, "metodo": "debito"}
+    ]), encoding="utf-8")
+
+    pagos = client.get("/api/pagos").get_json()["pagos"]
+    assert [p["id"] for p in pagos] == ["1"]
+    assert (datos_tmp / "pagos.json.migrado").exists()
+
+    assert client.post("/api/pagos", json=PAGO).status_code == 201
+    ids = [p["id"] for p in client.get("/api/pagos").get_json()["pagos"]]
+    assert len(ids) == 2 and ids[1] == "1"
+
+    # Borrar el último pago no hace que el siguiente reciba su mismo ID
+    assert client.delete(f"/api/caja/movimiento/{ids[0]}").status_code == 200
+    assert client.post("/api/pagos", json=PAGO).status_code == 201
+    assert client.get("/api/pagos").get_json()["pagos"][0]["id"] not in ids
+    assert client.get("/api/caja/").get_json()["saldo"] == -250
+
+
+def test_pagos_filtrados_y_paginados(client):
+    """
+    Esta funcion verifica los filtros por destinatario, concepto y rango de fechas de
+    GET /api/pagos, la paginación y los totales de lo filtrado.
+    """
+    pagos = [
+        dict(PAGO, fecha="2025-06-01", monto=100),
+        dict(PAGO, fecha="2025-06-15", monto=200, metodo="efectivo"),
+        dict(PAGO, fecha="2025-07-01", monto=300),
+        dict(PAGO, fecha="2025-06-20", monto=400, destinatario="ABC Inmobiliaria", concepto="alquiler"),
+    ]
+    for pago in pagos:
+        assert client.post("/api/pagos", json=pago).status_code == 201
+
+    resp = client.get("/api/pagos?destinatario=textil sa&desde=2025-06-01&hasta=2025-06-30").get_json()
+    assert [p["monto"] for p in resp["pagos"]] == [200, 100]
+    assert resp["totales"]["monto"] == 300
+    assert resp["totales"]["por_metodo"] == {"efectivo": 200, "transferencia": 100}
+
+    resp = client.get("/api/pagos?concepto=proveedor&metodo=transferencia&per_page=1&page=2").get_json()
+    assert resp["total"] == 2 and resp["total_pages"] == 2
+    assert [p["monto"] for p in resp["pagos"]] == [100]
+
+    assert client.get("/api/pagos?desde=junio").status_code == 400
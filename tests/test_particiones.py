@@ -0,0 +1,133 @@
+import json
+
+import pytest
+
+import config
+from app import app
+from services import particiones_service
+from services.utilidades import ahora_str
+
+CAJA = {
+    "saldo": 700,
+    "movimientos": [
+        {"id": "a", "tipo": "ingreso", "monto": 1000, "descripcion": "Venta #1", "fecha": "2025-05-01 10:00:00"},
+        {"id": "b", "tipo": "egreso", "monto": 200, "descripcion": "Luz", "fecha": "2025-05-20 11:00:00"},
+        {"id": "c", "tipo": "ingreso", "monto": 400, "descripcion": "Venta #2", "fecha": "2025-06-03 12:00:00"},
+        {"id": "d", "tipo": "egreso", "monto": 500, "descripcion": "Alquiler", "fecha": "2025-06-03 18:00:00"},
+    ],
+}
+
+
+@pytest.fixture
+def client(datos_tmp, monkeypatch):
+    """
+    Test client con particiones por mes habilitadas (y comprimidas) sobre una caja de un solo archivo.
+    """
+    (datos_tmp / "caja.json").write_text(json.dumps(CAJA), encoding="utf-8")
+    monkeypatch.setattr(config, "PARTICIONES", True)
+    monkeypatch.setattr(config, "PARTICIONES_COMPRIMIR", True)
+    return app.test_client()
+
+
+def test_caja_particionada_por_mes(client, datos_tmp):
+    """
+    Esta funcion verifica que la caja se migre a una partición por mes, que un ingreso solo
+    escriba la partición del mes actual, que el listado paginado lea solo las particiones
+    necesarias y que el saldo siga conciliando.
+    """
+    primera = client.get("/api/caja/?per_page=1").get_json()
+    assert [m["id"] for m in primera["movimientos"]] == ["d"] and primera["total"] == 4
+    assert (datos_tmp / "caja.json.migrado").exists()
+    viejas = sorted(p.name for p in (datos_tmp / "caja").glob("2025-*"))
+    assert viejas == ["2025-05.1.json.gz", "2025-06.1.json.gz"]
+
+    assert client.post("/api/caja/ingreso", json={"total": 50, "descripcion": "x"}).status_code == 201
+    assert sorted(p.name for p in (datos_tmp / "caja").glob("2025-*")) == viejas
+
+    manifiesto = json.loads((datos_tmp / "caja" / "manifiesto.json").read_text(encoding="utf-8"))
+    assert [p["cantidad"] for p in manifiesto["particiones"]] == [2, 2, 1]
+    assert manifiesto["extra"]["saldo"] == 750
+
+    egresos = client.get("/api/caja/?tipo=egreso&per_page=1&page=2").get_json()
+    assert [m["id"] for m in egresos["movimientos"]] == ["b"] and egresos["total"] == 2
+
+    vista = particiones_service.caja.leer()["movimientos"]
+    assert vista.mas_recientes(2)[0][1]["id"] == "d"
+    assert vista.abiertas == 2
+    assert vista[0]["id"] == "a" and len(vista) == 5
+
+    assert client.get("/api/caja/conciliacion?completa=1").get_json()["consistente"]
+
+
+def test_escrituras_leen_solo_la_particion_que_tocan(client, monkeypatch):
+    """
+    Esta funcion verifica que, una vez armados los índices, un alta lea solo la partición
+    del mes actual y que borrar un movimiento lea solo la partición que lo contiene.
+    """
+    assert client.post("/api/caja/ingreso", json={"total": 50, "descripcion": "x"}).status_code == 201
+
+    leidas = []
+    leer_particion = particiones_service.AlmacenParticionado._leer_particion
+
+    def espia(almacen, entrada):
+        leidas.append(entrada["mes"])
+        return leer_particion(almacen, entrada)
+
+    monkeypatch.setattr(particiones_service.AlmacenParticionado, "_leer_particion", espia)
+    assert client.post("/api/caja/ingreso", json={"total": 50, "descripcion": "y"}).status_code == 201
+    assert leidas == [ahora_str()[:7]]
+
+    leidas.clear()
+    assert client.delete("/api/caja/movimiento/b").status_code == 200
+    assert leidas == ["2025-05"]
+    assert client.get("/api/caja/conciliacion?completa=1").get_json()["consistente"]
+
+
+def test_archivo_de_meses_cerrados(client, datos_tmp, monkeypatch):
+    """
+    Esta funcion verifica que el archivo mueva los meses cerrados a la carpeta de archivo con
+    su resumen, que sus datos se sigan viendo en los mismos endpoints y que las métricas usen
+    el resumen (recalculado y guardado al borrar un registro archivado).
+    """
+    respuesta = client.post("/api/archivo?hasta=2025-05")
+    assert respuesta.status_code == 200
+    assert respuesta.get_json()["caja"] == ["2025-05"]
+    assert client.post("/api/archivo", json={"hasta": "mayo"}).status_code == 400
+
+    manifiesto = json.loads((datos_tmp / "caja" / "manifiesto.json").read_text(encoding="utf-8"))
+    archivada = manifiesto["particiones"][0]
+    assert archivada["archivada"] and archivada["archivo"].startswith("archivo/")
+    assert archivada["resumen"] == {"egresos": {"2025-05-20": [1, 200]}}
+    assert (datos_tmp / "caja" / archivada["archivo"]).exists()
+
+    todos = client.get("/api/caja/?per_page=10").get_json()
+    assert [m["id"] for m in todos["movimientos"]] == ["d", "c", "b", "a"]
+    metricas = client.get("/api/ventas/metricas").get_json()
+    assert metricas["total_pagos"] == 2 and metricas["total_egresos"] == 700
+
+    assert client.delete("/api/caja/movimiento/b").status_code == 200
+    manifiesto = json.loads((datos_tmp / "caja" / "manifiesto.json").read_text(encoding="utf-8"))
+    assert manifiesto["particiones"][0]["archivada"] and manifiesto["particiones"][0]["resumen"] == {"egresos": {}}
+    leidas = []
+    leer_particion = particiones_service.AlmacenParticionado._leer_particion
+    monkeypatch.setattr(
+        particiones_service.AlmacenParticionado, "_leer_particion",
+        lambda almacen, entrada: leidas.append(entrada["mes"]) or leer_particion(almacen, entrada),
+    )
+    metricas = client.get("/api/ventas/metricas").get_json()
+    assert metricas["total_pagos"] == 1 and metricas["total_egresos"] == 500
+    assert "2025-05" not in leidas
+
+
+def test_caja_particionada_sin_archivo_previo(datos_tmp, monkeypatch):
+    """
+    Esta funcion verifica que, con particiones y sin caja.json (instalación nueva), la caja
+    arranque con saldo 0 y el primer movimiento se registre normalmente.
+    """
+    monkeypatch.setattr(config, "PARTICIONES", True)
+    client = app.test_client()
+
+    assert client.post("/api/caja/egreso", json={"total": 30, "descripcion": "Luz"}).status_code == 201
+    manifiesto = json.loads((datos_tmp / "caja" / "manifiesto.json").read_text(encoding="utf-8"))
+    assert manifiesto["extra"]["saldo"] == -30
+    assert client.get("/api/caja/").get_json()["total"] == 1
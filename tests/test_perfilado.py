@@ -0,0 +1,51 @@
+import json
+import marshal
+
+import pytest
+
+import config
+from app import create_app
+from services import perfilado_service
+
+CAJA = {"saldo": 0, "movimientos": []}
+
+
+@pytest.fixture
+def client(datos_tmp, monkeypatch):
+    """
+    Test client de una app creada con el perfilado habilitado y protegido con token.
+    """
+    (datos_tmp / "caja.json").write_text(json.dumps(CAJA), encoding="utf-8")
+    monkeypatch.setattr(config, "PERFILADO", True)
+    monkeypatch.setattr(config, "PERFILADO_TOKEN", "secreto")
+    monkeypatch.setattr(perfilado_service, "perfiles", perfilado_service.deque(maxlen=2))
+    return create_app().test_client()
+
+
+def test_perfil_por_header_y_por_endpoint(client):
+    """
+    Esta funcion verifica que se perfile una petición con X-Perfilar (solo con el token), que
+    el perfil se descargue como .prof y como texto, que activar un endpoint perfile sus próximas
+    N peticiones y que el buffer conserve solo los últimos perfiles.
+    """
+    token = {"X-Perfilado-Token": "secreto"}
+    ingreso = {"total": 10, "descripcion": "x"}
+    assert "X-Perfil-Id" not in client.post("/api/caja/ingreso", json=ingreso, headers={"X-Perfilar": "1"}).headers
+    assert client.get("/api/perfiles").status_code == 403
+
+    respuesta = client.post("/api/caja/ingreso", json=ingreso, headers={"X-Perfilar": "1", **token})
+    perfil_id = respuesta.headers["X-Perfil-Id"]
+    stats = marshal.loads(client.get(f"/api/perfiles/{perfil_id}", headers=token).data)
+    assert any(funcion == "agregar_movimiento" for (_, _, funcion) in stats)
+    texto = client.get(f"/api/perfiles/{perfil_id}?formato=texto", headers=token).get_data(as_text=True)
+    assert texto.startswith("POST /api/caja/ingreso -> 201")
+
+    assert client.post("/api/perfiles/activar", json={"endpoint": "caja.registrar_ingreso", "cantidad": 2},
+                       headers=token).status_code == 200
+    for i in range(3):
+        client.post("/api/caja/ingreso", json={"total": 10, "descripcion": str(i)})
+
+    perfiles = client.get("/api/perfiles", headers=token).get_json()
+    assert [p["endpoint"] for p in perfiles["perfiles"]] == ["caja.registrar_ingreso"] * 2
+    assert perfiles["pendientes"] == {}
+    assert client.get(f"/api/perfiles/{perfil_id}", headers=token).status_code == 404
@@ -0,0 +1,55 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from app import app
+from services import pronostico_service
+
+PRODUCTOS = [
+    {"id": 1, "nombre": "Remera", "descripcion": "", "precio": 1000, "stock": 10, "categoria": "Ropa", "stock_minimo": 2},
+    {"id": 2, "nombre": "Gorra", "descripcion": "", "precio": 500, "stock": 4, "categoria": "Ropa", "stock_minimo": 1},
+]
+
+
+@pytest.fixture
+def client(datos_tmp):
+    """
+    Test client con dos productos y dos remeras vendidas por día en las últimas dos semanas.
+    """
+    hoy = datetime.now()
+    ventas = [
+        {"id": f"v{dias}", "fecha": (hoy - timedelta(days=dias)).strftime("%Y-%m-%d 12:00:00"), "total": 2000,
+         "items": [{"id": 1, "nombre": "Remera", "cantidad": 2, "precio_unitario": 1000}]}
+        for dias in range(14, 0, -1)
+    ]
+    (datos_tmp / "productos.json").write_text(json.dumps(PRODUCTOS), encoding="utf-8")
+    (datos_tmp / "ventas.json").write_text(json.dumps(ventas), encoding="utf-8")
+    return app.test_client()
+
+
+def test_pronostico_de_demanda_y_quiebre(client, datos_tmp):
+    """
+    Esta funcion verifica que se estime la demanda diaria con suavizado exponencial, que se
+    proyecte la fecha de quiebre con el stock actual y que el cálculo se guarde para el día.
+    """
+    respuesta = client.get("/api/ventas/pronostico").get_json()
+    remera, gorra = respuesta["productos"]
+    assert remera["media_7"] == 2 and remera["demanda_diaria"] == pytest.approx(2, abs=0.02)
+    assert remera["dias_restantes"] == 5.0
+    assert remera["fecha_quiebre"] == (datetime.now() + timedelta(days=5)).strftime("%Y-%m-%d")
+    assert gorra["dias_restantes"] is None and gorra["fecha_quiebre"] is None
+    assert respuesta["ventas"]["ventas_diarias"] == pytest.approx(1, abs=0.02)
+
+    generado = json.loads((datos_tmp / "pronostico.json").read_text(encoding="utf-8"))["generado"]
+    assert client.get("/api/ventas/pronostico?quiebre_en=3").get_json()["productos"] == []
+    assert client.get("/api/ventas/pronostico").get_json()["generado"] == generado
+    assert client.get("/api/ventas/pronostico?quiebre_en=pronto").status_code == 400
+
+
+def test_suavizado_exponencial_y_media_movil():
+    """
+    Esta funcion verifica el nivel del suavizado exponencial y la media móvil de varias series.
+    """
+    series = [[1] * 7 + [4], [0] * 8]
+    assert pronostico_service.suavizado_exponencial(series) == pytest.approx([0.3 * 4 + 0.7 * 1, 0])
+    assert pronostico_service.media_movil(series, 2) == pytest.approx([2.5, 0])
@@ -0,0 +1,110 @@
+import json
+
+import pytest
+from app import app
+from services import ranking_service
+
+PRODUCTOS = [
+    {"id": i, "nombre": f"Producto {i}", "descripcion": "", "precio": precio, "stock": 100, "categoria": "Varios", "stock_minimo": 1}
+    for i, precio in [(1, 1000), (2, 100), (3, 10)]
+]
+
+
+@pytest.fixture
+def client(datos_tmp):
+    """
+    Test client sobre un directorio de datos temporal con tres productos de distinto precio.
+    """
+    (datos_tmp / "productos.json").write_text(json.dumps(PRODUCTOS), encoding="utf-8")
+    (datos_tmp / "ventas.json").write_text(json.dumps([
+        {"id": "vieja", "fecha": "2020-01-01 10:00:00", "total": 100, "items": [
+            {"id": 2, "nombre": "Producto 2", "cantidad": 1, "precio_unitario": 100},
+        ]},
+    ]), encoding="utf-8")
+    return app.test_client()
+
+
+def vender(client, items):
+    respuesta = client.post("/api/ventas/compras", json={"items": items, "metodoPago": "efectivo"})
+    assert respuesta.status_code == 201
+    return respuesta.get_json()["venta"]
+
+
+def test_ranking_por_ventana_y_clasificacion_abc(client):
+    """
+    Esta funcion verifica que el ranking se mantenga con cada venta (incluida una eliminada),
+    que la ventana del día no cuente ventas viejas y que la clasificación ABC siga la
+    participación acumulada.
+    """
+    vender(client, [{"id": 1, "cantidad": 1}, {"id": 3, "cantidad": 20}])
+    venta = vender(client, [{"id": 2, "cantidad": 2}])
+    vender(client, [{"id": 3, "cantidad": 5}])
+
+    por_ingresos = client.get("/api/ventas/ranking?ventana=dia").get_json()
+    assert por_ingresos["total"] == 1000 + 200 + 250
+    assert [(p["nombre"], p["valor"], p["clase"]) for p in por_ingresos["productos"]] == [
+        ("Producto 1", 1000, "A"), ("Producto 3", 250, "A"), ("Producto 2", 200, "B"),
+    ]
+    assert por_ingresos["clases"] == {"A": 2, "B": 1, "C": 0}
+
+    assert client.delete(f"/api/ventas/{venta['id']}").status_code == 200
+    por_unidades = client.get("/api/ventas/ranking?ventana=semana&por=unidades&n=1").get_json()
+    assert [(p["id"], p["valor"]) for p in por_unidades["productos"]] == [("3", 25)]
+    assert por_unidades["total"] == 26 and not por_unidades["aproximado"]
+
+    historico = client.get("/api/ventas/ranking?ventana=todo&por=unidades").get_json()
+    assert {p["id"]: p["valor"] for p in historico["productos"]} == {"3": 25, "1": 1, "2": 1}
+    assert client.get("/api/ventas/ranking?ventana=anio").status_code == 400
+
+
+def test_space_saving_con_capacidad_acotada():
+    """
+    Esta funcion verifica que el resumen Space-Saving no supere su capacidad y conserve a los
+    productos más vendidos, con el error acotado.
+    """
+    contadores = {}
+    for i in range(1000):
+        ranking_service.sumar(contadores, "top" if i % 3 == 0 else f"raro-{i}", 1, capacidad=10)
+    assert len(contadores) == 10
+    conteo, error = contadores["top"]
+    assert conteo - error <= 334 <= conteo
+    fusionado = ranking_service.fusionar([contadores, {"top": [5, 0]}], capacidad=10)
+    assert max(fusionado, key=lambda c: fusionado[c][0]) == "top"
+
+
+def test_reconstruccion_espera_a_las_escrituras(client, datos_tmp):
+    """
+    Esta funcion verifica que un GET que reconstruye el ranking (porque falta el archivo)
+    espere a la escritura en curso y así incluya la venta que se estaba guardando.
+    """
+    import threading
+    import time
+    from services.persistencia_service import bloqueo
+
+    anotada, liberar = threading.Event(), threading.Event()
+
+    def escribir():
+        with bloqueo:
+            anotada.set()
+            liberar.wait(5)
+            ventas = json.loads((datos_tmp / "ventas.json").read_text(encoding="utf-8"))
+            ventas.append({"id": "nueva", "fecha": "2020-01-02 10:00:00", "total": 3000, "items": [
+                {"id": 1, "nombre": "Producto 1", "cantidad": 3, "precio_unitario": 1000},
+            ]})
+            (datos_tmp / "ventas.json").write_text(json.dumps(ventas), encoding="utf-8")
+
+    escritor = threading.Thread(target=escribir)
+    escritor.start()
+    anotada.wait()
+    respuesta = {}
+    lector = threading.Thread(target=lambda: respuesta.update(
+        client.get("/api/ventas/ranking?ventana=todo&por=unidades").get_json()
+    ))
+    lector.start()
+    time.sleep(0.2)
+    assert not (datos_tmp / "ranking.json").exists()  # El GET espera el bloqueo
+    liberar.set()
+    escritor.join()
+    lector.join()
+
+    assert {p["id"]: p["valor"] for p in respuesta["productos"]} == {"1": 3, "2": 1}
@@ -0,0 +1,92 @@
+import json
+
+import pytest
+from app import app
+
+PRODUCTOS = [
+    {"id": 1, "nombre": "Remera", "descripcion": "", "precio": 1000, "stock": 10, "categoria": "Ropa", "stock_minimo": 2},
+    {"id": 2, "nombre": "Gorra", "descripcion": "", "precio": 500, "stock": 4, "categoria": "Ropa", "stock_minimo": 1},
+]
+
+
+@pytest.fixture
+def client(datos_tmp):
+    """
+    Test client sobre un directorio de datos temporal con dos productos.
+    """
+    (datos_tmp / "productos.json").write_text(json.dumps(PRODUCTOS), encoding="utf-8")
+    return app.test_client()
+
+
+def test_sincronizacion_incremental_con_lapidas(client):
+    """
+    Esta funcion verifica que la carga inicial traiga todo, que el delta traiga solo los
+    registros cambiados (con su revisión) y que los borrados lleguen como lápidas.
+    """
+    inicial = client.get("/api/sync").get_json()
+    assert [p["id"] for p in inicial["productos"]["cambios"]] == [1, 2]
+    assert inicial["hasta"] == 0 and inicial["completo"]
+
+    venta = client.post("/api/ventas/compras", json={"items": [{"id": 1, "cantidad": 2}], "metodoPago": "efectivo"}).get_json()["venta"]
+    pago = {"destinatario": "Proveedor", "concepto": "Luz", "descripcion": "Factura", "monto": 300, "metodo": "efectivo"}
+    assert client.post("/api/pagos", json=pago).status_code == 201
+
+    delta = client.get(f"/api/sync?desde={inicial['hasta']}&colecciones=ventas").get_json()
+    assert [v["id"] for v in delta["ventas"]["cambios"]] == [venta["id"]]
+    assert "productos" not in delta
+
+    primera = client.get(f"/api/sync?desde={inicial['hasta']}").get_json()
+    assert [p["id"] for p in primera["productos"]["cambios"]] == [1]
+    assert primera["productos"]["cambios"][0]["stock"] == 8
+    assert [m["tipo"] for m in primera["caja"]["cambios"]] == ["ingreso", "egreso"]
+    assert [p["destinatario"] for p in primera["pagos"]["cambios"]] == ["Proveedor"]
+    revisiones = [m["rev"] for m in primera["caja"]["cambios"]]
+    assert revisiones == sorted(revisiones) and primera["hasta"] == max(revisiones)
+
+    assert client.delete(f"/api/ventas/{venta['id']}").status_code == 200
+    assert client.delete("/api/productos/2").status_code == 200
+    ultimo = client.get(f"/api/sync?desde={primera['hasta']}").get_json()
+    assert ultimo["ventas"]["borrados"] == [venta["id"]]
+    assert ultimo["caja"]["borrados"] == [venta["id"]]
+    assert ultimo["productos"]["borrados"] == [2]
+    assert [p["stock"] for p in ultimo["productos"]["cambios"]] == [10]
+    assert ultimo["pagos"] == {"cambios": [], "borrados": []}
+
+    paginado = client.get("/api/sync?desde=0&limite=1").get_json()
+    assert not paginado["completo"] and paginado["hasta"] == 1
+    assert client.get("/api/sync?colecciones=clientes").status_code == 400
+
+
+def test_sync_no_lee_una_revision_sin_guardar(client):
+    """
+    Esta funcion verifica que un sync que llega entre la anotación de una revisión y el
+    guardado de los datos espere a que se guarden, así "hasta" nunca cubre un cambio que
+    todavía no devuelve.
+    """
+    import threading
+    import time
+    from controllers.productos_controller import cargar_productos, guardar_productos
+    from services import revisiones_service
+    from services.persistencia_service import bloqueo
+
+    anotada = threading.Event()
+
+    def escribir():
+        with bloqueo:
+            productos = cargar_productos()
+            productos[0]["stock"] = 3
+            revisiones_service.marcar("productos", productos[0])
+            anotada.set()
+            time.sleep(0.3)  # El sync llega en este momento
+            guardar_productos(productos)
+
+    escritor = threading.Thread(target=escribir)
+    escritor.start()
+    anotada.wait()
+    delta = client.get("/api/sync?desde=0&colecciones=productos").get_json()
+    escritor.join()
+
+    assert delta["hasta"] == 1
+    assert [(p["id"], p["stock"]) for p in delta["productos"]["cambios"]] == [(1, 3)]
+    siguiente = client.get("/api/sync?desde=1&colecciones=productos").get_json()
+    assert siguiente["productos"] == {"cambios": [], "borrados": []}
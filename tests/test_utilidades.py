@@ -0,0 +1,69 @@
+from datetime import datetime
+
+import pytest
+
+from services import utilidades
+from services.utilidades import (
+    epoch, epoch_de, parsear_fecha, parsear_fecha_flexible, periodos_de_dia, semana_label,
+)
+
+
+class _Reloj(datetime):
+    """datetime con la hora actual fija, para los formatos que se completan con la hora actual."""
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2025, 6, 13, 16, 39, 29)
+
+
+def test_parsear_fecha_canonica_e_iso():
+    """
+    Esta funcion verifica que parsear_fecha lea el formato canónico y la fecha ISO sin hora,
+    y que cualquier otro formato dé ValueError.
+    """
+    assert parsear_fecha("2025-06-13 16:39:29") == datetime(2025, 6, 13, 16, 39, 29)
+    assert parsear_fecha("2025-06-13") == datetime(2025, 6, 13)
+    for invalida in ("13/06/2025", "2025-13-01 00:00:00", ""):
+        with pytest.raises(ValueError):
+            parsear_fecha(invalida)
+
+
+def test_parsear_fecha_flexible_por_formato(monkeypatch):
+    """
+    Esta funcion verifica cada formato aceptado por parsear_fecha_flexible: ISO con y sin
+    hora (se respeta), DD/MM/YYYY (preferido si es ambiguo) y MM/DD/YYYY (completados con la
+    hora actual), y el ValueError para lo demás.
+    """
+    monkeypatch.setattr(utilidades, "datetime", _Reloj)
+
+    assert parsear_fecha_flexible(" 2025-06-02 ") == datetime(2025, 6, 2)
+    assert parsear_fecha_flexible("2025-06-02 08:15:00") == datetime(2025, 6, 2, 8, 15)
+    assert parsear_fecha_flexible("02/06/2025") == datetime(2025, 6, 2, 16, 39, 29)
+    assert parsear_fecha_flexible("06/25/2025") == datetime(2025, 6, 25, 16, 39, 29)
+    for invalida in ("25/25/2025", "2 de junio", "2025/06/02"):
+        with pytest.raises(ValueError):
+            parsear_fecha_flexible(invalida)
+
+
+def test_epoch_de_usa_fecha_ts_o_la_calcula():
+    """
+    Esta funcion verifica que epoch_de use "fecha_ts" si está guardado y que, si falta
+    (registros viejos), lo calcule a partir de "fecha".
+    """
+    fecha = "2025-06-13 16:39:29"
+    esperado = int(datetime(2025, 6, 13, 16, 39, 29).timestamp())
+    assert epoch(fecha) == esperado
+    assert epoch_de({"fecha": fecha}) == esperado
+    assert epoch_de({"fecha": fecha, "fecha_ts": 123}) == 123
+    assert epoch_de({"fecha": "otra cosa", "fecha_ts": 0}) == 0
+
+
+def test_etiquetas_de_semana_y_periodos():
+    """
+    Esta funcion verifica la etiqueta de semana (de lunes a domingo, con el mes del lunes)
+    para textos y datetime, y las claves de día, semana, mes y año de periodos_de_dia.
+    """
+    assert semana_label("2025-03-12 10:00:00") == "10-16 marzo 2025"
+    assert semana_label(datetime(2025, 3, 16, 23, 59)) == "10-16 marzo 2025"
+    assert semana_label("2025-06-01") == "26-1 mayo 2025"  # Semana que cruza de mes
+    assert periodos_de_dia("2025-06-13") == ("2025-06-13", "9-15 junio 2025", "2025-06", "2025")
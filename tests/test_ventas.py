@@ -1,3 +1,5 @@
+import json
+
 import pytest
 from app import app
 
@@ -21,6 +23,19 @@ def test_obtener_ventas_devuelve_lista(client):
     assert isinstance(data, list)
 
 
+def test_ventas_comprimidas_con_gzip(client):
+    """
+    Esta funcion verifica que GET /api/ventas se comprima con gzip cuando el cliente lo acepta
+    y que el contenido descomprimido sea el mismo que sin compresión.
+    """
+    import gzip
+
+    normal = client.get("/api/ventas?per_page=50")
+    comprimida = client.get("/api/ventas?per_page=50", headers={"Accept-Encoding": "gzip"})
+    assert comprimida.headers["Content-Encoding"] == "gzip"
+    assert len(comprimida.data) < len(normal.data)
+    assert json.loads(gzip.decompress(comprimida.data)) == normal.get_json()
+
 def test_registrar_venta_sin_items(client):
     """
     Esta funcion verifica que el endpoint POST /api/ventas/compras:
@@ -31,3 +46,91 @@ def test_registrar_venta_sin_items(client):
     assert resp.status_code == 400
     data = resp.get_json()
     assert "error" in data
+
+
+PRODUCTOS = [
+    {"id": 1, "nombre": "Remera", "descripcion": "", "precio": 100, "stock": 10,
+     "categoria": "Indumentaria", "talle": "M", "stock_minimo": 2},
+    {"id": 2, "nombre": "Buzo", "descripcion": "", "precio": 300, "stock": 5,
+     "categoria": "Indumentaria", "talle": "L", "stock_minimo": 1},
+]
+
+
+@pytest.fixture
+def client_tmp(datos_tmp):
+    """
+    Test client que trabaja sobre un directorio de datos temporal con dos productos.
+    """
+    (datos_tmp / "productos.json").write_text(json.dumps(PRODUCTOS), encoding="utf-8")
+    app.config["TESTING"] = True
+    return app.test_client()
+
+
+def registrar(client, items, metodo="efectivo"):
+    resp = client.post("/api/ventas/compras", json={"items": items, "metodoPago": metodo})
+    assert resp.status_code == 201
+    return resp.get_json()["venta"]
+
+
+def test_facturas_de_venta_por_indice(client_tmp):
+    """
+    Esta funcion verifica que, al facturar una venta, la factura quede vinculada
+    a la venta (GET /api/ventas/<id>/facturas) y al movimiento de caja.
+    """
+    venta = registrar(client_tmp, [{"id": 1, "cantidad": 2}])
+    registrar(client_tmp, [{"id": 2, "cantidad": 1}])
+
+    resp = client_tmp.post("/api/facturas", json={"venta_id": venta["id"], "cliente": "Ana"})
+    assert resp.status_code == 201
+    factura_id = resp.get_json()["factura"]["id"]
+
+    facturas = client_tmp.get(f"/api/ventas/{venta['id']}/facturas").get_json()["facturas"]
+    assert [f["id"] for f in facturas] == [factura_id]
+
+    movimientos = client_tmp.get("/api/caja/").get_json()["movimientos"]
+    movimiento = next(m for m in movimientos if m["id"] == venta["id"])
+    assert movimiento["factura_id"] == factura_id
+
+
+def test_eliminar_venta_en_cascada(client_tmp):
+    """
+    Esta funcion verifica que DELETE /api/ventas/<id> devuelva el stock,
+    quite el ingreso de la caja y descuente su monto del saldo.
+    """
+    venta = registrar(client_tmp, [{"id": 1, "cantidad": 3}])
+    otra = registrar(client_tmp, [{"id": 2, "cantidad": 1}])
+
+    resp = client_tmp.delete(f"/api/ventas/{venta['id']}")
+    assert resp.status_code == 200
+
+    productos = {p["id"]: p for p in client_tmp.get("/api/productos").get_json()["productos"]}
+    assert productos[1]["stock"] == 10
+    assert productos[2]["stock"] == 4
+
+    caja = client_tmp.get("/api/caja/").get_json()
+    assert caja["saldo"] == 300
+    assert [m["id"] for m in caja["movimientos"]] == [otra["id"]]
+
+
+def test_actualizar_venta_ajusta_stock_y_caja(client_tmp):
+    """
+    Esta funcion verifica que PUT /api/ventas/<id> ajuste el stock por diferencia,
+    recalcule el total y actualice el movimiento de caja y el saldo.
+    """
+    venta = registrar(client_tmp, [{"id": 1, "cantidad": 2}])
+
+    resp = client_tmp.put(f"/api/ventas/{venta['id']}", json={"items": [{"id": 1, "cantidad": 1}, {"id": 2, "cantidad": 2}]})
+    assert resp.status_code == 200
+    assert resp.get_json()["venta"]["total"] == 700
+
+    productos = {p["id"]: p for p in client_tmp.get("/api/productos").get_json()["productos"]}
+    assert productos[1]["stock"] == 9
+    assert productos[2]["stock"] == 3
+
+    caja = client_tmp.get("/api/caja/").get_json()
+    assert caja["saldo"] == 700
+    assert caja["movimientos"][0]["monto"] == 700
+
+    # No se puede pedir más stock del disponible
+    resp = client_tmp.put(f"/api/ventas/{venta['id']}", json={"items": [{"id": 2, "cantidad": 6}]})
+    assert resp.status_code == 400